@@ -0,0 +1,21 @@
+import hmac
+
+from fastapi import Depends, Header, HTTPException
+
+from infrastructure.config import Settings, get_settings
+
+
+def require_admin(
+    x_admin_token: str | None = Header(None),
+    settings: Settings = Depends(get_settings)
+) -> None:
+    """Admit requests carrying ``admin_token`` in ``X-Admin-Token``.
+
+    With no token configured they are only open in debug outside
+    production; a production deployment always needs the token.
+    """
+    if settings.admin_token:
+        if not x_admin_token or not hmac.compare_digest(x_admin_token, settings.admin_token):
+            raise HTTPException(status_code=403, detail="Invalid admin token")
+    elif settings.is_production or not settings.debug:
+        raise HTTPException(status_code=403, detail="Set ADMIN_TOKEN to use admin endpoints outside development debug")
@@ -0,0 +1,97 @@
+import asyncio
+import json
+from contextlib import suppress
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from infrastructure.config import get_settings
+from infrastructure.deadline import deadline_scope
+from infrastructure.logging import get_logger
+from infrastructure.metrics import get_metrics
+
+
+logger = get_logger("middleware.deadline")
+
+
+class RequestDeadlineMiddleware:
+    """Gives each HTTP request a time budget and cancels it on client disconnect.
+
+    The handler runs as a task under a Deadline that downstream stages read
+    for their timeouts. Once the request body has been read, the raw
+    ``receive`` channel is watched for ``http.disconnect``; if the client goes
+    away or the budget runs out, the handler task is cancelled.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        body_received = asyncio.Event()
+        disconnected = asyncio.Event()
+        response_started = False
+
+        async def wrapped_receive() -> Message:
+            if body_received.is_set():
+                await disconnected.wait()
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                disconnected.set()
+            elif not message.get("more_body", False):
+                body_received.set()
+            return message
+
+        async def wrapped_send(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        async def watch_disconnect() -> None:
+            await body_received.wait()
+            while (await receive())["type"] != "http.disconnect":
+                pass
+            disconnected.set()
+
+        with deadline_scope(get_settings().request_timeout_sec) as deadline:
+            handler = asyncio.ensure_future(self.app(scope, wrapped_receive, wrapped_send))
+            watcher = asyncio.ensure_future(watch_disconnect())
+            try:
+                done, _ = await asyncio.wait(
+                    {handler, watcher},
+                    timeout=deadline.remaining(),
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                if handler in done:
+                    handler.result()
+                    return
+
+                reason = "client_disconnect" if watcher in done else "deadline"
+                deadline.cancelled = True
+                handler.cancel()
+                with suppress(asyncio.CancelledError, Exception):
+                    await handler
+
+                get_metrics().increment("requests_cancelled_total", reason=reason)
+                logger.warning("request_cancelled", reason=reason, path=scope["path"])
+
+                if reason == "deadline" and not response_started:
+                    await self._send_timeout(send)
+            finally:
+                watcher.cancel()
+                if not handler.done():
+                    handler.cancel()
+
+    @staticmethod
+    async def _send_timeout(send: Send) -> None:
+        body = json.dumps({"detail": "Request deadline exceeded"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 504,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
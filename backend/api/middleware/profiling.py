@@ -0,0 +1,27 @@
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from infrastructure.profiling import get_profiler
+
+
+class RequestProfilingMiddleware:
+    """Runs requests under cProfile while request profiling is armed.
+
+    Only installed when profiling is enabled, and otherwise a single counter
+    check per request. cProfile sees the whole event loop thread, so work
+    from concurrent requests shows up in the profile too.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.profiler = get_profiler()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.profiler.wants(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        profile = self.profiler.begin_request()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.profiler.end_request(profile)
@@ -2,7 +2,10 @@ from fastapi import HTTPException, UploadFile
 from functools import wraps
 from typing import Callable
 
+from core.extractors.base import ExtractorRegistry
 from infrastructure.config import get_settings
+from infrastructure.metrics import get_metrics
+from utils.sniff import SNIFF_BYTES, matches, mime_to_file_type, sniff_content
 
 
 def validate_upload(file: UploadFile) -> None:
@@ -23,3 +26,15 @@ def validate_upload(file: UploadFile) -> None:
             status_code=413,
             detail=f"File too large. Maximum size: {settings.max_file_size_mb}MB"
         )
+
+    head = file.file.read(SNIFF_BYTES)
+    file.file.seek(0)
+    detected = sniff_content(head)
+
+    for declared_type in (mime_to_file_type(file.content_type), ExtractorRegistry.file_type_for(file.filename)):
+        if not matches(declared_type, detected):
+            get_metrics().increment("uploads_misrouted_total", declared=declared_type, detected=detected.file_type)
+            raise HTTPException(
+                status_code=415,
+                detail=f"File content does not match declared type {declared_type} (detected {detected.mime_type})"
+            )
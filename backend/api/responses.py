@@ -0,0 +1,87 @@
+import gzip
+import time
+
+from fastapi import Request
+from fastapi.responses import Response
+from pydantic import BaseModel
+from pydantic_core import to_json, to_jsonable_python
+from starlette.background import BackgroundTask
+
+from infrastructure.config import get_settings
+from infrastructure.metrics import get_metrics
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+MSGPACK_MEDIA_TYPE = "application/x-msgpack"
+
+
+def _accepted_encodings(header: str) -> set[str]:
+    encodings = set()
+    for item in header.split(","):
+        name, _, params = item.strip().partition(";")
+        if name and params.replace(" ", "") not in ("q=0", "q=0.0"):
+            encodings.add(name.lower())
+    return encodings
+
+
+def encode_body(payload: BaseModel | dict, accept: str = "") -> tuple[bytes, str]:
+    """Serialize without re-validating: msgpack if requested and available, else JSON."""
+    if msgpack is not None and MSGPACK_MEDIA_TYPE in accept:
+        return msgpack.packb(to_jsonable_python(payload)), MSGPACK_MEDIA_TYPE
+    return to_json(payload), "application/json"
+
+
+def compress_body(body: bytes, accept_encoding: str) -> tuple[bytes, str | None]:
+    settings = get_settings()
+    if len(body) < settings.response_compression_min_bytes:
+        return body, None
+
+    encodings = _accepted_encodings(accept_encoding)
+    if brotli is not None and "br" in encodings:
+        return brotli.compress(body, quality=settings.brotli_quality), "br"
+    if "gzip" in encodings:
+        return gzip.compress(body, compresslevel=settings.gzip_level), "gzip"
+    return body, None
+
+
+def fast_response(
+    request: Request,
+    payload: BaseModel | dict,
+    status_code: int = 200,
+    background: BackgroundTask | None = None
+) -> Response:
+    """Build a response for large payloads, bypassing FastAPI's jsonable_encoder.
+
+    Negotiates msgpack through ``Accept`` and br/gzip through
+    ``Accept-Encoding`` for bodies above the compression threshold.
+    ``background`` runs once the response has been sent.
+    """
+    start_time = time.perf_counter()
+    body, media_type = encode_body(payload, request.headers.get("accept", ""))
+    raw_size = len(body)
+    body, encoding = compress_body(body, request.headers.get("accept-encoding", ""))
+
+    metrics = get_metrics()
+    metrics.observe("response_serialize_seconds", time.perf_counter() - start_time, path=request.url.path)
+    metrics.observe("response_raw_bytes", raw_size, path=request.url.path)
+    metrics.observe("response_wire_bytes", len(body), path=request.url.path)
+
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(
+        content=body,
+        status_code=status_code,
+        media_type=media_type,
+        headers=headers,
+        background=background
+    )
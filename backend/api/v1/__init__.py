@@ -1,9 +1,21 @@
-from fastapi import APIRouter
-from .routes import analyze, extract, health
+from fastapi import APIRouter, Depends
+from fastapi.requests import HTTPConnection
 
+from infrastructure.usage_ledger import bind_route
+from .routes import admin, analyze, extract, health, transcribe, usage
 
-router = APIRouter()
+
+async def bind_usage_route(request: HTTPConnection) -> None:
+    """Tag usage recorded while serving this request with its route template."""
+    route = request.scope.get("route")
+    bind_route(getattr(route, "path", request.url.path))
+
+
+router = APIRouter(dependencies=[Depends(bind_usage_route)])
 
 router.include_router(analyze.router, tags=["Analysis"])
 router.include_router(extract.router, tags=["Extraction"])
 router.include_router(health.router, tags=["Health"])
+router.include_router(transcribe.router, tags=["Transcription"])
+router.include_router(usage.router, tags=["Usage"])
+router.include_router(admin.router, tags=["Admin"])
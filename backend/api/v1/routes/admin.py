@@ -0,0 +1,143 @@
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse, Response
+
+from api.auth import require_admin
+from infrastructure.deadline import stage_timeout
+from infrastructure.profiling import ProfilerBusyError, get_profiler, profiling_enabled
+
+
+KeyType = Literal["lineno", "filename", "traceback"]
+
+
+def require_profiling() -> None:
+    if not profiling_enabled():
+        raise HTTPException(status_code=404, detail="Not Found")
+
+
+router = APIRouter(prefix="/admin/profile", dependencies=[Depends(require_profiling), Depends(require_admin)])
+
+
+def _snapshot_error(e: KeyError) -> HTTPException:
+    return HTTPException(status_code=404, detail=e.args[0])
+
+
+@router.post("/cpu", response_class=PlainTextResponse)
+async def profile_cpu(
+    seconds: float = Query(10.0, gt=0, le=120),
+    interval_ms: float = Query(10.0, ge=1, le=1000),
+    include_idle: bool = Query(False, description="Keep samples of threads parked waiting for work")
+):
+    """Sample every thread's stack for ``seconds``; returns collapsed stacks for flamegraph.pl or speedscope."""
+    # Finish inside the request budget rather than be cut off by it.
+    duration = max(0.1, min(seconds, (stage_timeout(seconds) or seconds) - 1.0))
+    try:
+        profile = await get_profiler().cpu_profile(duration, interval_ms / 1000, include_idle)
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return PlainTextResponse(profile, headers={"Content-Disposition": 'attachment; filename="cpu.folded"'})
+
+
+@router.get("/memory")
+async def memory_status():
+    return get_profiler().memory_status()
+
+
+@router.post("/memory/start")
+async def start_memory(frames: int = Query(25, ge=1, le=100)):
+    """Start tracemalloc; allocations are slower until it is stopped."""
+    try:
+        get_profiler().start_memory(frames)
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return get_profiler().memory_status()
+
+
+@router.post("/memory/stop")
+async def stop_memory():
+    get_profiler().stop_memory()
+    return get_profiler().memory_status()
+
+
+@router.post("/memory/snapshots")
+async def take_snapshot():
+    try:
+        snapshot_id = get_profiler().take_snapshot()
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"id": snapshot_id, **get_profiler().memory_status()}
+
+
+@router.get("/memory/snapshots/{snapshot_id}")
+async def snapshot_top(
+    snapshot_id: int,
+    limit: int = Query(25, ge=1, le=500),
+    key_type: KeyType = Query("lineno")
+):
+    try:
+        return {"id": snapshot_id, "top": get_profiler().top(snapshot_id, limit, key_type)}
+    except KeyError as e:
+        raise _snapshot_error(e)
+
+
+@router.get("/memory/snapshots/{snapshot_id}/dump")
+async def snapshot_dump(snapshot_id: int):
+    """The raw snapshot, loadable with ``tracemalloc.Snapshot.load``."""
+    try:
+        data = get_profiler().dump_snapshot(snapshot_id)
+    except KeyError as e:
+        raise _snapshot_error(e)
+    return Response(
+        data,
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": f'attachment; filename="snapshot-{snapshot_id}.tracemalloc"'}
+    )
+
+
+@router.get("/memory/diff")
+async def snapshot_diff(
+    base: int,
+    target: int,
+    limit: int = Query(25, ge=1, le=500),
+    key_type: KeyType = Query("lineno")
+):
+    """Allocation growth from snapshot ``base`` to ``target``, largest first."""
+    try:
+        return {"base": base, "target": target, "top": get_profiler().diff(base, target, limit, key_type)}
+    except KeyError as e:
+        raise _snapshot_error(e)
+
+
+@router.post("/requests")
+async def arm_request_profiling(
+    path_prefix: str = Query(..., description="Profile requests whose path starts with this, e.g. /api/v1/analyze"),
+    count: int = Query(5, ge=1, le=1000)
+):
+    """cProfile the next ``count`` matching requests; fetch the combined stats from ``/requests/pstats``."""
+    get_profiler().arm_requests(path_prefix, count)
+    return get_profiler().request_status()
+
+
+@router.get("/requests")
+async def request_profiling_status():
+    return get_profiler().request_status()
+
+
+@router.delete("/requests")
+async def disarm_request_profiling():
+    get_profiler().disarm_requests()
+    return get_profiler().request_status()
+
+
+@router.get("/requests/pstats")
+async def request_pstats():
+    """Combined cProfile stats in pstats format, for ``pstats.Stats``, snakeviz or gprof2dot."""
+    data = get_profiler().request_pstats()
+    if data is None:
+        raise HTTPException(status_code=404, detail="No requests have been profiled yet")
+    return Response(
+        data,
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": 'attachment; filename="requests.prof"'}
+    )
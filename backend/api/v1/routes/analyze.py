@@ -1,16 +1,27 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Depends
+from fastapi import APIRouter, HTTPException, Request, UploadFile, File, Form, Depends
 from pydantic import BaseModel
+from starlette.background import BackgroundTask
 from typing import Optional
 
+from api.responses import fast_response
 from core.agents.coordinator import CoordinatorAgent
-from core.extractors.extractor import extract_content
+from core.extractors.extractor import extract_content, extract_images_batched, image_indexes
 from infrastructure.config import get_settings, Settings
 from infrastructure.dependencies import get_session_manager
+from infrastructure.logging import get_logger
+from infrastructure.scheduler import Priority, get_scheduler, upload_cost
 from infrastructure.session_manager import SessionManager
-from infrastructure.llm.client import get_llm_client
+from schemas import ExtractionResult, InputType
+from utils.archive import is_project_archive
+from utils.compaction import BlockDeduplicator
+from utils.sniff import SNIFF_BYTES, sniff_content
 
 
 router = APIRouter()
+logger = get_logger("api.analyze")
+
+# Plain-text uploads treated as prose for cross-file deduplication; code, CSV and JSON are not.
+PROSE_SUFFIXES = (".txt", ".md", ".markdown", ".rst", ".text")
 
 _coordinator: CoordinatorAgent | None = None
 
@@ -25,6 +36,7 @@ def get_coordinator() -> CoordinatorAgent:
 class AnalyzeRequest(BaseModel):
     text: Optional[str] = None
     session_id: str = "default"
+    latency_slo_ms: Optional[int] = None
 
 
 class AnalyzeResponse(BaseModel):
@@ -35,6 +47,7 @@ class AnalyzeResponse(BaseModel):
 
 @router.post("/analyze", response_model=AnalyzeResponse)
 async def analyze_text(
+    http_request: Request,
     request: AnalyzeRequest,
     coordinator: CoordinatorAgent = Depends(get_coordinator),
     session_mgr: SessionManager = Depends(get_session_manager),
@@ -44,18 +57,21 @@ async def analyze_text(
         raise HTTPException(status_code=400, detail="Text is required")
 
     stats = await session_mgr.get_stats(request.session_id, settings.llm_model)
-    result = await coordinator.process(
-        session_id=request.session_id,
-        stats=stats,
-        message=request.text,
-        extracted_text=None
-    )
+    async with get_scheduler().slot(Priority.INTERACTIVE, request.session_id):
+        result = await coordinator.process(
+            session_id=request.session_id,
+            stats=stats,
+            message=request.text,
+            extracted_text=None,
+            latency_slo_ms=request.latency_slo_ms
+        )
 
-    return AnalyzeResponse(**result)
+    return fast_response(http_request, AnalyzeResponse.model_construct(**result))
 
 
 @router.post("/analyze/file", response_model=AnalyzeResponse)
 async def analyze_file(
+    request: Request,
     file: UploadFile = File(...),
     session_id: str = Form("default"),
     message: Optional[str] = Form(None),
@@ -67,24 +83,33 @@ async def analyze_file(
     validate_upload(file)
 
     content = await file.read()
-    extraction = await extract_content(content, file.filename)
+    if _is_archive(content, file.filename):
+        stats = await session_mgr.get_stats(session_id, settings.llm_model)
+        async with get_scheduler().slot(Priority.BULK, session_id, upload_cost(len(content))):
+            result = await coordinator.analyze_project(session_id, stats, content, message)
+        return fast_response(request, AnalyzeResponse.model_construct(**result))
 
-    if extraction.error:
-        raise HTTPException(status_code=400, detail=extraction.error)
+    async with get_scheduler().slot(Priority.BULK, session_id, upload_cost(len(content))):
+        extraction = await extract_content(content, file.filename, settings.content_max_length)
 
-    stats = await session_mgr.get_stats(session_id, settings.llm_model)
-    result = await coordinator.process(
-        session_id=session_id,
-        stats=stats,
-        message=message,
-        extracted_text=extraction.extracted_text
-    )
+        if extraction.error:
+            raise HTTPException(status_code=400, detail=extraction.error)
 
-    return AnalyzeResponse(**result)
+        stats = await session_mgr.get_stats(session_id, settings.llm_model)
+        result = await coordinator.process(
+            session_id=session_id,
+            stats=stats,
+            message=message,
+            extracted_text=extraction.extracted_text
+        )
+
+    background = BackgroundTask(coordinator.speculate, session_id, stats) if extraction.extracted_text else None
+    return fast_response(request, AnalyzeResponse.model_construct(**result), background=background)
 
 
 @router.post("/analyze/upload", response_model=AnalyzeResponse)
 async def analyze_upload(
+    request: Request,
     files: list[UploadFile] = File(default=[]),
     text: str = Form(""),
     session_id: str = Form("default"),
@@ -96,35 +121,99 @@ async def analyze_upload(
     from api.middleware.validation import validate_upload
     
     extracted_texts = []
+    # The coordinator truncates context to content_max_length anyway, so
+    # extraction stops once the combined budget is spent.
+    budget = settings.content_max_length
+    # One deduplicator across all documents, so text repeated between near-identical uploads is sent once
+    dedup = BlockDeduplicator(settings.compaction_min_block_chars) if settings.compaction_enabled else None
     
-    # Process each uploaded file
+    uploads = []
     for file in files:
         validate_upload(file)
-        content = await file.read()
-        extraction = await extract_content(content, file.filename)
-        
-        if extraction.error:
-            # Continue with other files, log error
-            extracted_texts.append(f"[Error processing {file.filename}: {extraction.error}]")
-        elif extraction.extracted_text:
-            extracted_texts.append(f"[From {file.filename}]:\n{extraction.extracted_text}")
-    
-    # Combine all extracted text
-    combined_extraction = "\n\n".join(extracted_texts) if extracted_texts else None
-    
-    # If no text and no valid extractions, error
-    if not text.strip() and not combined_extraction:
-        raise HTTPException(status_code=400, detail="Please provide text or valid files")
-    
-    stats = await session_mgr.get_stats(session_id, settings.llm_model)
-    result = await coordinator.process(
-        session_id=session_id,
-        stats=stats,
-        message=text,
-        extracted_text=combined_extraction
-    )
-
-    return AnalyzeResponse(**result)
+        uploads.append((await file.read(), file.filename))
+
+    # An archive turns the request into a project-wide code analysis
+    archives = [content for content, filename in uploads if _is_archive(content, filename)]
+    if archives:
+        if len(archives) > 1 or len(uploads) > 1:
+            raise HTTPException(status_code=400, detail="Upload a project archive on its own")
+        stats = await session_mgr.get_stats(session_id, settings.llm_model)
+        async with get_scheduler().slot(Priority.BULK, session_id, upload_cost(len(archives[0]))):
+            result = await coordinator.analyze_project(session_id, stats, archives[0], text)
+        return fast_response(request, AnalyzeResponse.model_construct(**result))
+
+    # Uploads run in the bulk class so they cannot take capacity from plain chat turns
+    priority = Priority.BULK if uploads else Priority.INTERACTIVE
+    total_bytes = sum(len(content) for content, _ in uploads)
+    async with get_scheduler().slot(priority, session_id, upload_cost(total_bytes)):
+        images = image_indexes(uploads)
+        prefetched: dict[int, ExtractionResult] = {}
+
+        # Process each uploaded file
+        for index, (content, filename) in enumerate(uploads):
+            if budget <= 0:
+                logger.info("upload_skipped_budget_exhausted", filename=filename)
+                continue
+            extraction = prefetched.pop(index, None)
+            if extraction is None and index in images:
+                # Images are OCR'd together in batched vision calls rather than one call each,
+                # a batch at a time so none is paid for once the budget is spent
+                batch = [i for i in images if i >= index][:settings.image_batch_size]
+                extracted = await extract_images_batched([uploads[i] for i in batch], budget)
+                prefetched.update((i, result) for i, result in zip(batch, extracted) if result is not None)
+                extraction = prefetched.pop(index, None)
+            if extraction is None:
+                extraction = await extract_content(content, filename, budget)
+
+            if extraction.error:
+                # Continue with other files, log error
+                parts = [f"[Error processing {filename}: {extraction.error}]"]
+            elif extraction.extracted_text:
+                body = extraction.extracted_text
+                if dedup is not None and _is_prose(extraction, filename):
+                    body, _ = dedup.compact(body)
+                # Header and body stay separate so the text is copied only once, by the join below
+                parts = [f"[From {filename}]:\n", body]
+            else:
+                continue
+            if extracted_texts:
+                extracted_texts.append("\n\n")
+            extracted_texts.extend(parts)
+            budget -= sum(len(p) for p in parts) + 2
+
+        if dedup is not None and dedup.stats.blocks_removed:
+            logger.info("upload_compacted", files=len(uploads), **dedup.stats.to_dict())
+
+        # Combine all extracted text
+        combined_extraction = "".join(extracted_texts) if extracted_texts else None
+
+        # If no text and no valid extractions, error
+        if not text.strip() and not combined_extraction:
+            raise HTTPException(status_code=400, detail="Please provide text or valid files")
+
+        stats = await session_mgr.get_stats(session_id, settings.llm_model)
+        result = await coordinator.process(
+            session_id=session_id,
+            stats=stats,
+            message=text,
+            extracted_text=combined_extraction
+        )
+
+    # Background work on the upload starts only once this response is out
+    background = BackgroundTask(coordinator.speculate, session_id, stats) if combined_extraction else None
+    return fast_response(request, AnalyzeResponse.model_construct(**result), background=background)
+
+
+def _is_archive(content: bytes, filename: str | None) -> bool:
+    """A zip of a project; .docx, .xlsx, .jar and other zip-based formats are not."""
+    return sniff_content(content[:SNIFF_BYTES]).file_type == "archive" and is_project_archive(content, filename)
+
+
+def _is_prose(extraction: ExtractionResult, filename: str | None) -> bool:
+    """Document text that may be deduplicated across files; code and data files are left whole."""
+    if extraction.input_type in (InputType.PDF, InputType.IMAGE):
+        return True
+    return extraction.input_type == InputType.TEXT and (filename or "").lower().endswith(PROSE_SUFFIXES)
 
 
 @router.post("/reset/{session_id}")
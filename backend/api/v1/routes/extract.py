@@ -1,12 +1,19 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File, Depends
+from typing import AsyncIterator
+
+from fastapi import APIRouter, HTTPException, Query, Request, UploadFile, File, Depends
+from fastapi.responses import StreamingResponse
+from pydantic_core import to_json
 
 from api.middleware.validation import validate_upload
+from api.responses import fast_response
 from core.extractors.extractor import extract_content
-from core.extractors.youtube import extract_youtube
+from infrastructure.logging import get_logger
+from infrastructure.scheduler import Priority, get_scheduler, upload_cost
 from schemas import ExtractionResult
 
 
 router = APIRouter()
+logger = get_logger("api.extract")
 
 
 class YouTubeRequest:
@@ -14,6 +21,11 @@ class YouTubeRequest:
         self.url = url
 
 
+def _client_key(request: Request) -> str:
+    """Fairness key for routes without a session: the caller's address."""
+    return request.client.host if request.client else "anonymous"
+
+
 async def validated_file_content(file: UploadFile = File(...)) -> tuple[bytes, str]:
     validate_upload(file)
     content = await file.read()
@@ -21,41 +33,72 @@ async def validated_file_content(file: UploadFile = File(...)) -> tuple[bytes, s
 
 
 @router.post("/extract/pdf")
-async def extract_from_pdf(file: UploadFile = File(...)):
+async def extract_from_pdf(
+    request: Request,
+    file: UploadFile = File(...),
+    stream: bool = Query(False, description="Emit NDJSON records per page as they are extracted")
+):
     validate_upload(file)
     if not file.filename or not file.filename.endswith(".pdf"):
         raise HTTPException(status_code=400, detail="File must be a PDF")
 
     content = await file.read()
-    result = await extract_content(content, file.filename)
-    return result.model_dump()
+    if stream:
+        return StreamingResponse(_pdf_page_records(content, _client_key(request)), media_type="application/x-ndjson")
+
+    async with get_scheduler().slot(Priority.BULK, _client_key(request), upload_cost(len(content))):
+        result = await extract_content(content, file.filename)
+    return fast_response(request, result)
 
 
 @router.post("/extract/image")
 async def extract_from_image(
+    request: Request,
     file_data: tuple[bytes, str] = Depends(validated_file_content)
 ):
     content, filename = file_data
-    result = await extract_content(content, filename)
-    return result.model_dump()
+    async with get_scheduler().slot(Priority.BULK, _client_key(request), upload_cost(len(content))):
+        result = await extract_content(content, filename)
+    return fast_response(request, result)
 
 
 @router.post("/extract/audio")
 async def extract_from_audio(
+    request: Request,
     file_data: tuple[bytes, str] = Depends(validated_file_content)
 ):
     content, filename = file_data
-    result = await extract_content(content, filename)
-    return result.model_dump()
+    async with get_scheduler().slot(Priority.BULK, _client_key(request), upload_cost(len(content))):
+        result = await extract_content(content, filename)
+    return fast_response(request, result)
 
 
 @router.post("/extract/youtube")
-async def extract_from_youtube(url: str):
-    result = await extract_youtube(url)
+async def extract_from_youtube(request: Request, url: str):
+    from core.extractors.youtube import extract_youtube
+    async with get_scheduler().slot(Priority.BULK, _client_key(request)):
+        result = await extract_youtube(url)
 
     if result.error:
         raise HTTPException(status_code=400, detail=result.error)
 
-    return result.model_dump()
+    return fast_response(request, result)
+
+
+async def _pdf_page_records(content: bytes, client_key: str) -> AsyncIterator[bytes]:
+    """One NDJSON record per page, then a summary record. Page text is not retained."""
+    from core.extractors.pdf import stream_pdf_pages
 
+    pages = chars = 0
+    error = None
+    async with get_scheduler().slot(Priority.BULK, client_key, upload_cost(len(content))):
+        try:
+            async for number, text in stream_pdf_pages(content):
+                pages += 1
+                chars += len(text)
+                yield to_json({"type": "page", "page": number, "text": text, "chars": len(text)}) + b"\n"
+        except Exception as e:
+            logger.error("pdf_stream_failed", error=str(e), exc_info=True)
+            error = str(e)
 
+    yield to_json({"type": "summary", "pages": pages, "chars": chars, "error": error}) + b"\n"
@@ -1,4 +1,9 @@
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from infrastructure.circuit_breaker import GEMINI_CHAT, BreakerState, breaker_states
+from infrastructure.metrics import get_metrics
+from infrastructure.readiness import get_readiness
 
 
 router = APIRouter()
@@ -11,10 +16,33 @@ async def health_check():
 
 @router.get("/health/ready")
 async def readiness_check():
-    return {
-        "status": "ready",
+    readiness = get_readiness()
+    if not readiness.ready:
+        # Keeps the pod out of rotation until start-up warm-up has succeeded.
+        return JSONResponse(
+            status_code=503,
+            content={"status": "starting", "warmup": readiness.checks}
+        )
+
+    dependencies = breaker_states()
+    degraded = any(d["state"] != BreakerState.CLOSED.value for d in dependencies.values())
+    llm_state = dependencies[GEMINI_CHAT]["state"]
+    body = {
+        "status": "degraded" if degraded else "ready",
         "checks": {
             "api": "ok",
-            "llm": "ok"
-        }
+            "llm": "ok" if llm_state == BreakerState.CLOSED.value else llm_state
+        },
+        "warmup": readiness.checks,
+        "dependencies": dependencies
     }
+    if llm_state == BreakerState.OPEN.value:
+        # Every analysis needs the LLM; take the pod out of rotation until a probe call gets through.
+        body["status"] = "unavailable"
+        return JSONResponse(status_code=503, content=body)
+    return body
+
+
+@router.get("/metrics")
+async def metrics():
+    return get_metrics().snapshot()
@@ -0,0 +1,104 @@
+import asyncio
+import json
+import time
+from contextlib import suppress
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+
+from infrastructure.config import get_settings
+from infrastructure.logging import get_logger
+from infrastructure.metrics import get_metrics
+from infrastructure.transcription import DeepgramStream
+
+
+router = APIRouter()
+logger = get_logger("api.transcribe")
+
+# Send a KeepAlive upstream when no audio has arrived for this long.
+KEEPALIVE_INTERVAL_SEC = 5.0
+
+
+def _is_stop(text: str) -> bool:
+    try:
+        message = json.loads(text)
+    except ValueError:
+        return False
+    return isinstance(message, dict) and message.get("type") == "stop"
+
+
+@router.websocket("/transcribe/stream")
+async def transcribe_stream(
+    websocket: WebSocket,
+    encoding: str | None = None,
+    sample_rate: int | None = None,
+    language: str = "en"
+):
+    """Relay audio frames to streaming transcription and push transcripts back.
+
+    The client sends binary audio frames and a ``{"type": "stop"}`` text
+    message when done. The server sends ``transcript`` messages (interim and
+    final) as they arrive, then ``{"type": "done"}``.
+    """
+    await websocket.accept()
+    settings = get_settings()
+    metrics = get_metrics()
+
+    if not settings.deepgram_api_key:
+        await websocket.send_json({"type": "error", "detail": "Transcription is not configured"})
+        await websocket.close(code=1011)
+        return
+
+    last_frame_at = time.perf_counter()
+
+    try:
+        async with DeepgramStream(encoding, sample_rate, language) as upstream:
+            async def keep_alive():
+                while True:
+                    await asyncio.sleep(KEEPALIVE_INTERVAL_SEC)
+                    if time.perf_counter() - last_frame_at >= KEEPALIVE_INTERVAL_SEC:
+                        await upstream.keep_alive()
+
+            async def pump_audio():
+                nonlocal last_frame_at
+                keep_alive_task = asyncio.create_task(keep_alive())
+                try:
+                    while True:
+                        message = await websocket.receive()
+                        if message["type"] == "websocket.disconnect":
+                            break
+                        if message.get("bytes"):
+                            last_frame_at = time.perf_counter()
+                            await upstream.send_audio(message["bytes"])
+                        elif message.get("text") and _is_stop(message["text"]):
+                            break
+                        # Other text frames are not part of the protocol and are ignored.
+                finally:
+                    keep_alive_task.cancel()
+                    # Without this the events loop would wait for the backend's own timeout.
+                    with suppress(Exception):
+                        await upstream.finish()
+
+            audio_task = asyncio.create_task(pump_audio())
+            try:
+                async for event in upstream.events():
+                    metrics.observe("transcription_lag_seconds", time.perf_counter() - last_frame_at, final=event.is_final)
+                    await websocket.send_json(event.to_dict())
+            finally:
+                audio_task.cancel()
+                with suppress(asyncio.CancelledError, WebSocketDisconnect):
+                    await audio_task
+
+        await websocket.send_json({"type": "done"})
+        await websocket.close()
+    except WebSocketDisconnect:
+        metrics.increment("transcription_streams_total", outcome="client_disconnect")
+        return
+    except Exception as e:
+        metrics.increment("transcription_streams_total", outcome="error")
+        logger.error("transcription_stream_failed", error=str(e), exc_info=True)
+        with suppress(Exception):
+            await websocket.send_json({"type": "error", "detail": "Transcription failed"})
+            await websocket.close(code=1011)
+        return
+
+    metrics.increment("transcription_streams_total", outcome="ok")
@@ -0,0 +1,38 @@
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from api.auth import require_admin
+from infrastructure.usage_ledger import GROUP_BY_COLUMNS, get_usage_ledger
+
+
+# Per-session usage and cost is operator data.
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+def _timestamp(value: datetime | None) -> float | None:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+@router.get("/usage")
+async def usage_summary(
+    start: datetime | None = Query(None, description="Inclusive lower bound (ISO 8601, UTC if no offset)"),
+    end: datetime | None = Query(None, description="Exclusive upper bound (ISO 8601, UTC if no offset)"),
+    group_by: list[str] = Query(["model"], description=f"Any of: {', '.join(GROUP_BY_COLUMNS)}")
+):
+    """Aggregate LLM and extraction usage from the durable ledger."""
+    try:
+        rows = await get_usage_ledger().aggregate(_timestamp(start), _timestamp(end), group_by)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {
+        "start": start.isoformat() if start else None,
+        "end": end.isoformat() if end else None,
+        "group_by": group_by,
+        "rows": rows
+    }
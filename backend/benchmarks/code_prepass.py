@@ -0,0 +1,71 @@
+"""Cost of the static Python pre-pass and how much it shrinks code-analysis prompts.
+
+Builds a synthetic module of mostly trivial helpers plus a few functions
+with nested loops, recursion and obvious issues, then times
+``compact_python`` and compares prompt sizes with sending the full source.
+
+    python -m benchmarks.code_prepass --functions 200
+"""
+import argparse
+import json
+import time
+
+from infrastructure.config import get_settings
+from utils.code_facts import compact_python
+
+
+TRIVIAL = '''
+def get_{i}(self):
+    """Return field {i}."""
+    # Plain accessor kept for API compatibility.
+    return self._field_{i}
+'''
+
+INTERESTING = '''
+def search_{i}(items, target, seen=[]):
+    """Find pairs summing to target."""
+    for a in items:
+        for b in items:
+            if a + b == target:
+                seen.append((a, b))
+    try:
+        return search_{i}(items[1:], target)
+    except:
+        return None
+'''
+
+
+def build_source(functions: int, interesting_every: int) -> str:
+    header = "import os\nimport sys\nfrom collections import defaultdict\n"
+    parts = [
+        INTERESTING.format(i=i) if i % interesting_every == 0 else TRIVIAL.format(i=i)
+        for i in range(functions)
+    ]
+    return header + "".join(parts)
+
+
+def measure(source: str, max_chars: int, repeat: int) -> dict:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        prompt, facts = compact_python(source, max_chars)
+    elapsed = (time.perf_counter() - start) / repeat
+    return {
+        "source_chars": len(source),
+        "prompt_chars": len(prompt),
+        "reduction_pct": round(100 * (1 - len(prompt) / len(source)), 1),
+        "approx_tokens_saved": (len(source) - len(prompt)) // 4,
+        "functions": len(facts.functions),
+        "issues": len(facts.issues),
+        "prepass_ms": round(elapsed * 1000, 2),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--functions", type=int, default=200)
+    parser.add_argument("--interesting-every", type=int, default=20)
+    parser.add_argument("--max-chars", type=int, default=get_settings().code_prepass_max_chars)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    source = build_source(args.functions, args.interesting_every)
+    print(json.dumps(measure(source, args.max_chars, args.repeat), indent=2))
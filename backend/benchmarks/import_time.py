@@ -0,0 +1,49 @@
+"""Cold-start benchmark: time to import the app in a fresh interpreter.
+
+Run from the backend directory:
+
+    python -m benchmarks.import_time --runs 5
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+
+HEAVY_MODULES = ["PyPDF2", "PIL", "google.genai", "httpx", "langchain_google_genai"]
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import main
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "loaded": [m for m in %r if m in sys.modules]}))
+""" % (HEAVY_MODULES,)
+
+
+def measure(runs: int) -> dict:
+    timings = []
+    loaded: list[str] = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", _PROBE],
+            capture_output=True, text=True, check=True
+        ).stdout.strip().splitlines()[-1]
+        result = json.loads(output)
+        timings.append(result["seconds"])
+        loaded = result["loaded"]
+
+    return {
+        "runs": runs,
+        "median_ms": round(statistics.median(timings) * 1000, 1),
+        "min_ms": round(min(timings) * 1000, 1),
+        "heavy_modules_loaded": loaded,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    print(json.dumps(measure(args.runs), indent=2))
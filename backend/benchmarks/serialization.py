@@ -0,0 +1,61 @@
+"""Serialization time and wire bytes for a large extraction response.
+
+Compares FastAPI's default path (model_dump -> jsonable_encoder -> json.dumps)
+with the fast path used by api.responses, and the size of each encoding.
+
+    python -m benchmarks.serialization --chars 300000
+"""
+import argparse
+import gzip
+import json
+import time
+
+from fastapi.encoders import jsonable_encoder
+
+from api.responses import brotli, encode_body, msgpack, MSGPACK_MEDIA_TYPE
+from schemas import ExtractionResult, InputType
+
+
+def _payload(chars: int) -> ExtractionResult:
+    sentence = "The quarterly report shows revenue growth across all regions. "
+    text = (sentence * (chars // len(sentence) + 1))[:chars]
+    return ExtractionResult(input_type=InputType.PDF, extracted_text=text, metadata={"pages": chars // 3000})
+
+
+def _time(func, runs: int) -> float:
+    start = time.perf_counter()
+    for _ in range(runs):
+        func()
+    return round((time.perf_counter() - start) / runs * 1000, 3)
+
+
+def measure(chars: int, runs: int) -> dict:
+    result = _payload(chars)
+    default_body = json.dumps(jsonable_encoder(result.model_dump())).encode()
+    fast_body, _ = encode_body(result)
+
+    report = {
+        "serialize_ms": {
+            "fastapi_default": _time(lambda: json.dumps(jsonable_encoder(result.model_dump())).encode(), runs),
+            "fast_json": _time(lambda: encode_body(result), runs),
+        },
+        "wire_bytes": {
+            "json": len(default_body),
+            "gzip": len(gzip.compress(fast_body, compresslevel=5)),
+        },
+    }
+    report["serialize_ms"]["gzip"] = _time(lambda: gzip.compress(fast_body, compresslevel=5), runs)
+    if brotli is not None:
+        report["wire_bytes"]["br"] = len(brotli.compress(fast_body, quality=4))
+        report["serialize_ms"]["br"] = _time(lambda: brotli.compress(fast_body, quality=4), runs)
+    if msgpack is not None:
+        report["wire_bytes"]["msgpack"] = len(encode_body(result, MSGPACK_MEDIA_TYPE)[0])
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chars", type=int, default=300_000)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+    print(json.dumps(measure(args.chars, args.runs), indent=2))
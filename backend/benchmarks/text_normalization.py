@@ -0,0 +1,59 @@
+"""Peak memory and CPU of normalizing a large multi-page document.
+
+Compares the previous pipeline (join pages, ``re.sub`` the whole text,
+slice to the budget) with the streaming normalizer.
+
+    python -m benchmarks.text_normalization --pages 2000
+"""
+import argparse
+import json
+import re
+import time
+import tracemalloc
+
+from infrastructure.config import get_settings
+from utils.text import normalize_chunks
+
+
+def _pages(count: int):
+    paragraph = "Lorem ipsum  dolor sit amet,\tconsectetur adipiscing elit.\n" * 12
+    for i in range(count):
+        yield f"Page {i}\n\n{paragraph}\n  \n{paragraph}"
+
+
+def legacy(count: int, max_length: int) -> str:
+    text = "\n".join(_pages(count))
+    text = re.sub(r"\s+", " ", text).strip()
+    return text[:max_length] if len(text) > max_length else text
+
+
+def streaming(count: int, max_length: int) -> str:
+    def _with_breaks():
+        for page in _pages(count):
+            yield page
+            yield "\n"
+    return "".join(normalize_chunks(_with_breaks(), max_length))
+
+
+def measure(func, count: int, max_length: int) -> dict:
+    start = time.perf_counter()
+    text = func(count, max_length)
+    elapsed = time.perf_counter() - start
+
+    # Timed separately: tracemalloc slows down small allocations.
+    tracemalloc.start()
+    func(count, max_length)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"ms": round(elapsed * 1000, 1), "peak_kb": peak // 1024, "chars": len(text)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=2000)
+    parser.add_argument("--max-length", type=int, default=get_settings().content_max_length)
+    args = parser.parse_args()
+    print(json.dumps({
+        "legacy": measure(legacy, args.pages, args.max_length),
+        "streaming": measure(streaming, args.pages, args.max_length),
+    }, indent=2))
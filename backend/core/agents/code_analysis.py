@@ -1,6 +1,11 @@
 from pydantic import BaseModel, Field
 from langchain_core.messages import HumanMessage, SystemMessage
-from infrastructure.llm.client import get_llm_client
+from infrastructure.config import get_settings
+from infrastructure.llm.router import RoutedResponse, get_model_router
+from infrastructure.logging import get_logger
+from utils.code_facts import compact_python
+from schemas import TaskType
+from utils.errors import DeadlineExceededError, ServiceUnavailableError
 
 
 class CodeAnalysisOutput(BaseModel):
@@ -11,28 +16,100 @@ class CodeAnalysisOutput(BaseModel):
     space_complexity: str = Field(default="N/A", description="Big O space complexity")
 
 
+logger = get_logger("agent.code_analysis")
+
+
 class CodeAnalysisAgent:
     def __init__(self):
-        self.llm = get_llm_client()
-    
-    async def run(self, code: str) -> str:
-        try:
-            llm_structured = self.llm.with_structured_output(CodeAnalysisOutput)
-            
-            response = await llm_structured.ainvoke([
+        self.router = get_model_router()
+        self.settings = get_settings()
+
+    def _prompt(self, code: str, filename: str | None) -> tuple[str, list[str]]:
+        """The user prompt, plus issues found statically.
+
+        Larger Python sources are replaced by a locally computed facts summary
+        and the functions that matter for complexity and bugs.
+        """
+        source = f" from `{filename}`" if filename else ""
+        full = f"Analyze the following code{source}:\n\n```\n{code}\n```"
+
+        is_python = filename is None or filename.endswith((".py", ".pyw"))
+        if not (self.settings.code_prepass_enabled and is_python and len(code) >= self.settings.code_prepass_min_chars):
+            return full, []
+        compacted = compact_python(code, self.settings.code_prepass_max_chars)
+        if compacted is None:
+            return full, []
+
+        summary, facts = compacted
+        prompt = (
+            f"Analyze the following Python code{source}. The structure below was computed by a "
+            f"parser and is reliable; base complexity on the loop depths and recursion it reports. "
+            f"The outline shows all module-level code with function bodies elided; functions "
+            f"neither shown in full nor listed as omitted for size contain no loops, recursion "
+            f"or detected issues.\n\n{summary}"
+        )
+        if len(prompt) >= len(full):
+            return full, []
+        logger.info("code_prepass_applied", chars=len(code), prompt_chars=len(prompt), functions=len(facts.functions))
+        return prompt, facts.issues
+
+    async def analyze(
+        self,
+        code: str,
+        filename: str | None = None,
+        latency_slo_ms: int | None = None,
+        prompt: str | None = None,
+        focus: str = ""
+    ) -> RoutedResponse:
+        """Structured analysis of one piece of code; ``routed.output`` is a CodeAnalysisOutput.
+
+        ``prompt`` replaces the one built from ``code``, e.g. to revise an earlier analysis.
+        ``focus`` is the user's own request, passed along to the model.
+        """
+        static_issues: list[str] = []
+        if prompt is None:
+            prompt, static_issues = self._prompt(code, filename)
+        if focus:
+            prompt = f"{prompt}\n\nThe user asks: {focus}"
+        routed = await self.router.ainvoke(
+            TaskType.CODE_EXPLAIN,
+            [
                 SystemMessage(content="You are a code analysis expert. Analyze the given code for functionality, bugs, and complexity."),
-                HumanMessage(content=f"Analyze the following code:\n\n```\n{code}\n```")
-            ])
-            
-            bugs = "\n".join(f"⚠️ {b}" for b in response.bugs) if response.bugs else "✅ No issues found"
-            
-            return (
-                f"## Code Analysis\n\n"
-                f"{response.explanation}\n\n"
-                f"**Complexity:**\n"
-                f"- Time: {response.time_complexity}\n"
-                f"- Space: {response.space_complexity}\n\n"
-                f"**Issues:**\n{bugs}"
-            )
+                HumanMessage(content=prompt)
+            ],
+            schema=CodeAnalysisOutput,
+            input_chars=len(prompt),
+            latency_slo_ms=latency_slo_ms
+        )
+        # Issues found by the parser are reported even if the model glosses over them.
+        missing = [issue for issue in static_issues if issue not in routed.output.bugs]
+        routed.output.bugs = [*routed.output.bugs, *missing]
+        return routed
+
+    @staticmethod
+    def format(response: CodeAnalysisOutput) -> str:
+        bugs = "\n".join(f"⚠️ {b}" for b in response.bugs) if response.bugs else "✅ No issues found"
+
+        return (
+            f"## Code Analysis\n\n"
+            f"{response.explanation}\n\n"
+            f"**Complexity:**\n"
+            f"- Time: {response.time_complexity}\n"
+            f"- Space: {response.space_complexity}\n\n"
+            f"**Issues:**\n{bugs}"
+        )
+
+    async def run(
+        self,
+        code: str,
+        latency_slo_ms: int | None = None,
+        prompt: str | None = None
+    ) -> tuple[str, RoutedResponse | None]:
+        """Analyze code. Returns (markdown, routed response) or (error text, None)."""
+        try:
+            routed = await self.analyze(code, latency_slo_ms=latency_slo_ms, prompt=prompt)
+            return self.format(routed.output), routed
+        except (DeadlineExceededError, ServiceUnavailableError):
+            raise
         except Exception as e:
-            return f"Error analyzing code: {e}"
+            return f"Error analyzing code: {e}", None
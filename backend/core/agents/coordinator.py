@@ -1,18 +1,36 @@
 import time
 
-from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
 
-from infrastructure.llm.client import get_llm_client
+from infrastructure.llm.context_cache import get_context_cache
+from infrastructure.llm.router import RoutedResponse, get_model_router
+from infrastructure.llm.similarity_cache import get_similarity_cache
 from infrastructure.llm.stats import TokenStats
 from infrastructure.config import get_settings
+from infrastructure.dependencies import get_session_manager
 from infrastructure.logging import get_logger
-from utils.errors import AgentError
-from .summarize import SummarizeAgent
-from .code_analysis import CodeAnalysisAgent
+from infrastructure.metrics import get_metrics
+from infrastructure.session_manager import PriorAnalysis, SessionDocument
+from schemas import TaskType
+from utils.errors import AgentError, DeadlineExceededError, ServiceUnavailableError
+from .summarize import SummarizeAgent, SummaryOutput
+from .code_analysis import CodeAnalysisAgent, CodeAnalysisOutput
+from .incremental import revision_prompt
+from .memory import ConversationHistory, render_transcript
+from .project_analysis import ProjectAnalysisAgent
+from .speculative import SpeculativeSummarizer
 
 
 logger = get_logger("agent.coordinator")
 
+CHAT_SYSTEM_PROMPT = "You are a helpful AI assistant. Respond naturally and conversationally."
+
+# What each command's result is called in a revision prompt.
+REVISION_SUBJECTS = {
+    "code": "code analysis",
+    "summarize": "summary",
+}
+
 
 class CoordinatorAgent:
     """Routes messages to appropriate handlers based on slash commands."""
@@ -28,17 +46,27 @@ class CoordinatorAgent:
     }
     
     def __init__(self):
-        self.llm = get_llm_client()
+        self.router = get_model_router()
+        self.context_cache = get_context_cache()
+        self.similarity_cache = get_similarity_cache()
         self.settings = get_settings()
         self.summarize_agent = SummarizeAgent()
         self.code_agent = CodeAnalysisAgent()
+        self.project_agent = ProjectAnalysisAgent(self.code_agent)
+        self.speculator = SpeculativeSummarizer(self.summarize_agent)
+        self.memory = ConversationHistory()
+
+    def warm(self) -> int:
+        """Build the model clients and structured-output chains the agents use, for every routable model."""
+        return self.router.prepare([SummaryOutput, CodeAnalysisOutput])
 
     async def process(
         self,
         session_id: str,
         stats: TokenStats,
         message: str | None = None,
-        extracted_text: str | None = None
+        extracted_text: str | None = None,
+        latency_slo_ms: int | None = None
     ) -> dict:
         content = extracted_text or ""
         user_message = message or ""
@@ -56,24 +84,46 @@ class CoordinatorAgent:
 
         # Check for slash commands
         command, remaining_message = self._parse_command(user_message)
-        
+
+        # In speculative mode the session keeps its last upload for follow-ups that don't resend it
+        document = None
+        if self.speculator.enabled:
+            document = self.speculator.remember(session_id, content) if content else self.speculator.document(session_id)
+
         if command == "code":
             # Use remaining message or extracted content for code analysis
             code_content = remaining_message.strip() or content
             if not code_content:
                 response = "Please provide code to analyze after the `/code_analysis` command."
             else:
-                response = await self._explain_code(code_content, stats)
+                response = await self._explain_code(code_content, stats, latency_slo_ms, session_id)
         elif command == "summarize":
             # Use remaining message or extracted content for summarization
-            text_content = remaining_message.strip() or content
-            if not text_content:
+            text_content = remaining_message.strip() or content or (document.text if document else "")
+            summary = None
+            summarized = document if document is not None and text_content == document.text else None
+            if summarized is not None:
+                summary = await self.speculator.summary(summarized)
+            if summary is not None:
+                stats.speculative_served += 1
+                response = summary
+            elif not text_content:
                 response = "Please provide text to summarize after the `/summarize` command."
             else:
-                response = await self._summarize(text_content, stats)
+                response = await self._summarize(text_content, stats, latency_slo_ms, session_id, summarized)
         else:
+            context = content
+            if not context and document is not None:
+                context = self._followup_context(document, user_message)
             # Normal chat - no special agents
-            response = await self._general_chat(user_message, content, stats)
+            response = await self._general_chat(user_message, context, stats, latency_slo_ms, session_id)
+
+        self.memory.record(
+            session_id,
+            stats,
+            f"[Uploaded a document]\n{user_message}".strip() if content else user_message,
+            response
+        )
 
         return {
             "response": response,
@@ -81,6 +131,50 @@ class CoordinatorAgent:
             "stats": stats.to_dict()
         }
 
+    async def speculate(self, session_id: str, stats: TokenStats) -> None:
+        """Start the background work on the session's uploaded document.
+
+        Called once the upload's response has been sent, so the work doesn't
+        compete with it for the scheduler or the rate limit.
+        """
+        document = self.speculator.document(session_id) if self.speculator.enabled else None
+        if document is not None:
+            self.speculator.speculate(session_id, stats, document)
+
+    async def analyze_project(
+        self,
+        session_id: str,
+        stats: TokenStats,
+        archive: bytes,
+        message: str | None = None,
+        latency_slo_ms: int | None = None
+    ) -> dict:
+        """Code analysis over every source file in a zip archive, with the message as the user's focus."""
+        _, focus = self._parse_command(message or "")
+        report = await self.project_agent.run(archive, latency_slo_ms, focus)
+        for input_chars, output_chars, routed in report.calls:
+            stats.add(input_chars // 4, output_chars // 4, routed.latency_sec, routed.model, hedged=routed.hedged)
+
+        return {
+            "response": report.markdown,
+            "requires_clarification": False,
+            "stats": stats.to_dict()
+        }
+
+    def _followup_context(self, document: SessionDocument, question: str) -> str:
+        """The parts of the session's document relevant to ``question``, once it has been indexed.
+
+        A document big enough for the provider-side context cache is sent
+        whole, so every follow-up reuses the same cache entry.
+        """
+        max_chars = self.settings.followup_context_chars
+        model = self.router.route(TaskType.CHAT, len(question) + len(document.text))[0]
+        if self.context_cache.should_cache(document.text, model):
+            return document.text
+        if document.index is None:
+            return document.text[:max_chars]
+        return document.index.context(question, max_chars)
+
     def _parse_command(self, message: str) -> tuple[str | None, str]:
         """Parse slash command from message. Returns (command_type, remaining_message)."""
         if not message:
@@ -95,26 +189,148 @@ class CoordinatorAgent:
         
         return None, message
 
-    async def _summarize(self, content: str, stats: TokenStats) -> str:
-        start_time = time.time()
-        response = await self.summarize_agent.run(content)
-        stats.add(len(content) // 4, len(response) // 4, time.time() - start_time)
+    async def _summarize(
+        self,
+        content: str,
+        stats: TokenStats,
+        latency_slo_ms: int | None = None,
+        session_id: str = "default",
+        document: SessionDocument | None = None
+    ) -> str:
+        """Summarize ``content``; the summary is kept on ``document``, the session's copy of it, if given.
+
+        That way the background work on the document only indexes it
+        instead of summarizing it a second time.
+        """
+        cached, fingerprint = await self.similarity_cache.lookup("summarize", session_id, content)
+        if cached is not None:
+            stats.near_duplicate_hits += 1
+            response = cached
+        else:
+            response, routed = await self._analyze("summarize", self.summarize_agent, content, stats, latency_slo_ms, session_id)
+            if routed is None:
+                return response
+            self.similarity_cache.store(fingerprint, response)
+        if document is not None:
+            document.summary = response
         return response
 
-    async def _explain_code(self, code: str, stats: TokenStats) -> str:
+    async def _explain_code(
+        self,
+        code: str,
+        stats: TokenStats,
+        latency_slo_ms: int | None = None,
+        session_id: str = "default"
+    ) -> str:
+        response, _ = await self._analyze("code", self.code_agent, code, stats, latency_slo_ms, session_id)
+        return response
+
+    async def _analyze(
+        self,
+        kind: str,
+        agent: SummarizeAgent | CodeAnalysisAgent,
+        content: str,
+        stats: TokenStats,
+        latency_slo_ms: int | None,
+        session_id: str
+    ) -> tuple[str, RoutedResponse | None]:
+        """Run ``agent`` on ``content``, as a revision of the session's previous run when that is cheaper.
+
+        Only the diff and the previous result are sent for a revision; the
+        same text again gets the previous result without a call.
+        """
+        sessions = get_session_manager()
+        previous = sessions.get_analysis(session_id, kind) if self.settings.incremental_analysis_enabled else None
+        prompt = None
+        if previous is not None:
+            if previous.text == content:
+                stats.incremental_analyses += 1
+                get_metrics().increment("incremental_analysis_total", kind=kind, outcome="unchanged")
+                return agent.format(previous.output), None
+            prompt = await revision_prompt(kind, previous, content, REVISION_SUBJECTS[kind])
+            if prompt is not None:
+                stats.incremental_analyses += 1
+
         start_time = time.time()
-        response = await self.code_agent.run(code)
-        stats.add(len(code) // 4, len(response) // 4, time.time() - start_time)
+        response, routed = await agent.run(content, latency_slo_ms, prompt)
+        self._record(stats, len(content), len(response), start_time, routed)
+        if routed is not None and self.settings.incremental_analysis_enabled:
+            sessions.set_analysis(session_id, kind, PriorAnalysis(content, routed.output))
+        return response, routed
+
+    def _record(
+        self,
+        stats: TokenStats,
+        input_chars: int,
+        output_chars: int,
+        start_time: float,
+        routed: RoutedResponse | None
+    ) -> None:
+        if routed and routed.input_chars:
+            # What was actually sent, after any local compaction of the input.
+            input_chars = routed.input_chars
+        stats.add(
+            input_chars // 4,
+            output_chars // 4,
+            time.time() - start_time,
+            routed.model if routed else None,
+            hedged=bool(routed and routed.hedged)
+        )
+
+    async def _general_chat(
+        self,
+        message: str,
+        context: str,
+        stats: TokenStats,
+        latency_slo_ms: int | None = None,
+        session_id: str = "default"
+    ) -> str:
+        """Normal conversational chat without structured output.
+
+        The session's conversation so far is sent along. Questions about a
+        document reuse the answer to the same question, asked after the same
+        conversation, about a near-duplicate of it.
+        """
+        history = self.memory.messages(session_id)
+        if not context:
+            return await self._chat(message, context, history, stats, latency_slo_ms, session_id)
+
+        # Earlier turns can change the answer, so they are part of the key.
+        question = f"{render_transcript(history)}\n\n{message}" if history else message
+        cached, fingerprint = await self.similarity_cache.lookup("chat", session_id, context, question=question)
+        if cached is not None:
+            stats.near_duplicate_hits += 1
+            return cached
+        response = await self._chat(message, context, history, stats, latency_slo_ms, session_id)
+        self.similarity_cache.store(fingerprint, response)
         return response
 
-    async def _general_chat(self, message: str, context: str, stats: TokenStats) -> str:
-        """Normal conversational chat without structured output."""
+    async def _chat(
+        self,
+        message: str,
+        context: str,
+        history: list[BaseMessage],
+        stats: TokenStats,
+        latency_slo_ms: int | None,
+        session_id: str
+    ) -> str:
         start_time = time.time()
 
+        if context:
+            model = self.router.route(TaskType.CHAT, len(message) + len(context), latency_slo_ms)[0]
+            if self.context_cache.should_cache(context, model):
+                try:
+                    return await self._cached_chat(session_id, model, message, context, history, stats)
+                except (DeadlineExceededError, ServiceUnavailableError):
+                    raise
+                except Exception as e:
+                    logger.warning("context_cache_unavailable", model=model, error=str(e))
+
         try:
             # Build messages based on whether there's context (from file upload)
             messages = [
-                SystemMessage(content="You are a helpful AI assistant. Respond naturally and conversationally.")
+                SystemMessage(content=CHAT_SYSTEM_PROMPT),
+                *history
             ]
             
             if context:
@@ -122,31 +338,47 @@ class CoordinatorAgent:
             else:
                 messages.append(HumanMessage(content=message))
             
-            response = await self.llm.ainvoke(messages)
-            
-            # Handle response content (can be string, list, or complex object)
-            response_text = response.content
-            if isinstance(response_text, list):
-                # List of parts - extract text from each
-                parts = []
-                for part in response_text:
-                    if isinstance(part, str):
-                        parts.append(part)
-                    elif isinstance(part, dict) and 'text' in part:
-                        parts.append(part['text'])
-                    else:
-                        parts.append(str(part))
-                response_text = "".join(parts)
-            elif isinstance(response_text, dict) and 'text' in response_text:
-                response_text = response_text['text']
-
-            stats.add(
-                len(message + context) // 4,
-                len(response_text) // 4,
-                time.time() - start_time
+            input_chars = len(message) + len(context) + sum(len(str(m.content)) for m in history)
+            routed = await self.router.ainvoke(
+                TaskType.CHAT,
+                messages,
+                input_chars=input_chars,
+                latency_slo_ms=latency_slo_ms
             )
+            response_text = routed.text
+
+            self._record(stats, input_chars, len(response_text), start_time, routed)
 
             return response_text
+        except (DeadlineExceededError, ServiceUnavailableError):
+            raise
         except Exception as e:
             logger.error("llm_invocation_failed", error=str(e), exc_info=True)
             raise AgentError(f"Failed to process request: {e}") from e
+
+    async def _cached_chat(
+        self,
+        session_id: str,
+        model: str,
+        message: str,
+        context: str,
+        history: list[BaseMessage],
+        stats: TokenStats
+    ) -> str:
+        """Answer against a provider-side cache of the context, created on first use in the session."""
+        start_time = time.time()
+        handle = await self.context_cache.get_or_create(
+            session_id, model, CHAT_SYSTEM_PROMPT, f"Context from uploaded file:\n{context}"
+        )
+        prompt = f"User question: {message}"
+        if history:
+            prompt = f"Conversation so far:\n{render_transcript(history)}\n\n{prompt}"
+        completion = await self.context_cache.generate(handle, prompt)
+        stats.add(
+            completion.input_tokens,
+            completion.output_tokens,
+            time.time() - start_time,
+            model,
+            cached_tokens=completion.cached_tokens
+        )
+        return completion.text
@@ -0,0 +1,43 @@
+import asyncio
+
+from infrastructure.config import get_settings
+from infrastructure.logging import get_logger
+from infrastructure.metrics import get_metrics
+from infrastructure.session_manager import PriorAnalysis
+from utils.diffing import diff_text
+
+
+logger = get_logger("agent.incremental")
+
+
+async def revision_prompt(kind: str, previous: PriorAnalysis, text: str, subject: str) -> str | None:
+    """A prompt updating ``previous`` for the changes that turned its text into ``text``.
+
+    None when a full run is the better choice: the text is short, or so much
+    of it changed that the diff would be no cheaper to send than the text.
+    """
+    settings = get_settings()
+    if len(text) < settings.incremental_min_chars:
+        return None
+
+    diff = await asyncio.to_thread(diff_text, previous.text, text, settings.incremental_context_lines)
+    prompt = (
+        f"Below is your {subject} of an earlier version, as JSON, then a unified diff from that "
+        f"version to the revised one. Update the {subject} for the revision: change what the diff "
+        f"affects and keep the rest as it was.\n\n"
+        f"Previous {subject}:\n{previous.output.model_dump_json(indent=2)}\n\n"
+        f"Diff:\n```diff\n{diff.unified}\n```"
+    )
+    if diff.changed_ratio > settings.incremental_max_change_ratio or len(prompt) >= len(text):
+        get_metrics().increment("incremental_analysis_total", kind=kind, outcome="full")
+        return None
+
+    get_metrics().increment("incremental_analysis_total", kind=kind, outcome="incremental")
+    logger.info(
+        "incremental_analysis",
+        kind=kind,
+        changed_ratio=round(diff.changed_ratio, 3),
+        chars=len(text),
+        prompt_chars=len(prompt)
+    )
+    return prompt
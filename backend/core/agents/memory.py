@@ -0,0 +1,168 @@
+import asyncio
+import contextvars
+import time
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+
+from infrastructure.config import get_settings
+from infrastructure.deadline import deadline_scope
+from infrastructure.dependencies import get_session_manager
+from infrastructure.llm.router import get_model_router
+from infrastructure.llm.stats import TokenStats
+from infrastructure.logging import get_logger
+from infrastructure.metrics import get_metrics
+from infrastructure.scheduler import Priority, get_scheduler
+from infrastructure.session_manager import ConversationMemory, Turn
+from schemas import TaskType
+
+
+logger = get_logger("agent.memory")
+
+COMPACTION_PROMPT = (
+    "You maintain a running summary of a conversation between a user and an assistant. "
+    "Fold the new exchanges into the summary. Keep facts, decisions, names, numbers and open "
+    "questions the user may refer back to; drop pleasantries. Reply with the updated summary "
+    "only, in at most {words} words."
+)
+
+
+def render_transcript(messages: list[BaseMessage]) -> str:
+    """``messages`` as plain text, for prompts that take a single string."""
+    lines = []
+    for message in messages:
+        if isinstance(message, HumanMessage):
+            lines.append(f"User: {message.content}")
+        elif isinstance(message, AIMessage):
+            lines.append(f"Assistant: {message.content}")
+        else:
+            lines.append(str(message.content))
+    return "\n\n".join(lines)
+
+
+def _clip(text: str, max_chars: int) -> str:
+    return text if len(text) <= max_chars else text[:max_chars] + " [...]"
+
+
+class ConversationHistory:
+    """Bounded per-session chat history, packed into a fixed token budget.
+
+    Each turn is kept on the session, cut to ``memory_turn_max_chars`` a
+    side. A chat is sent the rolling summary plus as many of the latest
+    turns as fit in ``memory_budget_tokens``. Once the summary and turns
+    outgrow the budget, a background task folds all but the last
+    ``memory_keep_turns`` into the summary, so the prompt stays the same
+    size however long the conversation runs. ``memory_max_turns`` bounds
+    what is kept if compaction falls behind or fails.
+    """
+
+    def __init__(self):
+        self.settings = get_settings()
+        self.router = get_model_router()
+        self.metrics = get_metrics()
+
+    @property
+    def enabled(self) -> bool:
+        return self.settings.conversation_memory_enabled
+
+    @property
+    def budget_chars(self) -> int:
+        return self.settings.memory_budget_tokens * 4
+
+    def messages(self, session_id: str) -> list[BaseMessage]:
+        """The summary and the latest turns that fit the budget, oldest first."""
+        if not self.enabled:
+            return []
+        memory = get_session_manager().get_memory(session_id)
+        budget = self.budget_chars - len(memory.summary)
+        recent: list[Turn] = []
+        for turn in reversed(memory.turns):
+            if turn.chars > budget:
+                break
+            recent.append(turn)
+            budget -= turn.chars
+
+        messages: list[BaseMessage] = []
+        if memory.summary:
+            messages.append(SystemMessage(content=f"Summary of the earlier conversation:\n{memory.summary}"))
+        for turn in reversed(recent):
+            messages += [HumanMessage(content=turn.user), AIMessage(content=turn.assistant)]
+        if messages:
+            self.metrics.observe("memory_prompt_chars", self.budget_chars - budget)
+        return messages
+
+    def record(self, session_id: str, stats: TokenStats, user: str, assistant: str) -> None:
+        """Append a turn, compacting older ones in the background once over budget."""
+        if not self.enabled:
+            return
+        limit = self.settings.memory_turn_max_chars
+        memory = get_session_manager().get_memory(session_id)
+        memory.turns.append(Turn(_clip(user, limit), _clip(assistant, limit)))
+
+        overflow = len(memory.turns) - self.settings.memory_max_turns
+        if overflow > 0:
+            # Compaction is behind or failing; lose the oldest turns rather than grow without bound.
+            del memory.turns[:overflow]
+            self.metrics.increment("memory_turns_dropped_total", overflow)
+
+        if memory.compaction is None and self._over_budget(memory):
+            # A fresh context: the task must not inherit the request's deadline or usage route.
+            memory.compaction = asyncio.create_task(
+                self._compact(session_id, stats, memory),
+                context=contextvars.Context()
+            )
+
+    def _over_budget(self, memory: ConversationMemory) -> bool:
+        foldable = self._foldable(memory)
+        if len(memory.summary) + sum(turn.chars for turn in memory.turns) <= self.budget_chars:
+            return False
+        # Fold in batches, not a call per turn; until then ``messages`` leaves the oldest out.
+        return sum(turn.chars for turn in foldable) >= self.budget_chars // 4
+
+    def _foldable(self, memory: ConversationMemory) -> list[Turn]:
+        return memory.turns[:max(0, len(memory.turns) - self.settings.memory_keep_turns)]
+
+    async def _compact(self, session_id: str, stats: TokenStats, memory: ConversationMemory) -> None:
+        folded = self._foldable(memory)
+        try:
+            with deadline_scope(self.settings.llm_timeout_sec):
+                async with get_scheduler().slot(Priority.BACKGROUND, session_id):
+                    summary = await self._summarize(stats, memory.summary, folded)
+        except asyncio.CancelledError:
+            self.metrics.increment("memory_compactions_total", outcome="cancelled")
+            raise
+        except Exception as e:
+            self.metrics.increment("memory_compactions_total", outcome="failed")
+            logger.warning("memory_compaction_failed", session_id=session_id, error=str(e) or type(e).__name__)
+            return
+        finally:
+            memory.compaction = None
+
+        # Turns may have been appended, or the oldest dropped, while the summary was written.
+        folded_ids = {id(turn) for turn in folded}
+        memory.turns = [turn for turn in memory.turns if id(turn) not in folded_ids]
+        memory.summary = summary
+        self.metrics.increment("memory_compactions_total", outcome="compacted")
+        logger.info("memory_compacted", session_id=session_id, turns=len(folded), summary_chars=len(summary))
+
+    async def _summarize(self, stats: TokenStats, summary: str, turns: list[Turn]) -> str:
+        # Half the budget goes to the summary, leaving the rest for recent turns.
+        max_chars = self.budget_chars // 2
+        exchanges = render_transcript([
+            message
+            for turn in turns
+            for message in (HumanMessage(content=turn.user), AIMessage(content=turn.assistant))
+        ])
+        prompt = f"Summary so far:\n{summary or '(none)'}\n\nNew exchanges:\n{exchanges}"
+
+        start_time = time.time()
+        routed = await self.router.ainvoke(
+            TaskType.SUMMARIZE,
+            [
+                SystemMessage(content=COMPACTION_PROMPT.format(words=max_chars // 6)),
+                HumanMessage(content=prompt)
+            ]
+        )
+        text = routed.text.strip()
+        stats.add(len(prompt) // 4, len(text) // 4, time.time() - start_time, routed.model, hedged=routed.hedged)
+        # A summary longer than asked for is cut, so the bound holds regardless.
+        return _clip(text, max_chars)
@@ -0,0 +1,187 @@
+import asyncio
+import hashlib
+import zipfile
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from infrastructure.config import get_settings
+from infrastructure.deadline import current_deadline
+from infrastructure.llm.router import RoutedResponse
+from infrastructure.logging import get_logger
+from utils.archive import ArchiveScan, SourceFile, iter_source_files
+from utils.errors import DeadlineExceededError, ExtractionError, ServiceUnavailableError
+from .code_analysis import CodeAnalysisAgent, CodeAnalysisOutput
+
+
+logger = get_logger("agent.project_analysis")
+
+# Share of the remaining request budget spent analyzing; the rest is left to report what finished.
+TIME_BUDGET_SHARE = 0.9
+
+
+@dataclass
+class FileAnalysis:
+    path: str
+    output: CodeAnalysisOutput | None = None
+    error: str | None = None
+    cached: bool = False
+
+
+@dataclass
+class ProjectReport:
+    markdown: str
+    # (input_chars, output_chars, routed) per LLM call made, for usage accounting.
+    calls: list[tuple[int, int, RoutedResponse]] = field(default_factory=list)
+
+
+class ProjectAnalysisAgent:
+    """Code analysis over a zip archive, one LLM call per source file.
+
+    Files are analyzed concurrently as they are unpacked, up to
+    ``code_analysis_concurrency`` at a time. Results are cached by content
+    hash, so re-uploading a project only pays for the files that changed.
+
+    Analysis stops shortly before the request deadline: files still in
+    flight are cancelled and the report covers the ones that finished.
+    """
+
+    def __init__(self, code_agent: CodeAnalysisAgent | None = None):
+        self.code_agent = code_agent or CodeAnalysisAgent()
+        self.settings = get_settings()
+        self._cache: OrderedDict[str, CodeAnalysisOutput] = OrderedDict()
+
+    async def run(self, archive: bytes, latency_slo_ms: int | None = None, focus: str = "") -> ProjectReport:
+        settings = self.settings
+        loop = asyncio.get_running_loop()
+        deadline = current_deadline()
+        stop_at = loop.time() + deadline.remaining() * TIME_BUDGET_SHARE if deadline else None
+        scan = ArchiveScan()
+        try:
+            sources = iter_source_files(
+                archive,
+                scan,
+                max_files=settings.archive_max_files,
+                max_file_bytes=settings.archive_max_file_bytes,
+                max_total_bytes=settings.archive_max_total_bytes
+            )
+            # Unpack on a worker thread, starting analysis of each file as soon as it is read.
+            first = await asyncio.to_thread(next, sources, None)
+        except zipfile.BadZipFile as e:
+            raise ExtractionError(f"Invalid zip archive: {e}") from e
+
+        report = ProjectReport(markdown="")
+        semaphore = asyncio.Semaphore(settings.code_analysis_concurrency)
+        tasks: dict[asyncio.Task[FileAnalysis], str] = {}
+        unread = False
+        try:
+            source = first
+            while source is not None:
+                if stop_at is not None and loop.time() >= stop_at:
+                    unread = True
+                    break
+                task = asyncio.create_task(self._analyze_file(source, semaphore, report, latency_slo_ms, focus))
+                tasks[task] = source.path
+                source = await asyncio.to_thread(next, sources, None)
+
+            timeout = max(0.0, stop_at - loop.time()) if stop_at is not None else None
+            _, pending = await asyncio.wait(tasks, timeout=timeout) if tasks else (set(), set())
+            for task in pending:
+                task.cancel()
+                scan.skip("time_limit", tasks[task])
+            await asyncio.gather(*pending, return_exceptions=True)
+            results = [task.result() for task in tasks if task not in pending]
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+        logger.info(
+            "project_analyzed",
+            files=len(results),
+            cached=sum(r.cached for r in results),
+            skipped=scan.skipped_count,
+            stopped_early=bool(unread or scan.skipped.get("time_limit"))
+        )
+        report.markdown = self._format(results, scan, unread)
+        return report
+
+    async def _analyze_file(
+        self,
+        source: SourceFile,
+        semaphore: asyncio.Semaphore,
+        report: ProjectReport,
+        latency_slo_ms: int | None,
+        focus: str
+    ) -> FileAnalysis:
+        code = source.text[:self.settings.content_max_length]
+        key = hashlib.sha256(f"{focus}\0{code}".encode()).hexdigest()
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return FileAnalysis(source.path, self._cache[key], cached=True)
+
+        async with semaphore:
+            try:
+                routed = await self.code_agent.analyze(code, source.path, latency_slo_ms, focus=focus)
+            except (DeadlineExceededError, ServiceUnavailableError):
+                raise
+            except Exception as e:
+                logger.warning("project_file_failed", path=source.path, error=str(e))
+                return FileAnalysis(source.path, error=str(e) or type(e).__name__)
+
+        output: CodeAnalysisOutput = routed.output
+        report.calls.append((routed.input_chars or len(code), len(output.model_dump_json()), routed))
+        self._cache[key] = output
+        if len(self._cache) > self.settings.code_analysis_cache_size:
+            self._cache.popitem(last=False)
+        return FileAnalysis(source.path, output)
+
+    def _format(self, results: list[FileAnalysis], scan: ArchiveScan, unread: bool = False) -> str:
+        if not results and not scan.skipped.get("time_limit") and not unread:
+            return "## Project Analysis\n\nNo source files found in the archive."
+
+        results = sorted(results, key=lambda r: r.path)
+        analyzed = [r for r in results if r.output]
+        cached = sum(r.cached for r in results)
+        lines = [
+            "## Project Analysis\n",
+            f"**{len(analyzed)} files analyzed**"
+            + (f" ({cached} unchanged, from cache)" if cached else "")
+            + (f", {scan.skipped_count} skipped" if scan.skipped_count else "")
+            + "\n",
+            "| File | Time | Space | Issues |",
+            "| --- | --- | --- | --- |",
+        ]
+        for r in results:
+            if r.output:
+                lines.append(
+                    f"| `{r.path}` | {_cell(r.output.time_complexity)} | "
+                    f"{_cell(r.output.space_complexity)} | {len(r.output.bugs)} |"
+                )
+            else:
+                lines.append(f"| `{r.path}` | – | – | error |")
+
+        issues = [r for r in analyzed if r.output.bugs]
+        lines.append("\n**Issues:**")
+        if issues:
+            for r in issues:
+                lines.append(f"\n`{r.path}`")
+                lines.extend(f"⚠️ {bug}" for bug in r.output.bugs)
+        else:
+            lines.append("✅ No issues found")
+
+        lines.append("\n**Files:**")
+        for r in results:
+            summary = r.output.explanation if r.output else f"Error analyzing file: {r.error}"
+            lines.append(f"\n`{r.path}`: {summary}")
+
+        if scan.skipped:
+            lines.append("\n**Skipped:** " + ", ".join(
+                f"{len(paths)} {reason.replace('_', ' ')}" for reason, paths in sorted(scan.skipped.items())
+            ))
+        if unread:
+            lines.append("\nThe time limit was reached before the rest of the archive was read; this report is partial.")
+        return "\n".join(lines)
+
+
+def _cell(value: str) -> str:
+    return value.replace("|", "\\|").replace("\n", " ")
@@ -0,0 +1,157 @@
+import asyncio
+import contextvars
+import hashlib
+import time
+from datetime import date
+
+from infrastructure.config import get_settings
+from infrastructure.deadline import deadline_scope, run_stage
+from infrastructure.dependencies import get_session_manager
+from infrastructure.llm.pricing import call_cost
+from infrastructure.llm.router import get_model_router
+from infrastructure.llm.similarity_cache import get_similarity_cache
+from infrastructure.llm.stats import TokenStats
+from infrastructure.logging import get_logger
+from infrastructure.metrics import get_metrics
+from infrastructure.scheduler import Priority, get_scheduler, upload_cost
+from infrastructure.session_manager import SessionDocument
+from schemas import TaskType
+from utils.chunking import ChunkIndex
+from .summarize import SummarizeAgent
+
+
+logger = get_logger("agent.speculative")
+
+# Expected length of a structured summary, for budgeting before the call.
+SUMMARY_OUTPUT_TOKENS = 500
+
+
+class SpeculativeSummarizer:
+    """Summarizes and indexes uploaded documents before anyone asks.
+
+    Each document uploaded to a session is kept on it. Once the upload's own
+    response is done, a background task builds the document's chunk index
+    and, for documents of at least ``speculative_min_chars``, its summary, so
+    a follow-up ``/summarize`` returns at once. The task runs at background
+    priority under its own deadline, and only while today's speculative
+    spend stays under ``speculative_daily_budget_usd``. Its tokens are
+    recorded apart from the session's requested usage.
+    """
+
+    def __init__(self, summarize_agent: SummarizeAgent):
+        self.summarize_agent = summarize_agent
+        self.settings = get_settings()
+        self.router = get_model_router()
+        self.metrics = get_metrics()
+        self._day: date | None = None
+        self._spent_usd = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.settings.speculative_summary_enabled
+
+    def remember(self, session_id: str, content: str) -> SessionDocument:
+        """Keep ``content`` as the session's document, reusing what was derived if it is unchanged."""
+        sessions = get_session_manager()
+        digest = hashlib.sha256(content.encode()).hexdigest()
+        document = sessions.get_document(session_id)
+        if document is None or document.digest != digest:
+            document = SessionDocument(content, digest)
+            sessions.set_document(session_id, document)
+        return document
+
+    def document(self, session_id: str) -> SessionDocument | None:
+        return get_session_manager().get_document(session_id)
+
+    def speculate(self, session_id: str, stats: TokenStats, document: SessionDocument) -> None:
+        """Start the background work for ``document`` unless it is done or under way."""
+        if document.speculation is not None or (document.index is not None and not self._wants_summary(document)):
+            return
+        # A fresh context: the task must not inherit the request's deadline or usage route.
+        document.speculation = asyncio.create_task(
+            self._run(session_id, stats, document),
+            context=contextvars.Context()
+        )
+
+    async def summary(self, document: SessionDocument) -> str | None:
+        """The document's summary if it is ready or being computed; None otherwise."""
+        task = document.speculation
+        if document.summary is None and task is not None and not task.done():
+            self.metrics.increment("speculative_lookups_total", state="pending")
+            try:
+                # Shielded so a caller giving up does not cancel the shared work.
+                await run_stage("speculation", asyncio.shield(task))
+            except asyncio.CancelledError:
+                if not task.cancelled():
+                    raise
+        elif document.summary is not None:
+            self.metrics.increment("speculative_lookups_total", state="ready")
+        if document.summary is None:
+            self.metrics.increment("speculative_lookups_total", state="miss")
+        return document.summary
+
+    def _wants_summary(self, document: SessionDocument) -> bool:
+        return document.summary is None and len(document.text) >= self.settings.speculative_min_chars
+
+    def _reserve(self, amount_usd: float) -> bool:
+        today = date.today()
+        if self._day != today:
+            self._day, self._spent_usd = today, 0.0
+        if self._spent_usd + amount_usd > self.settings.speculative_daily_budget_usd:
+            return False
+        self._spent_usd += amount_usd
+        return True
+
+    async def _run(self, session_id: str, stats: TokenStats, document: SessionDocument) -> None:
+        try:
+            with deadline_scope(self.settings.speculative_timeout_sec):
+                async with get_scheduler().slot(Priority.BACKGROUND, session_id, upload_cost(len(document.text))):
+                    if document.index is None:
+                        document.index = await asyncio.to_thread(ChunkIndex, document.text, self.settings.chunk_chars)
+                    if self._wants_summary(document):
+                        await self._summarize(session_id, stats, document)
+        except asyncio.CancelledError:
+            self.metrics.increment("speculative_tasks_total", outcome="cancelled")
+            raise
+        except Exception as e:
+            self.metrics.increment("speculative_tasks_total", outcome="failed")
+            logger.warning("speculation_failed", session_id=session_id, error=str(e) or type(e).__name__)
+        finally:
+            document.speculation = None
+
+    async def _summarize(self, session_id: str, stats: TokenStats, document: SessionDocument) -> None:
+        text = document.text
+        similarity_cache = get_similarity_cache()
+        cached, fingerprint = await similarity_cache.lookup("summarize", session_id, text)
+        if cached is not None:
+            document.summary = cached
+            self.metrics.increment("speculative_tasks_total", outcome="near_duplicate")
+            return
+
+        model = self.router.route(TaskType.SUMMARIZE, len(text))[0]
+        estimate = call_cost(model, len(text) // 4, SUMMARY_OUTPUT_TOKENS)
+        if not self._reserve(estimate):
+            self.metrics.increment("speculative_tasks_total", outcome="over_budget")
+            logger.info("speculation_skipped_budget", session_id=session_id, spent_usd=round(self._spent_usd, 4))
+            return
+
+        start_time = time.time()
+        try:
+            markdown, routed = await self.summarize_agent.run(text)
+        except BaseException:
+            self._spent_usd -= estimate
+            raise
+        if routed is None:
+            # The agent reports failures as text; that is not worth keeping.
+            self._spent_usd -= estimate
+            self.metrics.increment("speculative_tasks_total", outcome="failed")
+            return
+
+        input_tokens = (routed.input_chars or len(text)) // 4
+        cost = stats.add_speculative(input_tokens, len(markdown) // 4, time.time() - start_time, routed.model)
+        self._spent_usd += cost - estimate
+        self.metrics.increment("speculative_spend_usd", cost)
+        self.metrics.increment("speculative_tasks_total", outcome="summarized")
+        document.summary = markdown
+        similarity_cache.store(fingerprint, markdown)
+        logger.info("speculative_summary_ready", session_id=session_id, chars=len(text), cost_usd=round(cost, 5))
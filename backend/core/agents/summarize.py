@@ -1,6 +1,8 @@
 from pydantic import BaseModel, Field
 from langchain_core.messages import HumanMessage, SystemMessage
-from infrastructure.llm.client import get_llm_client
+from infrastructure.llm.router import RoutedResponse, get_model_router
+from schemas import TaskType
+from utils.errors import DeadlineExceededError, ServiceUnavailableError
 
 
 class SummaryOutput(BaseModel):
@@ -12,24 +14,43 @@ class SummaryOutput(BaseModel):
 
 class SummarizeAgent:
     def __init__(self):
-        self.llm = get_llm_client()
-    
-    async def run(self, content: str) -> str:
+        self.router = get_model_router()
+
+    @staticmethod
+    def format(response: SummaryOutput) -> str:
+        bullets = "\n".join(f"• {b}" for b in response.bullets)
+
+        return (
+            f"## Summary\n\n"
+            f"**TL;DR:** {response.one_line}\n\n"
+            f"**Key Points:**\n{bullets}\n\n"
+            f"**Details:**\n{response.five_sentence}"
+        )
+
+    async def run(
+        self,
+        content: str,
+        latency_slo_ms: int | None = None,
+        prompt: str | None = None
+    ) -> tuple[str, RoutedResponse | None]:
+        """Summarize content. Returns (markdown, routed response) or (error text, None).
+
+        ``prompt`` replaces the default user prompt, e.g. to revise an earlier summary.
+        """
+        prompt = prompt or f"Summarize the following content:\n\n{content}"
         try:
-            llm_structured = self.llm.with_structured_output(SummaryOutput)
-            
-            response = await llm_structured.ainvoke([
-                SystemMessage(content="You are a summarization expert. Analyze the given content and provide a structured summary."),
-                HumanMessage(content=f"Summarize the following content:\n\n{content}")
-            ])
-            
-            bullets = "\n".join(f"• {b}" for b in response.bullets)
-            
-            return (
-                f"## Summary\n\n"
-                f"**TL;DR:** {response.one_line}\n\n"
-                f"**Key Points:**\n{bullets}\n\n"
-                f"**Details:**\n{response.five_sentence}"
+            routed = await self.router.ainvoke(
+                TaskType.SUMMARIZE,
+                [
+                    SystemMessage(content="You are a summarization expert. Analyze the given content and provide a structured summary."),
+                    HumanMessage(content=prompt)
+                ],
+                schema=SummaryOutput,
+                input_chars=len(prompt),
+                latency_slo_ms=latency_slo_ms
             )
+            return self.format(routed.output), routed
+        except (DeadlineExceededError, ServiceUnavailableError):
+            raise
         except Exception as e:
-            return f"Error analyzing content: {e}"
+            return f"Error analyzing content: {e}", None
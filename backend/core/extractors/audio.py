@@ -1,6 +1,7 @@
-import httpx
-
+from infrastructure.circuit_breaker import DEEPGRAM, get_breaker
 from infrastructure.config import get_settings
+from infrastructure.deadline import stage_timeout
+from infrastructure.dependencies import get_httpx_client
 from infrastructure.logging import get_logger
 from schemas import ExtractionResult, InputType
 from utils.text import clean_text
@@ -9,43 +10,54 @@ from .base import ExtractorRegistry
 
 logger = get_logger("extractor.audio")
 
+DEEPGRAM_BASE_URL = "https://api.deepgram.com"
+
 
-@ExtractorRegistry.register("audio", ["wav", "mp3", "m4a", "ogg", "flac"])
-async def extract_audio(content: bytes, filename: str | None = None) -> ExtractionResult:
+@ExtractorRegistry.register("audio")
+async def extract_audio(
+    content: bytes,
+    filename: str | None = None,
+    max_length: int | None = None
+) -> ExtractionResult:
     try:
         settings = get_settings()
 
-        async with httpx.AsyncClient(timeout=settings.deepgram_timeout_sec) as client:
+        # The shared client keeps Deepgram connections open between requests.
+        client = await get_httpx_client()
+        async with get_breaker(DEEPGRAM).guard() as outcome:
             response = await client.post(
-                "https://api.deepgram.com/v1/listen",
+                f"{DEEPGRAM_BASE_URL}/v1/listen",
                 headers={
                     "Authorization": f"Token {settings.deepgram_api_key}",
                     "Content-Type": "audio/wav"
                 },
-                params={"model": "nova-2", "smart_format": "true"},
-                content=content
+                params={"model": settings.deepgram_model, "smart_format": "true"},
+                content=content,
+                timeout=stage_timeout(settings.deepgram_timeout_sec)
             )
+            if response.status_code >= 500 or response.status_code == 429:
+                outcome.fail()
 
-            if response.status_code == 200:
-                data = response.json()
-                transcript = (
-                    data.get("results", {})
-                    .get("channels", [{}])[0]
-                    .get("alternatives", [{}])[0]
-                    .get("transcript", "")
-                )
-                logger.info("audio_extracted", chars=len(transcript))
-                return ExtractionResult(
-                    input_type=InputType.AUDIO,
-                    extracted_text=clean_text(transcript)
-                )
-
-            logger.error("deepgram_error", status_code=response.status_code)
+        if response.status_code == 200:
+            data = response.json()
+            transcript = (
+                data.get("results", {})
+                .get("channels", [{}])[0]
+                .get("alternatives", [{}])[0]
+                .get("transcript", "")
+            )
+            logger.info("audio_extracted", chars=len(transcript))
             return ExtractionResult(
                 input_type=InputType.AUDIO,
-                extracted_text="",
-                error=f"Deepgram error: {response.status_code}"
+                extracted_text=clean_text(transcript, max_length)
             )
+
+        logger.error("deepgram_error", status_code=response.status_code)
+        return ExtractionResult(
+            input_type=InputType.AUDIO,
+            extracted_text="",
+            error=f"Deepgram error: {response.status_code}"
+        )
     except Exception as e:
         logger.error("audio_extraction_failed", error=str(e), exc_info=True)
         return ExtractionResult(
@@ -1,33 +1,62 @@
+import importlib
 from abc import ABC, abstractmethod
 from typing import Callable, Awaitable
 
 from schemas import ExtractionResult
 
 
-ExtractorFunc = Callable[[bytes, str | None], Awaitable[ExtractionResult]]
+ExtractorFunc = Callable[..., Awaitable[ExtractionResult]]
 
 
 class ExtractorRegistry:
     _extractors: dict[str, ExtractorFunc] = {}
     _extension_map: dict[str, str] = {}
+    _lazy_modules: dict[str, str] = {}
 
     @classmethod
-    def register(cls, file_type: str, extensions: list[str]):
+    def register(cls, file_type: str, extensions: list[str] | None = None):
         def decorator(func: ExtractorFunc) -> ExtractorFunc:
             cls._extractors[file_type] = func
-            for ext in extensions:
+            for ext in extensions or []:
                 cls._extension_map[ext.lower()] = file_type
             return func
         return decorator
 
     @classmethod
-    def get_extractor(cls, filename: str | None) -> ExtractorFunc | None:
-        if not filename:
+    def register_lazy(cls, file_type: str, extensions: list[str], module: str) -> None:
+        """Map extensions to an extractor module without importing it.
+
+        The module is imported on first lookup, where its ``register``
+        decorator fills in the extractor function.
+        """
+        cls._lazy_modules[file_type] = module
+        for ext in extensions:
+            cls._extension_map[ext.lower()] = file_type
+
+    @classmethod
+    def _load(cls, file_type: str) -> ExtractorFunc | None:
+        if file_type not in cls._extractors and file_type in cls._lazy_modules:
+            importlib.import_module(cls._lazy_modules[file_type])
+        return cls._extractors.get(file_type)
+
+    @classmethod
+    def preload(cls) -> list[str]:
+        """Import every lazily registered extractor. Returns the loaded types."""
+        for file_type in cls._lazy_modules:
+            cls._load(file_type)
+        return list(cls._lazy_modules)
+
+    @classmethod
+    def file_type_for(cls, filename: str | None) -> str | None:
+        if not filename or "." not in filename:
             return None
-        ext = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
-        file_type = cls._extension_map.get(ext)
-        return cls._extractors.get(file_type) if file_type else None
+        return cls._extension_map.get(filename.rsplit(".", 1)[-1].lower())
+
+    @classmethod
+    def get_extractor(cls, filename: str | None) -> ExtractorFunc | None:
+        file_type = cls.file_type_for(filename)
+        return cls._load(file_type) if file_type else None
 
     @classmethod
     def get_by_type(cls, file_type: str) -> ExtractorFunc | None:
-        return cls._extractors.get(file_type)
+        return cls._load(file_type)
@@ -1,25 +1,113 @@
+import time
+
+from infrastructure.config import get_settings
+from infrastructure.deadline import run_stage
+from infrastructure.logging import get_logger
+from infrastructure.metrics import get_metrics
+from infrastructure.usage_ledger import UsageRecord, get_usage_ledger
 from schemas import ExtractionResult, InputType
-from utils.text import detect_youtube_url, get_file_type
+from utils.sniff import matches, sniff_content
+from utils.text import detect_youtube_url
 from .base import ExtractorRegistry
+from .text import extract_text
+
 
-from . import pdf, image, audio, text
+logger = get_logger("extractor")
+
+# Heavy extractors (PyPDF2, PIL, google.genai, httpx) are imported on first use.
+ExtractorRegistry.register_lazy("pdf", ["pdf"], "core.extractors.pdf")
+ExtractorRegistry.register_lazy("image", ["jpg", "jpeg", "png", "gif", "webp", "bmp"], "core.extractors.image")
+ExtractorRegistry.register_lazy("audio", ["wav", "mp3", "m4a", "ogg", "flac"], "core.extractors.audio")
 
 
 async def extract_content(
     content: bytes | str,
-    filename: str | None = None
+    filename: str | None = None,
+    max_length: int | None = None
 ) -> ExtractionResult:
+    """Extract text from raw content, keeping at most ``max_length`` chars."""
     if isinstance(content, str):
         if detect_youtube_url(content):
             from .youtube import extract_youtube
             return await extract_youtube(content)
-        return await text.extract_text(content)
+        return await extract_text(content, max_length)
+
+    # Dispatch on the sniffed format so a misnamed file is rejected here,
+    # before it reaches a remote vision or transcription call.
+    detected = sniff_content(content)
+    declared_type = ExtractorRegistry.file_type_for(filename)
 
-    if not filename:
-        return await text.extract_text(content)
+    if not matches(declared_type, detected):
+        get_metrics().increment("uploads_misrouted_total", declared=declared_type or "unknown", detected=detected.file_type)
+        logger.warning("extraction_type_mismatch", filename=filename, declared=declared_type, detected=detected.file_type)
+        return ExtractionResult(
+            input_type=_input_type(declared_type),
+            extracted_text="",
+            error=f"File content does not match its extension (detected {detected.mime_type})"
+        )
 
-    extractor = ExtractorRegistry.get_extractor(filename)
+    if detected.file_type == "text":
+        return await extract_text(content, max_length)
+
+    extractor = ExtractorRegistry.get_by_type(detected.file_type)
     if extractor:
-        return await extractor(content, filename)
+        start_time = time.time()
+        try:
+            return await run_stage("extraction", extractor(content, filename, max_length=max_length))
+        finally:
+            _record_extraction(detected.file_type, time.time() - start_time)
+
+    get_metrics().increment("uploads_misrouted_total", declared=declared_type or "unknown", detected=detected.file_type)
+    return ExtractionResult(
+        input_type=InputType.TEXT,
+        extracted_text="",
+        error=f"Unsupported content type: {detected.mime_type}"
+    )
+
+
+def _record_extraction(file_type: str, latency_sec: float) -> None:
+    settings = get_settings()
+    # Ledger the remote model doing the work, where there is one.
+    model = {"image": settings.llm_model, "audio": settings.deepgram_model}.get(file_type, file_type)
+    get_usage_ledger().record(UsageRecord(kind="extraction", model=model, latency_sec=latency_sec))
+
+
+def _input_type(file_type: str | None) -> InputType:
+    try:
+        return InputType(file_type)
+    except ValueError:
+        return InputType.TEXT
+
+
+def image_indexes(items: list[tuple[bytes, str | None]]) -> list[int]:
+    """Positions of the entries in ``items`` that are images, by name and content."""
+    return [
+        i for i, (content, filename) in enumerate(items)
+        if ExtractorRegistry.file_type_for(filename) == "image" and sniff_content(content).file_type == "image"
+    ]
+
+
+async def extract_images_batched(
+    items: list[tuple[bytes, str | None]],
+    max_length: int | None = None
+) -> list[ExtractionResult | None]:
+    """OCR every image among ``items`` together in batched vision calls, keeping at most ``max_length`` chars each.
+
+    Returns results aligned with ``items``, None for non-image entries (and
+    for all entries when there are too few images to batch).
+    """
+    results: list[ExtractionResult | None] = [None] * len(items)
+    indexes = image_indexes(items)
+    if get_settings().image_batch_size < 2 or len(indexes) < 2:
+        return results
+
+    from .image import extract_images
 
-    return await text.extract_text(content)
+    start_time = time.time()
+    try:
+        extracted = await run_stage("extraction", extract_images([items[i] for i in indexes], max_length))
+    finally:
+        _record_extraction("image", time.time() - start_time)
+    for index, result in zip(indexes, extracted):
+        results[index] = result
+    return results
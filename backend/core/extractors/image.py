@@ -2,48 +2,76 @@ import asyncio
 from io import BytesIO
 
 from PIL import Image
-from google import genai
+from google.genai import types
 
+from infrastructure.circuit_breaker import GEMINI_VISION, get_breaker
 from infrastructure.config import get_settings
 from infrastructure.dependencies import get_genai_client
 from infrastructure.logging import get_logger
+from infrastructure.process_pool import get_process_pool, open_payload
 from schemas import ExtractionResult, InputType
-from utils.text import clean_text
+from utils.text import clean_text, parse_llm_json
 from .base import ExtractorRegistry
 
 
 logger = get_logger("extractor.image")
 
+SINGLE_PROMPT = "Extract all text from this image. If no text, describe what you see."
+
+BATCH_PROMPT = (
+    "You will receive {count} images, each preceded by its number. For every image, "
+    "extract all text it contains; if it has no text, describe what you see. "
+    'Respond with a JSON array of objects {{"index": <image number>, "text": <extracted text>}}, '
+    "one per image, in order."
+)
 
-@ExtractorRegistry.register("image", ["jpg", "jpeg", "png", "gif", "webp", "bmp"])
-async def extract_image(content: bytes, filename: str | None = None) -> ExtractionResult:
-    try:
-        settings = get_settings()
-        client = get_genai_client()
 
-        image = Image.open(BytesIO(content))
+def _prepare_image(content: bytes | memoryview) -> bytes:
+    """Re-encode as JPEG. CPU-bound; runs in a pool worker."""
+    with open_payload(content) as stream, Image.open(stream) as image:
         if image.mode in ("RGBA", "P"):
             image = image.convert("RGB")
 
         img_buffer = BytesIO()
         image.save(img_buffer, format="JPEG")
-        img_bytes = img_buffer.getvalue()
+    return img_buffer.getvalue()
+
+
+def _image_part(img_bytes: bytes) -> types.Part:
+    return types.Part.from_bytes(data=img_bytes, mime_type="image/jpeg")
+
+
+@ExtractorRegistry.register("image")
+async def extract_image(
+    content: bytes,
+    filename: str | None = None,
+    max_length: int | None = None
+) -> ExtractionResult:
+    try:
+        img_bytes = await get_process_pool().run("image_prepare", _prepare_image, content)
+    except Exception as e:
+        logger.error("image_prepare_failed", filename=filename, error=str(e))
+        return ExtractionResult(input_type=InputType.IMAGE, extracted_text="", error=str(e))
+    return await _extract_prepared(img_bytes, max_length)
+
+
+async def _extract_prepared(img_bytes: bytes, max_length: int | None = None) -> ExtractionResult:
+    """OCR one image already re-encoded by ``_prepare_image``."""
+    try:
+        settings = get_settings()
+        client = get_genai_client()
 
-        response = await asyncio.to_thread(
-            lambda: client.models.generate_content(
+        async with get_breaker(GEMINI_VISION).guard():
+            response = await client.aio.models.generate_content(
                 model=settings.llm_model,
-                contents=[
-                    "Extract all text from this image. If no text, describe what you see.",
-                    {"mime_type": "image/jpeg", "data": img_bytes}
-                ]
+                contents=[SINGLE_PROMPT, _image_part(img_bytes)]
             )
-        )
 
         text = response.text or ""
         logger.info("image_extracted", chars=len(text))
         return ExtractionResult(
             input_type=InputType.IMAGE,
-            extracted_text=clean_text(text)
+            extracted_text=clean_text(text, max_length)
         )
     except Exception as e:
         logger.error("image_extraction_failed", error=str(e), exc_info=True)
@@ -53,3 +81,86 @@ async def extract_image(content: bytes, filename: str | None = None) -> Extracti
             error=str(e)
         )
 
+
+async def extract_images(
+    items: list[tuple[bytes, str | None]],
+    max_length: int | None = None
+) -> list[ExtractionResult]:
+    """OCR several images with one multimodal call per ``image_batch_size`` images.
+
+    Results are returned in input order. Images the model leaves out of its
+    structured answer are retried individually.
+    """
+    batch_size = max(1, get_settings().image_batch_size)
+    results: list[ExtractionResult | None] = [None] * len(items)
+    prepared: list[tuple[int, bytes]] = []
+
+    pool = get_process_pool()
+    converted = await asyncio.gather(
+        *(pool.run("image_prepare", _prepare_image, content) for content, _ in items),
+        return_exceptions=True
+    )
+    for index, ((_, filename), img_bytes) in enumerate(zip(items, converted)):
+        if isinstance(img_bytes, BaseException):
+            if isinstance(img_bytes, asyncio.CancelledError):
+                raise img_bytes
+            logger.error("image_prepare_failed", filename=filename, error=str(img_bytes))
+            results[index] = ExtractionResult(input_type=InputType.IMAGE, extracted_text="", error=str(img_bytes))
+        else:
+            prepared.append((index, img_bytes))
+
+    chunks = [prepared[i:i + batch_size] for i in range(0, len(prepared), batch_size)]
+    batches = [chunk for chunk in chunks if len(chunk) > 1]
+    # A lone image goes through the single-image path.
+    singles = [chunk[0] for chunk in chunks if len(chunk) == 1]
+    texts_per_chunk, single_results = await asyncio.gather(
+        asyncio.gather(*(_extract_chunk(chunk) for chunk in batches)),
+        asyncio.gather(*(_extract_prepared(img_bytes, max_length) for _, img_bytes in singles))
+    )
+    for (index, _), result in zip(singles, single_results):
+        results[index] = result
+    for texts in texts_per_chunk:
+        for index, text in texts.items():
+            results[index] = ExtractionResult(input_type=InputType.IMAGE, extracted_text=clean_text(text, max_length))
+
+    prepared_bytes = dict(prepared)
+    missing = [i for i, result in enumerate(results) if result is None]
+    if missing:
+        logger.warning("image_batch_incomplete", missing=len(missing))
+        retried = await asyncio.gather(*(_extract_prepared(prepared_bytes[i], max_length) for i in missing))
+        for index, result in zip(missing, retried):
+            results[index] = result
+
+    return results
+
+
+async def _extract_chunk(chunk: list[tuple[int, bytes]]) -> dict[int, str]:
+    """Returns text per original index for the images the model answered."""
+    settings = get_settings()
+    contents: list = [BATCH_PROMPT.format(count=len(chunk))]
+    for number, (_, img_bytes) in enumerate(chunk, start=1):
+        contents.extend([f"Image {number}:", _image_part(img_bytes)])
+
+    try:
+        async with get_breaker(GEMINI_VISION).guard():
+            response = await get_genai_client().aio.models.generate_content(
+                model=settings.llm_model,
+                contents=contents,
+                config=types.GenerateContentConfig(response_mime_type="application/json")
+            )
+        entries = parse_llm_json(response.text or "")
+    except Exception as e:
+        logger.error("image_batch_failed", images=len(chunk), error=str(e))
+        return {}
+
+    texts = {}
+    for entry in entries if isinstance(entries, list) else []:
+        try:
+            number = int(entry["index"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if 1 <= number <= len(chunk):
+            texts[chunk[number - 1][0]] = str(entry.get("text", ""))
+
+    logger.info("image_batch_extracted", images=len(chunk), answered=len(texts))
+    return texts
@@ -1,31 +1,233 @@
 import asyncio
+import itertools
+import time
+from dataclasses import dataclass, field
 from io import BytesIO
+from typing import AsyncIterator, Callable, Iterator
 
-from PyPDF2 import PdfReader
+from PyPDF2 import PageObject, PdfReader
 
+from infrastructure.config import get_settings
+from infrastructure.deadline import current_deadline, stage_timeout
 from infrastructure.logging import get_logger
+from infrastructure.process_pool import get_process_pool, open_payload
 from schemas import ExtractionResult, InputType
-from utils.text import clean_text
+from utils.compaction import BlockDeduplicator, CompactionStats, strip_page_furniture
+from utils.text import normalize_chunks, normalize_text
 from .base import ExtractorRegistry
 
 
 logger = get_logger("extractor.pdf")
 
 
-@ExtractorRegistry.register("pdf", ["pdf"])
-async def extract_pdf(content: bytes, filename: str | None = None) -> ExtractionResult:
-    def _parse():
-        reader = PdfReader(BytesIO(content))
-        text = "\n".join(page.extract_text() or "" for page in reader.pages)
-        return text, len(reader.pages)
+# When compacting, raw text is read this far past max_length, since the
+# furniture and repeats removed afterwards would otherwise leave it short.
+_COMPACTION_READAHEAD = 2
 
+# Smaller images on a page without text are logos or rules, not a scan of the page.
+_MIN_SCAN_IMAGE_BYTES = 2048
+
+
+@dataclass
+class _ParsedPdf:
+    text: str
+    pages: int
+    parsed: int
+    compaction: dict | None = None
+    # Set when pages need OCR: the text of every page read, and the images of those without any.
+    raw_pages: list[str] = field(default_factory=list)
+    scans: list[tuple[int, list[bytes]]] = field(default_factory=list)
+
+
+def _page_images(page: PageObject) -> list[bytes]:
     try:
-        text, pages = await asyncio.to_thread(_parse)
-        logger.info("pdf_extracted", pages=pages, chars=len(text))
+        return [image.data for image in page.images if len(image.data) >= _MIN_SCAN_IMAGE_BYTES]
+    except Exception:
+        # Filters PyPDF2 can't decode; the page stays empty.
+        return []
+
+
+def _page_texts(
+    reader: PdfReader,
+    counter: list[int],
+    stopped: Callable[[], bool],
+    scans: list[tuple[int, list[bytes]]] | None = None,
+    max_scans: int = 0
+) -> Iterator[str]:
+    """Page texts in order. Up to ``max_scans`` pages with no text have their images collected into ``scans``."""
+    # Stop parsing as soon as the request is cancelled or out of time.
+    for index, page in enumerate(reader.pages):
+        if stopped():
+            return
+        counter[0] += 1
+        text = page.extract_text() or ""
+        if scans is not None and len(scans) < max_scans and not text.strip():
+            images = _page_images(page)
+            if images:
+                scans.append((index, images))
+        yield text
+
+
+def _read_pages(pages: Iterator[str], max_chars: int | None) -> list[str]:
+    out, chars = [], 0
+    for page in pages:
+        out.append(page)
+        chars += len(page)
+        if max_chars is not None and chars >= max_chars:
+            break
+    return out
+
+
+def _parse_pdf(
+    content: bytes | memoryview,
+    max_length: int | None,
+    budget_sec: float | None,
+    min_block_chars: int | None = None,
+    ocr_max_pages: int = 0
+) -> _ParsedPdf:
+    """Runs in a pool worker, which cannot see the request deadline, so it gets the remaining budget instead.
+
+    With ``min_block_chars`` set, running headers, footers and repeated
+    sentences are compacted away and the savings returned alongside the text.
+    With ``ocr_max_pages`` set, pages without a text layer have their images
+    returned for OCR, along with the raw pages to merge the results into;
+    the text of the text layer alone is still built, as the fallback.
+    """
+    stop_at = time.monotonic() + budget_sec if budget_sec is not None else None
+    reader = PdfReader(open_payload(content))
+    parsed = [0]
+    scans: list[tuple[int, list[bytes]]] = []
+
+    def stopped() -> bool:
+        return stop_at is not None and time.monotonic() >= stop_at
+
+    pages = _page_texts(reader, parsed, stopped, scans, ocr_max_pages)
+    if min_block_chars is None and not ocr_max_pages:
+        text = "".join(normalize_chunks((piece for page in pages for piece in (page, "\n")), max_length))
+        return _ParsedPdf(text, len(reader.pages), parsed[0])
+
+    readahead = _COMPACTION_READAHEAD if min_block_chars is not None else 1
+    raw = _read_pages(pages, max_length * readahead if max_length is not None else None)
+    text, compaction = _assemble(raw, max_length, min_block_chars)
+    if scans:
+        return _ParsedPdf(text, len(reader.pages), parsed[0], compaction, raw_pages=raw, scans=scans)
+    return _ParsedPdf(text, len(reader.pages), parsed[0], compaction)
+
+
+def _assemble(raw: list[str], max_length: int | None, min_block_chars: int | None) -> tuple[str, dict | None]:
+    """The document text from its page texts, compacted when ``min_block_chars`` is set."""
+    if min_block_chars is None:
+        text = normalize_text("\n".join(raw))
+        return (text[:max_length] if max_length is not None else text), None
+
+    stats = CompactionStats()
+    raw = strip_page_furniture(raw, stats)
+    text, block_stats = BlockDeduplicator(min_block_chars).compact(normalize_text("\n".join(raw)))
+    stats.add(block_stats)
+    if max_length is not None:
+        text = text[:max_length]
+    return text, stats.to_dict()
+
+
+async def _recognize_scans(raw: list[str], scans: list[tuple[int, list[bytes]]]) -> tuple[list[str], int]:
+    """``raw`` with the scanned pages' text filled in by OCR, plus how many images failed.
+
+    All images go through the batched vision pipeline at once; a page made
+    of several images gets their texts in order.
+    """
+    from .image import extract_images
+
+    items = [(data, f"page-{index + 1}") for index, images in scans for data in images]
+    results = iter(await extract_images(items))
+    pages = list(raw)
+    failed = 0
+    for index, images in scans:
+        texts = []
+        for result in itertools.islice(results, len(images)):
+            if result.error:
+                failed += 1
+            elif result.extracted_text:
+                texts.append(result.extracted_text)
+        pages[index] = "\n".join(texts)
+    return pages, failed
+
+
+def iter_pdf_pages(content: bytes) -> Iterator[tuple[int, str]]:
+    """Yield (page_number, normalized_text) one page at a time."""
+    reader = PdfReader(BytesIO(content))
+    deadline = current_deadline()
+    for number, page in enumerate(reader.pages, start=1):
+        if deadline is not None and deadline.stopped:
+            return
+        yield number, normalize_text(page.extract_text() or "")
+
+
+async def stream_pdf_pages(content: bytes) -> AsyncIterator[tuple[int, str]]:
+    """Parse pages in a worker thread, handing each back as soon as it is ready."""
+    pages = iter_pdf_pages(content)
+    while True:
+        item = await asyncio.to_thread(next, pages, None)
+        if item is None:
+            return
+        yield item
+
+
+@ExtractorRegistry.register("pdf")
+async def extract_pdf(
+    content: bytes,
+    filename: str | None = None,
+    max_length: int | None = None
+) -> ExtractionResult:
+    try:
+        # Leave a little of the budget to return the partial text instead of timing out.
+        budget = stage_timeout()
+        soft_budget = budget * 0.9 if budget is not None else None
+        settings = get_settings()
+        min_block_chars = settings.compaction_min_block_chars if settings.compaction_enabled else None
+        ocr_max_pages = settings.pdf_ocr_max_pages if settings.pdf_ocr_enabled else 0
+        pool = get_process_pool()
+        result = await pool.run(
+            "extraction", _parse_pdf, content, max_length, soft_budget, min_block_chars, ocr_max_pages
+        )
+        text, compaction = result.text, result.compaction
+        metadata = {"pages": result.pages}
+
+        if result.scans:
+            # Only pages without a text layer go to the vision model. Failed images (out of time,
+            # vision down) come back as errors, and the text layer alone is kept if none succeeded.
+            start_time = time.time()
+            images = sum(len(page_images) for _, page_images in result.scans)
+            raw, failed = await _recognize_scans(result.raw_pages, result.scans)
+            if failed < images:
+                # Page texts are small; assembling them here avoids another trip to a worker.
+                text, compaction = await asyncio.to_thread(_assemble, raw, max_length, min_block_chars)
+                metadata["ocr_pages"] = len(result.scans)
+            if failed:
+                metadata["ocr_failed_images"] = failed
+            logger.info(
+                "pdf_ocr",
+                pages=len(result.scans),
+                images=images,
+                failed=failed,
+                time_sec=round(time.time() - start_time, 2)
+            )
+
+        logger.info(
+            "pdf_extracted",
+            pages=result.pages,
+            parsed=result.parsed,
+            chars=len(text),
+            bytes_saved=compaction["bytes_saved"] if compaction else 0
+        )
+        if result.parsed < result.pages:
+            metadata["truncated"] = True
+            metadata["pages_parsed"] = result.parsed
+        if compaction:
+            metadata["compaction"] = compaction
         return ExtractionResult(
             input_type=InputType.PDF,
-            extracted_text=clean_text(text),
-            metadata={"pages": pages}
+            extracted_text=text,
+            metadata=metadata
         )
     except Exception as e:
         logger.error("pdf_extraction_failed", error=str(e), exc_info=True)
@@ -34,4 +236,3 @@ async def extract_pdf(content: bytes, filename: str | None = None) -> Extraction
             extracted_text="",
             error=str(e)
         )
-
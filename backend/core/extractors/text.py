@@ -1,12 +1,12 @@
 from schemas import ExtractionResult, InputType
-from utils.text import clean_text
+from utils.text import clean_text, decode_text
 
 
-async def extract_text(content: str | bytes) -> ExtractionResult:
+async def extract_text(content: str | bytes, max_length: int | None = None) -> ExtractionResult:
     if isinstance(content, bytes):
-        content = content.decode('utf-8', errors='ignore')
+        content = decode_text(content)
     
     return ExtractionResult(
         input_type=InputType.TEXT,
-        extracted_text=clean_text(content)
+        extracted_text=clean_text(content, max_length)
     )
@@ -1,6 +1,8 @@
 import asyncio
 from youtube_transcript_api import YouTubeTranscriptApi
 from youtube_transcript_api._errors import TranscriptsDisabled, NoTranscriptFound
+
+from infrastructure.circuit_breaker import YOUTUBE_TRANSCRIPTS, get_breaker
 from schemas import ExtractionResult, InputType
 from utils.text import clean_text, extract_video_id
 
@@ -19,7 +21,9 @@ async def extract_youtube(url: str) -> ExtractionResult:
             transcript = YouTubeTranscriptApi.get_transcript(video_id)
             return " ".join(entry['text'] for entry in transcript)
         
-        text = await asyncio.to_thread(_fetch)
+        # Videos without transcripts are answered normally and don't count against the service.
+        async with get_breaker(YOUTUBE_TRANSCRIPTS).guard(ignore=(TranscriptsDisabled, NoTranscriptFound)):
+            text = await asyncio.to_thread(_fetch)
         return ExtractionResult(
             input_type=InputType.YOUTUBE,
             extracted_text=clean_text(text),
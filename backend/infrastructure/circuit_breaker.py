@@ -0,0 +1,191 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from enum import Enum
+from functools import lru_cache
+from typing import AsyncIterator
+
+from infrastructure.config import get_settings
+from infrastructure.logging import get_logger
+from infrastructure.metrics import get_metrics
+from utils.errors import DeadlineExceededError, ServiceUnavailableError
+
+
+logger = get_logger("circuit_breaker")
+
+GEMINI_CHAT = "gemini_chat"
+GEMINI_VISION = "gemini_vision"
+DEEPGRAM = "deepgram"
+YOUTUBE_TRANSCRIPTS = "youtube_transcripts"
+
+DEPENDENCIES = (GEMINI_CHAT, GEMINI_VISION, DEEPGRAM, YOUTUBE_TRANSCRIPTS)
+
+
+class BreakerState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+_STATE_GAUGE = {BreakerState.CLOSED: 0, BreakerState.HALF_OPEN: 1, BreakerState.OPEN: 2}
+
+
+class CallOutcome:
+    """Handed to the guarded block so it can flag failures that aren't exceptions, like a 5xx status."""
+
+    def __init__(self):
+        self.failed = False
+
+    def fail(self) -> None:
+        self.failed = True
+
+
+class CircuitBreaker:
+    """Fails fast on a dependency that is erroring or slow.
+
+    Outcomes of the last ``window`` calls are kept; a call fails if it raises
+    (other than an ``ignore``d error, given here or to ``guard``), is flagged through ``CallOutcome.fail``,
+    or takes longer than ``slow_call_sec``. Once ``min_calls`` are recorded and
+    the failure rate reaches ``failure_rate``, the breaker opens and rejects
+    calls with ServiceUnavailableError for ``open_sec``. It then lets
+    ``half_open_trials`` probes through: if all succeed it closes, and if any
+    fails it opens again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window: int,
+        min_calls: int,
+        failure_rate: float,
+        slow_call_sec: float,
+        open_sec: float,
+        half_open_trials: int,
+        ignore: tuple[type[BaseException], ...] = ()
+    ):
+        self.name = name
+        self.ignore = ignore
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_sec = slow_call_sec
+        self.open_sec = open_sec
+        self.half_open_trials = max(1, half_open_trials)
+        self.metrics = get_metrics()
+        self._outcomes: deque[bool] = deque(maxlen=window)
+        self._state = BreakerState.CLOSED
+        self._opened_at = 0.0
+        self._trials_in_flight = 0
+        self._trial_successes = 0
+        self._publish()
+
+    @property
+    def state(self) -> BreakerState:
+        if self._state == BreakerState.OPEN and time.monotonic() - self._opened_at >= self.open_sec:
+            self._transition(BreakerState.HALF_OPEN)
+        return self._state
+
+    def retry_after(self) -> float:
+        return max(0.0, self.open_sec - (time.monotonic() - self._opened_at))
+
+    def snapshot(self) -> dict:
+        failures = sum(self._outcomes)
+        return {
+            "state": self.state.value,
+            "recent_calls": len(self._outcomes),
+            "failure_rate": round(failures / len(self._outcomes), 3) if self._outcomes else 0.0
+        }
+
+    @asynccontextmanager
+    async def guard(self, ignore: tuple[type[BaseException], ...] = ()) -> AsyncIterator[CallOutcome]:
+        ignored = (*self.ignore, *ignore)
+        trial = self._admit()
+        outcome = CallOutcome()
+        start = time.monotonic()
+        try:
+            yield outcome
+        except asyncio.CancelledError:
+            # The caller gave up; that says nothing about the dependency.
+            if trial:
+                self._trials_in_flight -= 1
+            raise
+        except ignored:
+            self._record(time.monotonic() - start > self.slow_call_sec, trial)
+            raise
+        except BaseException:
+            self._record(True, trial)
+            raise
+        else:
+            self._record(outcome.failed or time.monotonic() - start > self.slow_call_sec, trial)
+
+    def _admit(self) -> bool:
+        """Returns whether this call is a half-open trial; raises if the breaker is open."""
+        state = self.state
+        if state == BreakerState.CLOSED:
+            return False
+        if state == BreakerState.HALF_OPEN and self._trials_in_flight < self.half_open_trials:
+            self._trials_in_flight += 1
+            return True
+
+        self.metrics.increment("circuit_rejected_total", dependency=self.name)
+        retry_after = self.retry_after() or self.open_sec
+        raise ServiceUnavailableError(
+            f"{self.name} is temporarily unavailable",
+            retry_after=retry_after
+        )
+
+    def _record(self, failed: bool, trial: bool) -> None:
+        if trial:
+            self._trials_in_flight -= 1
+            if self._state != BreakerState.HALF_OPEN:
+                return
+            if failed:
+                self._transition(BreakerState.OPEN)
+            else:
+                self._trial_successes += 1
+                if self._trial_successes >= self.half_open_trials:
+                    self._transition(BreakerState.CLOSED)
+            return
+
+        if self._state != BreakerState.CLOSED:
+            return  # Started before the breaker opened.
+        self._outcomes.append(failed)
+        if len(self._outcomes) >= self.min_calls and sum(self._outcomes) / len(self._outcomes) >= self.failure_rate:
+            self._transition(BreakerState.OPEN)
+
+    def _transition(self, state: BreakerState) -> None:
+        previous, self._state = self._state, state
+        if state == BreakerState.OPEN:
+            self._opened_at = time.monotonic()
+        if state == BreakerState.HALF_OPEN:
+            self._trial_successes = 0
+        if state == BreakerState.CLOSED:
+            self._outcomes.clear()
+
+        log = logger.warning if state == BreakerState.OPEN else logger.info
+        log("circuit_state_changed", dependency=self.name, previous=previous.value, state=state.value)
+        self.metrics.increment("circuit_transitions_total", dependency=self.name, state=state.value)
+        self._publish()
+
+    def _publish(self) -> None:
+        self.metrics.set_gauge("circuit_state", _STATE_GAUGE[self._state], dependency=self.name)
+
+
+@lru_cache(maxsize=None)
+def get_breaker(name: str) -> CircuitBreaker:
+    settings = get_settings()
+    return CircuitBreaker(
+        name,
+        window=settings.breaker_window,
+        min_calls=settings.breaker_min_calls,
+        failure_rate=settings.breaker_failure_rate,
+        slow_call_sec=settings.breaker_slow_call_sec,
+        open_sec=settings.breaker_open_sec,
+        half_open_trials=settings.breaker_half_open_trials,
+        # The request running out of its own budget is no failure of the dependency.
+        ignore=(DeadlineExceededError,)
+    )
+
+
+def breaker_states() -> dict[str, dict]:
+    return {name: get_breaker(name).snapshot() for name in DEPENDENCIES}
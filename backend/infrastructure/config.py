@@ -13,11 +13,30 @@ class Settings(BaseSettings):
 
     environment: Environment = "development"
     debug: bool = True
+    # Admin profiling endpoints are served in debug outside production or when
+    # enabled here. Admin endpoints require an X-Admin-Token header matching
+    # admin_token, which must be set in production.
+    profiling_enabled: bool = False
+    admin_token: str = ""
 
     llm_model: str = "gemini-2.0-flash-exp"
+    llm_provider: Literal["gemini", "echo"] = "gemini"
     temperature: float = 0.3
     max_tokens: int = 8192
 
+    llm_routing_enabled: bool = True
+    llm_fallback_models: list[str] = ["gemini-1.5-flash"]
+    llm_small_input_chars: int = 4000
+    llm_default_latency_slo_ms: int | None = None
+    echo_latency_sec: float = 0.0
+
+    llm_hedging_enabled: bool = False
+    llm_hedge_percentile: float = 0.95
+    llm_hedge_min_samples: int = 20
+    llm_hedge_window: int = 200
+    llm_hedge_max_rate: float = 0.1
+    llm_hedge_min_delay_sec: float = 0.5
+
     max_file_size_mb: int = 50
     content_max_length: int = 50000
 
@@ -30,13 +49,90 @@ class Settings(BaseSettings):
         "audio/wav",
         "audio/mpeg",
         "audio/mp3",
+        "application/zip",
+        "application/x-zip-compressed",
     ]
 
+    preload_extractors: bool = False
+    warmup_timeout_sec: float = 60.0
+    warmup_connections: bool = True
+
+    archive_max_files: int = 200
+    archive_max_file_bytes: int = 100_000
+    archive_max_total_bytes: int = 5 * 1024 * 1024
+    code_analysis_concurrency: int = 4
+    code_analysis_cache_size: int = 2048
+    code_prepass_enabled: bool = True
+    code_prepass_min_chars: int = 2000
+    code_prepass_max_chars: int = 12000
+    image_batch_size: int = 8
+    pdf_ocr_enabled: bool = True
+    pdf_ocr_max_pages: int = 20
+    compaction_enabled: bool = True
+    compaction_min_block_chars: int = 40
+    speculative_summary_enabled: bool = False
+    speculative_min_chars: int = 8000
+    speculative_daily_budget_usd: float = 1.0
+    speculative_timeout_sec: float = 120.0
+    chunk_chars: int = 2000
+    session_state_max: int = 256
+    followup_context_chars: int = 12000
+    near_dup_cache_enabled: bool = True
+    near_dup_cache_threshold: float = 0.9
+    near_dup_cache_max_entries: int = 1024
+    near_dup_cache_ttl_sec: float = 3600.0
+    near_dup_cache_min_chars: int = 1000
+    near_dup_cache_per_session: bool = True
+    conversation_memory_enabled: bool = True
+    memory_budget_tokens: int = 2000
+    memory_keep_turns: int = 4
+    memory_max_turns: int = 50
+    memory_turn_max_chars: int = 4000
+    incremental_analysis_enabled: bool = True
+    incremental_min_chars: int = 2000
+    incremental_max_change_ratio: float = 0.3
+    incremental_context_lines: int = 3
+
+    process_pool_workers: int = 2
+    process_pool_max_tasks_per_child: int = 50
+    process_pool_memory_limit_mb: int = 1024
+    process_pool_task_timeout_sec: float = 60.0
+    process_pool_shm_min_bytes: int = 1024 * 1024
+
+    scheduler_interactive_concurrency: int = 32
+    scheduler_bulk_concurrency: int = 4
+    scheduler_background_concurrency: int = 2
+
+    deepgram_model: str = "nova-2"
+    deepgram_stream_url: str = "wss://api.deepgram.com/v1/listen"
     deepgram_timeout_sec: float = 60.0
     genai_timeout_sec: float = 30.0
+    llm_timeout_sec: float = 120.0
+
+    usage_ledger_enabled: bool = True
+    usage_ledger_path: str = "data/usage.sqlite3"
+    usage_ledger_batch_size: int = 200
+    usage_ledger_flush_interval_sec: float = 1.0
+    usage_ledger_queue_size: int = 10000
+
+    context_cache_enabled: bool = True
+    context_cache_min_chars: int = 16000
+    context_cache_ttl_sec: int = 600
+    request_timeout_sec: float = 180.0
+
+    breaker_window: int = 20
+    breaker_min_calls: int = 10
+    breaker_failure_rate: float = 0.5
+    breaker_slow_call_sec: float = 30.0
+    breaker_open_sec: float = 30.0
+    breaker_half_open_trials: int = 3
 
     ambiguity_confidence_threshold: float = 0.7
 
+    response_compression_min_bytes: int = 1024
+    gzip_level: int = 5
+    brotli_quality: int = 4
+
     cors_origins: list[str] = ["*"]
     rate_limit_enabled: bool = True
     rate_limit_per_minute: int = 60
@@ -0,0 +1,78 @@
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Iterator, TypeVar
+
+from utils.errors import DeadlineExceededError
+
+
+T = TypeVar("T")
+
+
+class Deadline:
+    """Time budget for one request, shared by every stage that serves it."""
+
+    def __init__(self, budget_sec: float):
+        self.budget_sec = budget_sec
+        self.expires_at = time.monotonic() + budget_sec
+        # Set when the client disconnects; checked by work running in threads.
+        self.cancelled = False
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    @property
+    def stopped(self) -> bool:
+        return self.cancelled or self.expired
+
+    def timeout(self, cap: float | None = None) -> float:
+        remaining = self.remaining()
+        return min(remaining, cap) if cap is not None else remaining
+
+
+_current_deadline: ContextVar[Deadline | None] = ContextVar("deadline", default=None)
+
+
+def current_deadline() -> Deadline | None:
+    return _current_deadline.get()
+
+
+@contextmanager
+def deadline_scope(budget_sec: float) -> Iterator[Deadline]:
+    deadline = Deadline(budget_sec)
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def stage_timeout(cap: float | None = None) -> float | None:
+    """Timeout for the next stage: the remaining budget, capped at ``cap``."""
+    deadline = current_deadline()
+    return deadline.timeout(cap) if deadline else cap
+
+
+async def run_stage(stage: str, awaitable: Awaitable[T], cap: float | None = None) -> T:
+    """Await a stage with the remaining request budget as its timeout.
+
+    Raises DeadlineExceededError when the request budget runs out, and
+    asyncio.TimeoutError when only the stage's own ``cap`` was hit.
+    """
+    deadline = current_deadline()
+    if deadline is not None and deadline.expired:
+        if asyncio.iscoroutine(awaitable):
+            awaitable.close()
+        raise DeadlineExceededError(f"Request deadline exceeded before {stage}")
+
+    try:
+        return await asyncio.wait_for(awaitable, stage_timeout(cap))
+    except asyncio.TimeoutError:
+        if deadline is not None and deadline.expired:
+            raise DeadlineExceededError(f"Request deadline exceeded during {stage}") from None
+        raise
@@ -1,24 +1,32 @@
 from functools import lru_cache
-
-from google import genai
-import httpx
+from typing import TYPE_CHECKING
 
 from infrastructure.config import get_settings
+from infrastructure.llm.context_cache import get_context_cache
+from infrastructure.llm.similarity_cache import get_similarity_cache
 from infrastructure.session_manager import SessionManager
 
+if TYPE_CHECKING:
+    import httpx
+    from google import genai
+
 
 @lru_cache()
-def get_genai_client() -> genai.Client:
+def get_genai_client() -> "genai.Client":
+    from google import genai
+
     settings = get_settings()
     return genai.Client(api_key=settings.google_api_key)
 
 
-_httpx_client: httpx.AsyncClient | None = None
+_httpx_client: "httpx.AsyncClient | None" = None
 
 
-async def get_httpx_client() -> httpx.AsyncClient:
+async def get_httpx_client() -> "httpx.AsyncClient":
     global _httpx_client
     if _httpx_client is None:
+        import httpx
+
         settings = get_settings()
         _httpx_client = httpx.AsyncClient(timeout=settings.deepgram_timeout_sec)
     return _httpx_client
@@ -37,5 +45,7 @@ _session_manager: SessionManager | None = None
 def get_session_manager() -> SessionManager:
     global _session_manager
     if _session_manager is None:
-        _session_manager = SessionManager()
+        _session_manager = SessionManager(max_sessions=get_settings().session_state_max)
+        _session_manager.add_reset_hook(get_context_cache().expire_session)
+        _session_manager.add_reset_hook(get_similarity_cache().expire_session)
     return _session_manager
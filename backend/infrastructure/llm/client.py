@@ -1,14 +1,28 @@
 from functools import lru_cache
-from langchain_google_genai import ChatGoogleGenerativeAI
+from typing import Any
+
+from pydantic import BaseModel
+
 from infrastructure.config import get_settings
+from .providers import ChatModel, get_provider
 
 
-@lru_cache()
-def get_llm_client() -> ChatGoogleGenerativeAI:
+def get_llm_client(model: str | None = None) -> ChatModel:
+    settings = get_settings()
+    return _build_llm_client(settings.llm_provider, model or settings.llm_model)
+
+
+def get_structured_llm(schema: type[BaseModel], model: str | None = None) -> Any:
+    """The model bound to ``schema``, built once per (model, schema) rather than per call."""
     settings = get_settings()
-    return ChatGoogleGenerativeAI(
-        model=settings.llm_model,
-        google_api_key=settings.google_api_key,
-        temperature=settings.temperature,
-        max_output_tokens=settings.max_tokens
-    )
+    return _build_structured_llm(settings.llm_provider, model or settings.llm_model, schema)
+
+
+@lru_cache()
+def _build_llm_client(provider: str, model: str) -> ChatModel:
+    return get_provider(provider).create_chat_model(model)
+
+
+@lru_cache()
+def _build_structured_llm(provider: str, model: str, schema: type[BaseModel]) -> Any:
+    return _build_llm_client(provider, model).with_structured_output(schema)
@@ -0,0 +1,274 @@
+import asyncio
+import hashlib
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from functools import lru_cache
+
+from infrastructure.circuit_breaker import GEMINI_CHAT, get_breaker
+from infrastructure.config import get_settings
+from infrastructure.deadline import run_stage
+from infrastructure.logging import get_logger
+
+
+logger = get_logger("llm.context_cache")
+
+# Smallest context, in tokens, each model accepts for explicit caching.
+MIN_CACHE_TOKENS = {
+    "gemini-2.0-flash-exp": 4096,
+    "gemini-1.5-flash": 32768,
+    "gemini-1.5-pro": 32768,
+}
+DEFAULT_MIN_CACHE_TOKENS = 32768
+
+# Rough chars per token, matching the estimate used for usage accounting.
+CHARS_PER_TOKEN = 4
+
+# How often expired handles and idle locks are swept.
+PRUNE_INTERVAL_SEC = 60.0
+
+
+@dataclass
+class CacheHandle:
+    name: str
+    model: str
+    content_hash: str
+    expires_at: float
+
+    @property
+    def expired(self) -> bool:
+        return time.time() >= self.expires_at
+
+
+@dataclass
+class CachedCompletion:
+    text: str
+    input_tokens: int
+    cached_tokens: int
+    output_tokens: int
+
+
+class ContextCacheBackend(ABC):
+    @abstractmethod
+    async def create(self, model: str, system_prompt: str, context: str, ttl_sec: int) -> str:
+        """Upload the context and return the provider's cache name."""
+
+    @abstractmethod
+    async def generate(self, name: str, model: str, prompt: str) -> CachedCompletion:
+        pass
+
+    @abstractmethod
+    async def delete(self, name: str) -> None:
+        pass
+
+    def rejection(self, error: Exception) -> str | None:
+        """Why ``create`` refused to cache at all: "too_small", "unsupported", or None for other errors."""
+        return None
+
+
+class GeminiContextCache(ContextCacheBackend):
+    """Gemini explicit context caching through the google.genai SDK."""
+
+    async def create(self, model: str, system_prompt: str, context: str, ttl_sec: int) -> str:
+        from google.genai import types
+        from infrastructure.dependencies import get_genai_client
+
+        cache = await get_genai_client().aio.caches.create(
+            model=model,
+            config=types.CreateCachedContentConfig(
+                contents=[types.Content(role="user", parts=[types.Part(text=context)])],
+                system_instruction=system_prompt,
+                ttl=f"{ttl_sec}s"
+            )
+        )
+        return cache.name
+
+    async def generate(self, name: str, model: str, prompt: str) -> CachedCompletion:
+        from google.genai import types
+        from infrastructure.dependencies import get_genai_client
+
+        settings = get_settings()
+        response = await get_genai_client().aio.models.generate_content(
+            model=model,
+            contents=prompt,
+            config=types.GenerateContentConfig(
+                cached_content=name,
+                temperature=settings.temperature,
+                max_output_tokens=settings.max_tokens
+            )
+        )
+        usage = response.usage_metadata
+        return CachedCompletion(
+            text=response.text or "",
+            input_tokens=usage.prompt_token_count or 0,
+            cached_tokens=usage.cached_content_token_count or 0,
+            output_tokens=usage.candidates_token_count or 0
+        )
+
+    async def delete(self, name: str) -> None:
+        from infrastructure.dependencies import get_genai_client
+
+        await get_genai_client().aio.caches.delete(name=name)
+
+    def rejection(self, error: Exception) -> str | None:
+        from google.genai.errors import ClientError
+
+        if not isinstance(error, ClientError) or error.code != 400:
+            return None
+        message = (error.message or "").lower()
+        if "too small" in message or "min_total_token_count" in message:
+            return "too_small"
+        if "not supported" in message:
+            return "unsupported"
+        return None
+
+
+class LocalContextCache(ContextCacheBackend):
+    """Offline stand-in that keeps contexts in memory and echoes the prompt."""
+
+    def __init__(self):
+        self._contexts: dict[str, str] = {}
+
+    async def create(self, model: str, system_prompt: str, context: str, ttl_sec: int) -> str:
+        name = f"cachedContents/local-{uuid.uuid4().hex[:12]}"
+        self._contexts[name] = context
+        return name
+
+    async def generate(self, name: str, model: str, prompt: str) -> CachedCompletion:
+        context = self._contexts[name]
+        text = f"[{model}:cached] {prompt}"
+        cached_tokens = len(context) // 4
+        return CachedCompletion(
+            text=text,
+            input_tokens=cached_tokens + len(prompt) // 4,
+            cached_tokens=cached_tokens,
+            output_tokens=len(text) // 4
+        )
+
+    async def delete(self, name: str) -> None:
+        self._contexts.pop(name, None)
+
+
+class ContextCacheManager:
+    """Per-session provider caches for large documents queried repeatedly.
+
+    Handles are keyed by session, model and content hash, so re-sending the
+    same document in a session reuses the cache instead of paying to prefill
+    it again. Handles are deleted when the session is reset, and dropped
+    once expired, since the provider has then deleted them itself.
+
+    A context is only sent for caching when it is estimated to reach the
+    model's minimum cacheable size. If the provider still finds it too
+    small, the minimum for that model is raised to match; a model the
+    provider cannot cache for at all is not tried again.
+    """
+
+    def __init__(self, backend: ContextCacheBackend):
+        self.backend = backend
+        self.settings = get_settings()
+        self._handles: dict[str, dict[tuple[str, str], CacheHandle]] = {}
+        self._locks: dict[tuple[str, str, str], asyncio.Lock] = {}
+        self._unsupported_models: set[str] = set()
+        self._min_chars: dict[str, int] = {}
+        self._pruned_at = time.time()
+
+    def min_chars(self, model: str) -> int:
+        """Smallest context sent for caching on ``model``."""
+        learned = self._min_chars.get(model, 0)
+        tokens = MIN_CACHE_TOKENS.get(model, DEFAULT_MIN_CACHE_TOKENS)
+        return max(self.settings.context_cache_min_chars, tokens * CHARS_PER_TOKEN, learned)
+
+    def should_cache(self, context: str, model: str) -> bool:
+        return (
+            self.settings.context_cache_enabled
+            and model not in self._unsupported_models
+            and len(context) >= self.min_chars(model)
+        )
+
+    async def get_or_create(
+        self,
+        session_id: str,
+        model: str,
+        system_prompt: str,
+        context: str
+    ) -> CacheHandle:
+        content_hash = hashlib.sha256(context.encode()).hexdigest()
+        key = (model, content_hash)
+        self._prune()
+        lock = self._locks.setdefault((session_id, *key), asyncio.Lock())
+
+        async with lock:
+            handle = self._handles.get(session_id, {}).get(key)
+            if handle and not handle.expired:
+                return handle
+
+            ttl_sec = self.settings.context_cache_ttl_sec
+            try:
+                async with get_breaker(GEMINI_CHAT).guard():
+                    name = await run_stage(
+                        "context_cache",
+                        self.backend.create(model, system_prompt, context, ttl_sec),
+                        self.settings.llm_timeout_sec
+                    )
+            except Exception as e:
+                # Timeouts, rate limits and outages are transient and not held against the model.
+                rejection = self.backend.rejection(e)
+                if rejection == "too_small":
+                    self._min_chars[model] = max(self._min_chars.get(model, 0), len(context) + 1)
+                elif rejection == "unsupported":
+                    self._unsupported_models.add(model)
+                if rejection:
+                    logger.warning("context_cache_rejected", model=model, reason=rejection, chars=len(context))
+                raise
+
+            # Refresh slightly before the provider expires it.
+            handle = CacheHandle(name, model, content_hash, time.time() + ttl_sec * 0.9)
+            self._handles.setdefault(session_id, {})[key] = handle
+            logger.info("context_cache_created", session_id=session_id, model=model, chars=len(context))
+            return handle
+
+    async def generate(self, handle: CacheHandle, prompt: str) -> CachedCompletion:
+        async with get_breaker(GEMINI_CHAT).guard():
+            return await run_stage(
+                "llm",
+                self.backend.generate(handle.name, handle.model, prompt),
+                self.settings.llm_timeout_sec
+            )
+
+    def _prune(self) -> None:
+        """Forget expired handles, and locks nobody holds that no longer guard a handle."""
+        now = time.time()
+        if now - self._pruned_at < PRUNE_INTERVAL_SEC:
+            return
+        self._pruned_at = now
+        for session_id, handles in list(self._handles.items()):
+            for key in [k for k, handle in handles.items() if handle.expired]:
+                del handles[key]
+            if not handles:
+                del self._handles[session_id]
+        for lock_key, lock in list(self._locks.items()):
+            session_id, *key = lock_key
+            if not lock.locked() and tuple(key) not in self._handles.get(session_id, {}):
+                del self._locks[lock_key]
+
+    async def expire_session(self, session_id: str) -> None:
+        handles = self._handles.pop(session_id, {})
+        for lock_key in [k for k in self._locks if k[0] == session_id]:
+            del self._locks[lock_key]
+        for handle in handles.values():
+            try:
+                await self.backend.delete(handle.name)
+            except Exception as e:
+                logger.warning("context_cache_delete_failed", name=handle.name, error=str(e))
+
+    async def close(self) -> None:
+        for session_id in list(self._handles):
+            await self.expire_session(session_id)
+
+
+@lru_cache()
+def get_context_cache() -> ContextCacheManager:
+    settings = get_settings()
+    backend = LocalContextCache() if settings.llm_provider == "echo" else GeminiContextCache()
+    return ContextCacheManager(backend)
@@ -0,0 +1,107 @@
+import asyncio
+from collections import deque
+from functools import lru_cache
+from typing import Awaitable, Callable, TypeVar
+
+from infrastructure.config import get_settings
+from infrastructure.logging import get_logger
+from infrastructure.metrics import get_metrics
+
+
+logger = get_logger("llm.hedging")
+
+T = TypeVar("T")
+
+
+class HedgePolicy:
+    """Decides when a slow LLM call gets a duplicate.
+
+    The hedge delay is a percentile of recent latencies for the same model and
+    task, so only the slow tail is duplicated. A sliding window over recent
+    calls caps the share of calls that may be hedged, which bounds the extra
+    spend even when the provider is uniformly slow.
+    """
+
+    def __init__(self, percentile: float, min_samples: int, window: int, max_rate: float, min_delay_sec: float):
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.max_rate = max_rate
+        self.min_delay_sec = min_delay_sec
+        self._window = window
+        self._latencies: dict[tuple[str, str], deque[float]] = {}
+        self._recent_hedges: deque[bool] = deque(maxlen=window)
+
+    def observe(self, model: str, task: str, latency_sec: float) -> None:
+        self._latencies.setdefault((model, task), deque(maxlen=self._window)).append(latency_sec)
+
+    def delay(self, model: str, task: str) -> float | None:
+        """Seconds to wait before hedging, or None while there are too few samples."""
+        samples = self._latencies.get((model, task))
+        if not samples or len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(self.percentile * len(ordered)))
+        return max(self.min_delay_sec, ordered[index])
+
+    def try_acquire(self) -> bool:
+        """Take a hedge from the budget if the recent hedge rate allows it."""
+        hedged = sum(self._recent_hedges)
+        allowed = hedged < self.max_rate * max(len(self._recent_hedges), 1)
+        self._recent_hedges.append(allowed)
+        return allowed
+
+    def count_call(self) -> None:
+        self._recent_hedges.append(False)
+
+    async def run(self, model: str, task: str, call: Callable[[], Awaitable[T]]) -> tuple[T, bool]:
+        """Run ``call``, issuing a duplicate if it outlives the hedge delay.
+
+        The first successful result wins and the other call is cancelled.
+        Returns the result and whether a duplicate was issued.
+        """
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        primary = asyncio.ensure_future(call())
+        tasks = {primary}
+        hedged = False
+        try:
+            delay = self.delay(model, task)
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                if not done and self.try_acquire():
+                    hedged = True
+                    tasks.add(asyncio.ensure_future(call()))
+                    logger.info("llm_hedge_issued", model=model, task=task, delay_sec=round(delay, 3))
+                elif done:
+                    self.count_call()
+            else:
+                self.count_call()
+
+            pending = set(tasks)
+            error: BaseException | None = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task_done in done:
+                    if task_done.exception() is None:
+                        self.observe(model, task, loop.time() - start)
+                        if hedged:
+                            outcome = "primary" if task_done is primary else "hedge"
+                            get_metrics().increment("llm_hedges_total", model=model, winner=outcome)
+                        return task_done.result(), hedged
+                    error = error or task_done.exception()
+            raise error
+        finally:
+            for pending_task in tasks:
+                pending_task.cancel()
+
+
+@lru_cache()
+def get_hedge_policy() -> HedgePolicy:
+    settings = get_settings()
+    return HedgePolicy(
+        percentile=settings.llm_hedge_percentile,
+        min_samples=settings.llm_hedge_min_samples,
+        window=settings.llm_hedge_window,
+        max_rate=settings.llm_hedge_max_rate,
+        min_delay_sec=settings.llm_hedge_min_delay_sec
+    )
@@ -1,3 +1,6 @@
+# Cached context tokens are billed at this fraction of the input price.
+CACHED_INPUT_RATE = 0.25
+
 PRICING = {
     "gemini-2.0-flash-exp": {"input": 0.10, "output": 0.40},
     "gemini-1.5-flash": {"input": 0.075, "output": 0.30},
@@ -11,3 +14,12 @@ def get_model_pricing(model: str) -> dict[str, float]:
         if key in model:
             return PRICING[key]
     return PRICING["default"]
+
+
+def call_cost(model: str, input_tokens: int, output_tokens: int, cached_tokens: int = 0) -> float:
+    """USD cost of one call; ``cached_tokens`` is the part of ``input_tokens`` served from a context cache."""
+    pricing = get_model_pricing(model)
+    cost = ((input_tokens - cached_tokens) / 1_000_000) * pricing["input"]
+    cost += (cached_tokens / 1_000_000) * pricing["input"] * CACHED_INPUT_RATE
+    cost += (output_tokens / 1_000_000) * pricing["output"]
+    return cost
@@ -0,0 +1,106 @@
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Any, Protocol, get_origin
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from pydantic import BaseModel
+
+from infrastructure.config import get_settings
+
+
+class ChatModel(Protocol):
+    async def ainvoke(self, messages: list[BaseMessage]) -> Any: ...
+
+    def with_structured_output(self, schema: type[BaseModel]) -> Any: ...
+
+
+class LLMProvider(ABC):
+    name: str = ""
+
+    @abstractmethod
+    def create_chat_model(self, model: str) -> ChatModel:
+        pass
+
+
+class GeminiProvider(LLMProvider):
+    name = "gemini"
+
+    def create_chat_model(self, model: str) -> ChatModel:
+        from langchain_google_genai import ChatGoogleGenerativeAI
+
+        settings = get_settings()
+        return ChatGoogleGenerativeAI(
+            model=model,
+            google_api_key=settings.google_api_key,
+            temperature=settings.temperature,
+            max_output_tokens=settings.max_tokens
+        )
+
+
+class EchoChatModel:
+    """Offline chat model that answers with the last human message.
+
+    Used for tests and benchmarks so the full request path can run without
+    network access or API keys.
+    """
+
+    def __init__(self, model: str, latency_sec: float = 0.0):
+        self.model = model
+        self.latency_sec = latency_sec
+
+    async def ainvoke(self, messages: list[BaseMessage]) -> AIMessage:
+        if self.latency_sec:
+            await asyncio.sleep(self.latency_sec)
+        return AIMessage(content=f"[{self.model}] {self._last_human(messages)}")
+
+    def with_structured_output(self, schema: type[BaseModel]) -> "EchoStructuredModel":
+        return EchoStructuredModel(self, schema)
+
+    @staticmethod
+    def _last_human(messages: list[BaseMessage]) -> str:
+        for message in reversed(messages):
+            if isinstance(message, HumanMessage):
+                return str(message.content)
+        return ""
+
+
+class EchoStructuredModel:
+    def __init__(self, chat_model: EchoChatModel, schema: type[BaseModel]):
+        self.chat_model = chat_model
+        self.schema = schema
+
+    async def ainvoke(self, messages: list[BaseMessage]) -> BaseModel:
+        response = await self.chat_model.ainvoke(messages)
+        text = response.content[:200]
+        values = {}
+        for name, field in self.schema.model_fields.items():
+            annotation = field.annotation
+            if annotation is str:
+                values[name] = text
+            elif get_origin(annotation) is list or annotation is list:
+                values[name] = [text]
+            elif annotation in (int, float):
+                values[name] = annotation(0)
+            elif annotation is bool:
+                values[name] = False
+        return self.schema(**values)
+
+
+class EchoProvider(LLMProvider):
+    name = "echo"
+
+    def create_chat_model(self, model: str) -> ChatModel:
+        return EchoChatModel(model, latency_sec=get_settings().echo_latency_sec)
+
+
+PROVIDERS: dict[str, type[LLMProvider]] = {
+    GeminiProvider.name: GeminiProvider,
+    EchoProvider.name: EchoProvider,
+}
+
+
+def get_provider(name: str) -> LLMProvider:
+    provider_cls = PROVIDERS.get(name)
+    if provider_cls is None:
+        raise ValueError(f"Unknown LLM provider: {name}")
+    return provider_cls()
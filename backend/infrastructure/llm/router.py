@@ -0,0 +1,195 @@
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
+
+from langchain_core.exceptions import OutputParserException
+from langchain_core.messages import BaseMessage
+from pydantic import BaseModel, ValidationError
+
+from infrastructure.circuit_breaker import GEMINI_CHAT, get_breaker
+from infrastructure.config import get_settings
+from infrastructure.deadline import run_stage
+from infrastructure.logging import get_logger
+from schemas import TaskType
+from utils.errors import AgentError, DeadlineExceededError, ServiceUnavailableError
+from .client import get_llm_client, get_structured_llm
+from .hedging import get_hedge_policy
+from .pricing import get_model_pricing
+
+
+logger = get_logger("llm.router")
+
+# Raised locally when a structured answer doesn't parse; the model did respond.
+PARSE_ERRORS = (OutputParserException, ValidationError)
+
+
+@dataclass(frozen=True)
+class ModelProfile:
+    name: str
+    max_input_chars: int
+    base_latency_ms: int
+    ms_per_1k_chars: float
+    quality: int
+
+
+MODEL_PROFILES = {
+    "gemini-2.0-flash-exp": ModelProfile("gemini-2.0-flash-exp", 4_000_000, 1500, 20.0, 2),
+    "gemini-1.5-flash": ModelProfile("gemini-1.5-flash", 4_000_000, 1200, 15.0, 1),
+    "gemini-1.5-pro": ModelProfile("gemini-1.5-pro", 8_000_000, 4000, 60.0, 3),
+}
+
+# Minimum quality tier per task; chat on small inputs may drop to the fast tier.
+TASK_MIN_QUALITY = {
+    TaskType.CHAT: 2,
+    TaskType.SUMMARIZE: 2,
+    TaskType.CODE_EXPLAIN: 2,
+    TaskType.SENTIMENT: 1,
+}
+
+
+@dataclass
+class RoutedResponse:
+    output: Any
+    model: str
+    latency_sec: float
+    # A duplicate call was issued, so the input was paid for twice.
+    hedged: bool = False
+    input_chars: int = 0
+
+    @property
+    def text(self) -> str:
+        """The reply text of a chat call; content may come back as a string, a list of parts or a dict."""
+        content = self.output.content
+        if isinstance(content, list):
+            parts = []
+            for part in content:
+                if isinstance(part, str):
+                    parts.append(part)
+                elif isinstance(part, dict) and 'text' in part:
+                    parts.append(part['text'])
+                else:
+                    parts.append(str(part))
+            return "".join(parts)
+        if isinstance(content, dict) and 'text' in content:
+            return content['text']
+        return content
+
+
+class ModelRouter:
+    """Chooses a model per call from task type, input size and latency SLO.
+
+    Only the configured models, ``llm_model`` and ``llm_fallback_models``,
+    are candidates; ``MODEL_PROFILES`` just describes their speed and tier.
+    """
+
+    def __init__(self):
+        self.settings = get_settings()
+        self.hedge_policy = get_hedge_policy()
+
+    def profile(self, model: str) -> ModelProfile:
+        return MODEL_PROFILES.get(model) or ModelProfile(model, 4_000_000, 1500, 20.0, 2)
+
+    def estimate_latency_ms(self, model: str, input_chars: int) -> float:
+        profile = self.profile(model)
+        return profile.base_latency_ms + profile.ms_per_1k_chars * input_chars / 1000
+
+    def estimate_cost(self, model: str, input_chars: int) -> float:
+        pricing = get_model_pricing(model)
+        return (input_chars // 4) / 1_000_000 * pricing["input"]
+
+    def models(self) -> list[str]:
+        """Every model ``route`` may return: those this deployment is configured to call."""
+        settings = self.settings
+        return list(dict.fromkeys([settings.llm_model, *settings.llm_fallback_models]))
+
+    def prepare(self, schemas: list[type[BaseModel]]) -> int:
+        """Build the clients and structured-output runnables for every routable model ahead of use."""
+        built = 0
+        for model in self.models():
+            get_llm_client(model)
+            for schema in schemas:
+                get_structured_llm(schema, model)
+            built += 1 + len(schemas)
+        return built
+
+    def route(
+        self,
+        task: TaskType,
+        input_chars: int,
+        latency_slo_ms: int | None = None
+    ) -> list[str]:
+        """Return candidate models in the order they should be tried."""
+        settings = self.settings
+        fallbacks = [settings.llm_model, *settings.llm_fallback_models]
+
+        if not settings.llm_routing_enabled:
+            return list(dict.fromkeys(fallbacks))
+
+        min_quality = TASK_MIN_QUALITY.get(task, 2)
+        if task == TaskType.CHAT and input_chars <= settings.llm_small_input_chars:
+            min_quality = 1
+
+        latency_slo_ms = latency_slo_ms or settings.llm_default_latency_slo_ms
+        eligible = [
+            m for m in self.models()
+            if self.profile(m).quality >= min_quality
+            and self.profile(m).max_input_chars >= input_chars
+        ]
+
+        if latency_slo_ms:
+            within_slo = [
+                m for m in eligible
+                if self.estimate_latency_ms(m, input_chars) <= latency_slo_ms
+            ]
+            # Nothing meets the SLO: settle for the fastest eligible model.
+            eligible = within_slo or sorted(
+                eligible, key=lambda m: self.estimate_latency_ms(m, input_chars)
+            )[:1]
+
+        eligible.sort(key=lambda m: (
+            self.estimate_cost(m, input_chars),
+            self.estimate_latency_ms(m, input_chars)
+        ))
+        return list(dict.fromkeys([*eligible[:1], *fallbacks]))
+
+    async def ainvoke(
+        self,
+        task: TaskType,
+        messages: list[BaseMessage],
+        *,
+        schema: type[BaseModel] | None = None,
+        input_chars: int | None = None,
+        latency_slo_ms: int | None = None
+    ) -> RoutedResponse:
+        if input_chars is None:
+            input_chars = sum(len(str(m.content)) for m in messages)
+
+        last_error: Exception | None = None
+        for model in self.route(task, input_chars, latency_slo_ms):
+            start_time = time.time()
+            try:
+                runnable = get_structured_llm(schema, model) if schema else get_llm_client(model)
+
+                def call():
+                    return run_stage("llm", runnable.ainvoke(messages), self.settings.llm_timeout_sec)
+
+                async with get_breaker(GEMINI_CHAT).guard(ignore=PARSE_ERRORS):
+                    if self.settings.llm_hedging_enabled:
+                        output, hedged = await self.hedge_policy.run(model, task.value, call)
+                    else:
+                        output, hedged = await call(), False
+                return RoutedResponse(output, model, time.time() - start_time, hedged, input_chars)
+            except (DeadlineExceededError, ServiceUnavailableError):
+                # Fallback models share the provider, so there is no point trying them.
+                raise
+            except Exception as e:
+                logger.warning("llm_model_failed", model=model, task=task.value, error=str(e) or type(e).__name__)
+                last_error = e
+
+        raise AgentError(f"All models failed: {str(last_error) or type(last_error).__name__}") from last_error
+
+
+@lru_cache()
+def get_model_router() -> ModelRouter:
+    return ModelRouter()
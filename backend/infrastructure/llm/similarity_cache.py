@@ -0,0 +1,126 @@
+import asyncio
+import hashlib
+import itertools
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+
+from infrastructure.config import get_settings
+from infrastructure.logging import get_logger
+from infrastructure.metrics import get_metrics
+from utils.minhash import LSHIndex, MinHasher
+
+
+logger = get_logger("llm.similarity_cache")
+
+NUM_PERM = 64
+BANDS = 16
+
+
+@dataclass(frozen=True)
+class Fingerprint:
+    """Where a response for this input is looked up and stored; empty when the input isn't cacheable."""
+    kind: str
+    namespace: str
+    signature: tuple[int, ...] | None
+    session_id: str = ""
+
+
+@dataclass
+class _Entry:
+    response: str
+    created_at: float
+    session_id: str
+
+
+class NearDuplicateCache:
+    """Reuses LLM responses for inputs that are near-duplicates of ones already answered.
+
+    Inputs are fingerprinted with MinHash over word shingles, so the same
+    document re-sent with different whitespace, formatting or a changed date
+    still matches. An entry is returned when its estimated similarity is at
+    least ``threshold`` and it is in the same namespace: the task, the exact
+    question for chats, and the session unless the cache is global. The
+    index holds at most ``max_entries``, evicting the least recently used.
+    Resetting a session drops the entries it stored.
+    """
+
+    def __init__(
+        self,
+        enabled: bool,
+        threshold: float,
+        max_entries: int,
+        ttl_sec: float,
+        min_chars: int,
+        per_session: bool
+    ):
+        self.enabled = enabled
+        self.threshold = threshold
+        self.ttl_sec = ttl_sec
+        self.min_chars = min_chars
+        self.per_session = per_session
+        self.hasher = MinHasher(NUM_PERM)
+        self.index: LSHIndex[int, _Entry] = LSHIndex(NUM_PERM, BANDS, max_entries)
+        self.metrics = get_metrics()
+        self._ids = itertools.count()
+        self._lookups: dict[str, list[int]] = {}
+
+    async def lookup(self, kind: str, session_id: str, text: str, question: str = "") -> tuple[str | None, Fingerprint]:
+        """A cached response for ``text`` if there is one, plus the fingerprint to ``store`` a new one under."""
+        if not self.enabled or len(text) < self.min_chars:
+            return None, Fingerprint(kind, "", None)
+
+        signature = await asyncio.to_thread(self.hasher.signature, text)
+        fingerprint = Fingerprint(kind, self._namespace(kind, session_id, question), signature, session_id)
+        if signature is None:
+            return None, fingerprint
+
+        match = self.index.query(signature, self.threshold, fingerprint.namespace)
+        if match is not None and time.time() - match[1].created_at > self.ttl_sec:
+            self.index.remove(match[0])
+            match = None
+
+        self._count(kind, hit=match is not None)
+        if match is None:
+            return None, fingerprint
+        logger.info("near_duplicate_hit", kind=kind, similarity=round(match[2], 3))
+        return match[1].response, fingerprint
+
+    def store(self, fingerprint: Fingerprint, response: str) -> None:
+        if fingerprint.signature is None:
+            return
+        entry = _Entry(response, time.time(), fingerprint.session_id)
+        self.index.add(next(self._ids), fingerprint.signature, entry, fingerprint.namespace)
+        self.metrics.set_gauge("near_dup_cache_entries", len(self.index))
+
+    async def expire_session(self, session_id: str) -> None:
+        removed = self.index.remove_if(lambda entry: entry.session_id == session_id)
+        if removed:
+            self.metrics.set_gauge("near_dup_cache_entries", len(self.index))
+            logger.info("near_duplicate_session_expired", session_id=session_id, entries=removed)
+
+    def _namespace(self, kind: str, session_id: str, question: str) -> str:
+        parts = [kind, session_id if self.per_session else ""]
+        if question:
+            parts.append(hashlib.sha256(" ".join(question.lower().split()).encode()).hexdigest())
+        return "|".join(parts)
+
+    def _count(self, kind: str, hit: bool) -> None:
+        counts = self._lookups.setdefault(kind, [0, 0])
+        counts[0] += hit
+        counts[1] += 1
+        self.metrics.increment("near_dup_cache_lookups_total", kind=kind, outcome="hit" if hit else "miss")
+        self.metrics.set_gauge("near_dup_cache_hit_rate", round(counts[0] / counts[1], 4), kind=kind)
+
+
+@lru_cache()
+def get_similarity_cache() -> NearDuplicateCache:
+    settings = get_settings()
+    return NearDuplicateCache(
+        enabled=settings.near_dup_cache_enabled,
+        threshold=settings.near_dup_cache_threshold,
+        max_entries=settings.near_dup_cache_max_entries,
+        ttl_sec=settings.near_dup_cache_ttl_sec,
+        min_chars=settings.near_dup_cache_min_chars,
+        per_session=settings.near_dup_cache_per_session
+    )
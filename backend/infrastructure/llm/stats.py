@@ -1,33 +1,124 @@
-from .pricing import get_model_pricing
+from infrastructure.usage_ledger import UsageRecord, get_usage_ledger
+from .pricing import call_cost
 
 
 class TokenStats:
-    def __init__(self, model: str = "default"):
+    def __init__(self, model: str = "default", session_id: str | None = None):
+        self.session_id = session_id
         self.input_tokens = 0
         self.output_tokens = 0
+        self.cached_tokens = 0
+        self.hedged_calls = 0
+        self.hedge_tokens = 0
+        self.speculative_calls = 0
+        self.speculative_tokens = 0
+        self.speculative_cost_usd = 0.0
+        self.speculative_served = 0
+        self.near_duplicate_hits = 0
+        self.incremental_analyses = 0
         self.total_time = 0.0
         self.model = model
-    
-    def add(self, input_tokens: int, output_tokens: int, time_taken: float):
+        self.by_model: dict[str, dict[str, int]] = {}
+
+    def add(
+        self,
+        input_tokens: int,
+        output_tokens: int,
+        time_taken: float,
+        model: str | None = None,
+        cached_tokens: int = 0,
+        hedged: bool = False
+    ):
+        """Record one call. ``cached_tokens`` is the part of ``input_tokens`` served from a context cache.
+
+        ``hedged`` means a duplicate request was issued; its input is billed
+        again and tracked as hedge overhead. The call is also appended to the
+        durable usage ledger.
+        """
+        model = model or self.model
         self.input_tokens += input_tokens
         self.output_tokens += output_tokens
+        self.cached_tokens += cached_tokens
         self.total_time += time_taken
-    
+
+        usage = self.by_model.setdefault(
+            model,
+            {"input_tokens": 0, "output_tokens": 0, "cached_tokens": 0, "hedge_tokens": 0}
+        )
+        usage["input_tokens"] += input_tokens
+        usage["output_tokens"] += output_tokens
+        usage["cached_tokens"] += cached_tokens
+
+        get_usage_ledger().record(UsageRecord(
+            kind="llm",
+            model=model,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            cached_tokens=cached_tokens,
+            latency_sec=time_taken,
+            cost_usd=call_cost(model, input_tokens, output_tokens, cached_tokens),
+            session_id=self.session_id
+        ))
+
+        if hedged:
+            # The losing duplicate is cancelled, so only its input is counted.
+            self.hedged_calls += 1
+            self.hedge_tokens += input_tokens
+            usage["hedge_tokens"] += input_tokens
+            get_usage_ledger().record(UsageRecord(
+                kind="llm_hedge",
+                model=model,
+                input_tokens=input_tokens,
+                cost_usd=call_cost(model, input_tokens, 0),
+                session_id=self.session_id
+            ))
+
+    def add_speculative(self, input_tokens: int, output_tokens: int, time_taken: float, model: str) -> float:
+        """Record a call made ahead of any request for it. Returns its cost.
+
+        Kept apart from the requested totals, and ledgered as ``llm_speculative``.
+        """
+        cost = call_cost(model, input_tokens, output_tokens)
+        self.speculative_calls += 1
+        self.speculative_tokens += input_tokens + output_tokens
+        self.speculative_cost_usd += cost
+        get_usage_ledger().record(UsageRecord(
+            kind="llm_speculative",
+            model=model,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            latency_sec=time_taken,
+            cost_usd=cost,
+            session_id=self.session_id
+        ))
+        return cost
+
     def estimate_cost(self) -> float:
-        pricing = get_model_pricing(self.model)
-        input_cost = (self.input_tokens / 1_000_000) * pricing["input"]
-        output_cost = (self.output_tokens / 1_000_000) * pricing["output"]
-        return input_cost + output_cost
-    
+        return sum(
+            call_cost(model, usage["input_tokens"], usage["output_tokens"], usage["cached_tokens"])
+            + call_cost(model, usage["hedge_tokens"], 0)
+            for model, usage in self.by_model.items()
+        )
+
     def to_dict(self) -> dict:
         total_tokens = self.input_tokens + self.output_tokens
         tokens_per_sec = total_tokens / self.total_time if self.total_time > 0 else 0
-        
+
         return {
             "input_tokens": self.input_tokens,
             "output_tokens": self.output_tokens,
+            "cached_tokens": self.cached_tokens,
+            "hedged_calls": self.hedged_calls,
+            "hedge_tokens": self.hedge_tokens,
             "total_tokens": total_tokens,
             "tokens_per_sec": round(tokens_per_sec, 2),
             "total_time_sec": round(self.total_time, 2),
-            "estimated_cost_usd": round(self.estimate_cost(), 4)
+            "estimated_cost_usd": round(self.estimate_cost(), 4),
+            "speculative_calls": self.speculative_calls,
+            "speculative_tokens": self.speculative_tokens,
+            "speculative_cost_usd": round(self.speculative_cost_usd, 4),
+            "speculative_served": self.speculative_served,
+            "near_duplicate_hits": self.near_duplicate_hits,
+            "incremental_analyses": self.incremental_analyses,
+            "models": {model: dict(usage) for model, usage in self.by_model.items()}
         }
@@ -0,0 +1,259 @@
+import asyncio
+import gc
+import io
+import multiprocessing
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from functools import lru_cache
+from multiprocessing import shared_memory
+from typing import Any, BinaryIO, Callable, TypeVar
+
+from infrastructure.config import get_settings
+from infrastructure.deadline import run_stage, stage_timeout
+from infrastructure.logging import get_logger
+from infrastructure.metrics import get_metrics
+
+
+logger = get_logger("process_pool")
+
+T = TypeVar("T")
+
+# Imported by every worker at start-up so the first task doesn't pay for them.
+WARM_MODULES = ("PyPDF2", "PIL.Image", "utils.text")
+
+
+@dataclass(frozen=True)
+class SharedPayload:
+    """A payload parked in shared memory instead of being pickled through the pipe."""
+    name: str
+    size: int
+
+
+class _BufferReader(io.RawIOBase):
+    """A read-only stream over a buffer, copying only what each read asks for."""
+
+    def __init__(self, buffer: memoryview):
+        self._buffer = buffer
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        n = max(0, min(len(b), len(self._buffer) - self._pos))
+        b[:n] = self._buffer[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: len(self._buffer)}[whence]
+        self._pos = max(0, base + offset)
+        return self._pos
+
+    def tell(self) -> int:
+        return self._pos
+
+    def close(self) -> None:
+        self._buffer = memoryview(b"")
+        super().close()
+
+
+def open_payload(data: bytes | memoryview) -> BinaryIO:
+    """A file object over a task's payload, which is a view of shared memory when it was large."""
+    if isinstance(data, memoryview):
+        return io.BufferedReader(_BufferReader(data))
+    return io.BytesIO(data)
+
+
+def _init_worker(memory_limit_mb: int) -> None:
+    import importlib
+
+    if memory_limit_mb > 0:
+        try:
+            import resource
+            limit = memory_limit_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ImportError, ValueError, OSError):
+            pass  # Not supported on this platform; the pool still works without a ceiling.
+
+    for module in WARM_MODULES:
+        importlib.import_module(module)
+
+
+def _ping() -> None:
+    time.sleep(0.05)
+
+
+def _on_alarm(signum, frame):
+    raise TimeoutError("Extraction task timed out")
+
+
+def _run_task(func: Callable[..., T], payload: bytes | SharedPayload, args: tuple, timeout: float | None) -> T:
+    """Worker side: resolve the payload and run ``func`` under a hard timer.
+
+    A shared-memory payload is handed to ``func`` as a view of the segment,
+    not copied out of it; ``open_payload`` reads it in place.
+    """
+    if not isinstance(payload, SharedPayload):
+        return _call(func, payload, args, timeout)
+
+    # Spawned workers share the parent's resource tracker, and the parent unlinks the segment.
+    shm = shared_memory.SharedMemory(name=payload.name)
+    view = shm.buf[:payload.size]
+    try:
+        return _call(func, view, args, timeout)
+    finally:
+        try:
+            view.release()
+        except BufferError:
+            # Parsers can leave reference cycles holding a slice of the view.
+            gc.collect()
+            view.release()
+        shm.close()
+
+
+def _call(func: Callable[..., T], data: bytes | memoryview, args: tuple, timeout: float | None) -> T:
+    use_alarm = timeout is not None and hasattr(signal, "SIGALRM")
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, max(timeout, 0.001))
+    try:
+        return func(data, *args)
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+class ProcessPool:
+    """Warm worker processes for CPU-bound extraction.
+
+    Parsing PDFs and re-encoding images in threads competes with the event
+    loop for the GIL. Work submitted here runs in separate processes that
+    have the heavy parsing libraries already imported. Workers are recycled
+    after ``max_tasks_per_child`` tasks, run under an address-space ceiling,
+    and abort tasks that overrun their timeout. Payloads above
+    ``shm_min_bytes`` travel through shared memory, where the worker reads
+    them in place, so they are copied once rather than pickled and copied
+    again; task functions open their payload with ``open_payload``.
+
+    With zero workers configured, tasks run in the default thread pool.
+    """
+
+    def __init__(self, workers: int, max_tasks_per_child: int, memory_limit_mb: int, shm_min_bytes: int):
+        self.workers = workers
+        self.max_tasks_per_child = max_tasks_per_child
+        self.memory_limit_mb = memory_limit_mb
+        self.shm_min_bytes = shm_min_bytes
+        self.in_flight = 0
+        self.metrics = get_metrics()
+        self._executor: ProcessPoolExecutor | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                # Forking a process that runs an event loop and SDK threads is unsafe.
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.memory_limit_mb,),
+                max_tasks_per_child=self.max_tasks_per_child or None
+            )
+            self.metrics.set_gauge("process_pool_workers", self.workers)
+        return self._executor
+
+    async def warm(self) -> None:
+        """Start every worker now rather than on the first uploads."""
+        if not self.enabled:
+            return
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        start_time = time.time()
+        await asyncio.gather(*(loop.run_in_executor(executor, _ping) for _ in range(self.workers)))
+        logger.info("process_pool_warmed", workers=self.workers, time_sec=round(time.time() - start_time, 2))
+
+    async def run(self, stage: str, func: Callable[..., T], payload: bytes, *args: Any, timeout: float | None = None) -> T:
+        """Run ``func(payload, *args)`` in a worker, bounded by the request deadline.
+
+        ``func`` must be a module-level function so it can be sent to the
+        worker, and must accept the payload as bytes or a memoryview.
+        """
+        cap = timeout if timeout is not None else get_settings().process_pool_task_timeout_sec
+        if not self.enabled:
+            return await run_stage(stage, asyncio.to_thread(func, payload, *args), cap)
+
+        loop = asyncio.get_running_loop()
+        shm = None
+        if len(payload) >= self.shm_min_bytes:
+            shm = shared_memory.SharedMemory(create=True, size=len(payload))
+            shm.buf[:len(payload)] = payload
+            sent: bytes | SharedPayload = SharedPayload(shm.name, len(payload))
+        else:
+            sent = payload
+
+        self._track(1)
+        start_time = time.perf_counter()
+        outcome = "ok"
+        try:
+            future = loop.run_in_executor(self._get_executor(), _run_task, func, sent, args, stage_timeout(cap))
+            return await run_stage(stage, future, cap)
+        except BrokenProcessPool:
+            outcome = "crashed"
+            self._restart()
+            raise RuntimeError("Extraction worker crashed (likely exceeded its memory limit)")
+        except MemoryError:
+            outcome = "memory_limit"
+            raise
+        except (TimeoutError, asyncio.TimeoutError):
+            outcome = "timeout"
+            raise
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            raise
+        except Exception:
+            outcome = "error"
+            raise
+        finally:
+            self._track(-1)
+            self.metrics.observe("process_pool_task_seconds", time.perf_counter() - start_time, stage=stage)
+            self.metrics.increment("process_pool_tasks_total", stage=stage, outcome=outcome)
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+
+    def _track(self, delta: int) -> None:
+        self.in_flight += delta
+        self.metrics.set_gauge("process_pool_in_flight", self.in_flight)
+        self.metrics.set_gauge("process_pool_utilization", round(min(self.in_flight, self.workers) / self.workers, 3))
+
+    def _restart(self) -> None:
+        logger.warning("process_pool_restarted", workers=self.workers)
+        self.metrics.increment("process_pool_restarts_total")
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+@lru_cache()
+def get_process_pool() -> ProcessPool:
+    settings = get_settings()
+    return ProcessPool(
+        workers=settings.process_pool_workers,
+        max_tasks_per_child=settings.process_pool_max_tasks_per_child,
+        memory_limit_mb=settings.process_pool_memory_limit_mb,
+        shm_min_bytes=settings.process_pool_shm_min_bytes
+    )
@@ -0,0 +1,240 @@
+import asyncio
+import cProfile
+import marshal
+import os
+import pstats
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import Counter, OrderedDict
+from functools import lru_cache
+from types import CodeType
+
+from infrastructure.config import get_settings
+from infrastructure.logging import get_logger
+
+
+logger = get_logger("profiling")
+
+# Stacks whose innermost frame is in one of these modules are threads parked waiting for work.
+_IDLE_MODULES = ("threading.py", "selectors.py", "queue.py")
+# Only the most recent snapshots are kept; each one holds every traced allocation site.
+MAX_SNAPSHOTS = 10
+_TRACEMALLOC_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+class ProfilerBusyError(RuntimeError):
+    pass
+
+
+def profiling_enabled() -> bool:
+    settings = get_settings()
+    return (settings.debug and not settings.is_production) or settings.profiling_enabled
+
+
+def _short_path(path: str) -> str:
+    return "/".join(path.rsplit(os.sep, 2)[-2:])
+
+
+def sample_stacks(duration_sec: float, interval_sec: float, include_idle: bool = False) -> tuple[Counter[str], int]:
+    """Sample the stacks of every other thread for ``duration_sec``.
+
+    Returns stack counts keyed in collapsed ("folded") form, root first and
+    frames separated by ``;``, plus the number of sampling rounds. Meant to
+    run on its own thread, which is left out of the samples.
+    """
+    me = threading.get_ident()
+    names = {thread.ident: thread.name for thread in threading.enumerate()}
+    labels: dict[CodeType, str] = {}
+    stacks: Counter[str] = Counter()
+    rounds = 0
+    end = time.monotonic() + duration_sec
+
+    while time.monotonic() < end:
+        for ident, frame in sys._current_frames().items():
+            if ident == me:
+                continue
+            if not include_idle and frame.f_code.co_filename.endswith(_IDLE_MODULES):
+                continue
+            parts = []
+            while frame is not None:
+                code = frame.f_code
+                label = labels.get(code)
+                if label is None:
+                    label = labels[code] = f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+                parts.append(label)
+                frame = frame.f_back
+            parts.append(names.get(ident, f"thread-{ident}"))
+            stacks[";".join(reversed(parts))] += 1
+        rounds += 1
+        time.sleep(interval_sec)
+    return stacks, rounds
+
+
+def collapsed(stacks: Counter[str]) -> str:
+    """Folded stack text, one ``frames count`` line per stack, as read by flamegraph.pl and speedscope."""
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+def _stat_dict(stat: tracemalloc.Statistic | tracemalloc.StatisticDiff) -> dict:
+    frame = stat.traceback[0]
+    out = {"location": f"{frame.filename}:{frame.lineno}", "size_bytes": stat.size, "count": stat.count}
+    if isinstance(stat, tracemalloc.StatisticDiff):
+        out["size_diff_bytes"] = stat.size_diff
+        out["count_diff"] = stat.count_diff
+    return out
+
+
+class Profiler:
+    """On-demand CPU, memory and per-request profiling of this worker.
+
+    Nothing runs until asked for: the CPU sampler is a thread started for
+    one capture, tracemalloc is only tracing between ``start_memory`` and
+    ``stop_memory``, and request profiling is only armed for the next
+    ``count`` matching requests.
+    """
+
+    def __init__(self):
+        self._cpu_running = False
+        self._snapshots: OrderedDict[int, tracemalloc.Snapshot] = OrderedDict()
+        self._next_snapshot_id = 1
+
+        self.request_prefix: str | None = None
+        self.requests_left = 0
+        self.requests_profiled = 0
+        self._request_active = False
+        self._request_stats: pstats.Stats | None = None
+
+    # CPU
+
+    async def cpu_profile(self, duration_sec: float, interval_sec: float, include_idle: bool = False) -> str:
+        if self._cpu_running:
+            raise ProfilerBusyError("A CPU profile is already being captured")
+        self._cpu_running = True
+        try:
+            stacks, rounds = await asyncio.to_thread(sample_stacks, duration_sec, interval_sec, include_idle)
+        finally:
+            self._cpu_running = False
+        logger.info("cpu_profile_captured", duration_sec=duration_sec, rounds=rounds, stacks=len(stacks))
+        return collapsed(stacks)
+
+    # Memory
+
+    def start_memory(self, frames: int) -> None:
+        if tracemalloc.is_tracing():
+            raise ProfilerBusyError("tracemalloc is already tracing")
+        tracemalloc.start(frames)
+        logger.info("tracemalloc_started", frames=frames)
+
+    def stop_memory(self) -> None:
+        tracemalloc.stop()
+        self._snapshots.clear()
+        logger.info("tracemalloc_stopped")
+
+    def memory_status(self) -> dict:
+        if not tracemalloc.is_tracing():
+            return {"tracing": False, "snapshots": list(self._snapshots)}
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            "tracing": True,
+            "frames": tracemalloc.get_traceback_limit(),
+            "traced_bytes": current,
+            "peak_bytes": peak,
+            "snapshots": list(self._snapshots)
+        }
+
+    def take_snapshot(self) -> int:
+        if not tracemalloc.is_tracing():
+            raise ProfilerBusyError("tracemalloc is not tracing; start it first")
+        snapshot = tracemalloc.take_snapshot().filter_traces(_TRACEMALLOC_FILTERS)
+        snapshot_id = self._next_snapshot_id
+        self._next_snapshot_id += 1
+        self._snapshots[snapshot_id] = snapshot
+        if len(self._snapshots) > MAX_SNAPSHOTS:
+            self._snapshots.popitem(last=False)
+        return snapshot_id
+
+    def snapshot(self, snapshot_id: int) -> tracemalloc.Snapshot:
+        try:
+            return self._snapshots[snapshot_id]
+        except KeyError:
+            raise KeyError(f"Unknown snapshot {snapshot_id}") from None
+
+    def top(self, snapshot_id: int, limit: int, key_type: str = "lineno") -> list[dict]:
+        stats = self.snapshot(snapshot_id).statistics(key_type)
+        return [_stat_dict(stat) for stat in stats[:limit]]
+
+    def diff(self, base_id: int, target_id: int, limit: int, key_type: str = "lineno") -> list[dict]:
+        stats = self.snapshot(target_id).compare_to(self.snapshot(base_id), key_type)
+        return [_stat_dict(stat) for stat in stats[:limit]]
+
+    def dump_snapshot(self, snapshot_id: int) -> bytes:
+        """The snapshot in tracemalloc's own format, readable with ``tracemalloc.Snapshot.load``."""
+        snapshot = self.snapshot(snapshot_id)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "snapshot")
+            snapshot.dump(path)
+            with open(path, "rb") as f:
+                return f.read()
+
+    # Requests
+
+    def arm_requests(self, path_prefix: str, count: int) -> None:
+        """Profile the next ``count`` requests whose path starts with ``path_prefix``."""
+        self.request_prefix = path_prefix
+        self.requests_left = count
+        self.requests_profiled = 0
+        self._request_stats = None
+        logger.info("request_profiling_armed", path_prefix=path_prefix, count=count)
+
+    def disarm_requests(self) -> None:
+        self.requests_left = 0
+
+    def wants(self, path: str) -> bool:
+        return (
+            self.requests_left > 0
+            and not self._request_active
+            and path.startswith(self.request_prefix)
+        )
+
+    def begin_request(self) -> cProfile.Profile:
+        self.requests_left -= 1
+        self._request_active = True
+        profile = cProfile.Profile()
+        profile.enable()
+        return profile
+
+    def end_request(self, profile: cProfile.Profile) -> None:
+        profile.disable()
+        self._request_active = False
+        if self._request_stats is None:
+            self._request_stats = pstats.Stats(profile)
+        else:
+            self._request_stats.add(profile)
+        self.requests_profiled += 1
+        if not self.requests_left:
+            logger.info("request_profiling_done", path_prefix=self.request_prefix, requests=self.requests_profiled)
+
+    def request_status(self) -> dict:
+        return {
+            "path_prefix": self.request_prefix,
+            "remaining": self.requests_left,
+            "profiled": self.requests_profiled
+        }
+
+    def request_pstats(self) -> bytes | None:
+        """Combined stats in pstats' marshal format, as written by ``Stats.dump_stats``."""
+        if self._request_stats is None:
+            return None
+        return marshal.dumps(self._request_stats.stats)
+
+
+@lru_cache()
+def get_profiler() -> Profiler:
+    return Profiler()
@@ -0,0 +1,99 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Awaitable, Callable
+
+from infrastructure.logging import get_logger
+from infrastructure.metrics import get_metrics
+
+
+logger = get_logger("readiness")
+
+# Failed required steps are retried with exponential backoff between these bounds.
+RETRY_INITIAL_SEC = 1.0
+RETRY_MAX_SEC = 60.0
+
+
+@dataclass
+class WarmupStep:
+    name: str
+    run: Callable[[], Awaitable[object]]
+    # Optional steps, like opening connections to remote APIs, are attempted
+    # but don't hold back readiness: an outage there is the breakers' business.
+    required: bool = True
+
+
+class Readiness:
+    """Start-up warm-up state behind ``/health/ready``.
+
+    The pod reports ready only once every required warm-up step has
+    succeeded, so rolling deploys don't route traffic to a cold worker.
+    A required step that fails is retried with backoff until it succeeds,
+    so a transient failure at start-up doesn't leave the pod unready.
+    """
+
+    def __init__(self):
+        self.ready = False
+        self.checks: dict[str, str] = {}
+        self.warmup_sec: float | None = None
+        self._task: asyncio.Task | None = None
+
+    def start(self, steps: list[WarmupStep], timeout_sec: float) -> None:
+        """Run ``steps`` concurrently in the background."""
+        self.checks = {step.name: "pending" for step in steps}
+        self._task = asyncio.create_task(self._warm_up(steps, timeout_sec))
+
+    async def wait(self) -> bool:
+        if self._task is not None:
+            await self._task
+        return self.ready
+
+    async def stop(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self.ready = False
+
+    async def _warm_up(self, steps: list[WarmupStep], timeout_sec: float) -> None:
+        start_time = time.time()
+        results = await asyncio.gather(*(self._run_step(step, timeout_sec) for step in steps))
+        self.warmup_sec = round(time.time() - start_time, 2)
+        self.ready = all(ok for step, ok in zip(steps, results) if step.required)
+
+        get_metrics().set_gauge("warmup_seconds", self.warmup_sec)
+        get_metrics().set_gauge("ready", int(self.ready))
+        logger.info("warmup_complete", time_sec=self.warmup_sec, checks=self.checks)
+
+    async def _run_step(self, step: WarmupStep, timeout_sec: float) -> bool:
+        start_time = time.time()
+        delay = RETRY_INITIAL_SEC
+        attempt = 1
+        while True:
+            try:
+                await asyncio.wait_for(step.run(), timeout_sec)
+                break
+            except Exception as e:
+                self.checks[step.name] = "retrying" if step.required else "failed"
+                log = logger.error if step.required else logger.warning
+                log(
+                    "warmup_step_failed",
+                    step=step.name,
+                    required=step.required,
+                    attempt=attempt,
+                    error=str(e) or type(e).__name__
+                )
+                if not step.required:
+                    return False
+            get_metrics().increment("warmup_retries_total", step=step.name)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, RETRY_MAX_SEC)
+            attempt += 1
+        self.checks[step.name] = "ok"
+        logger.info("warmup_step_done", step=step.name, attempt=attempt, time_sec=round(time.time() - start_time, 2))
+        return True
+
+
+@lru_cache()
+def get_readiness() -> Readiness:
+    return Readiness()
@@ -0,0 +1,152 @@
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from enum import Enum
+from functools import lru_cache
+from typing import AsyncIterator
+
+from infrastructure.config import get_settings
+from infrastructure.logging import get_logger
+from infrastructure.metrics import get_metrics
+
+
+logger = get_logger("scheduler")
+
+
+class Priority(str, Enum):
+    INTERACTIVE = "interactive"
+    BULK = "bulk"
+    BACKGROUND = "background"
+
+
+@dataclass(order=True)
+class _Waiter:
+    finish_tag: float
+    seq: int
+    session_id: str = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    enqueued_at: float = field(compare=False)
+
+
+class _ClassQueue:
+    """Weighted fair queue for one priority class.
+
+    Each request gets a virtual finish tag of ``max(virtual_time, session's
+    last tag) + cost``; the lowest tag runs next. A session that submits many
+    requests pushes its own tags forward, so other sessions' requests
+    interleave with its backlog instead of waiting behind all of it.
+    """
+
+    def __init__(self, priority: Priority, limit: int):
+        self.priority = priority
+        self.limit = max(1, limit)
+        self.running = 0
+        self.virtual_time = 0.0
+        self._heap: list[_Waiter] = []
+        self._last_tag: dict[str, float] = {}
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def enqueue(self, session_id: str, cost: float) -> _Waiter:
+        start = max(self.virtual_time, self._last_tag.get(session_id, 0.0))
+        tag = start + max(cost, 1e-6)
+        self._last_tag[session_id] = tag
+        waiter = _Waiter(tag, next(self._seq), session_id, asyncio.get_running_loop().create_future(), time.monotonic())
+        heapq.heappush(self._heap, waiter)
+        return waiter
+
+    def remove(self, waiter: _Waiter) -> None:
+        try:
+            self._heap.remove(waiter)
+        except ValueError:
+            return
+        heapq.heapify(self._heap)
+
+    def dispatch(self) -> None:
+        """Wake waiters while there is free capacity."""
+        while self._heap and self.running < self.limit:
+            waiter = heapq.heappop(self._heap)
+            if waiter.future.done():
+                continue
+            self.virtual_time = max(self.virtual_time, waiter.finish_tag)
+            self.running += 1
+            waiter.future.set_result(None)
+        if not self._heap and not self.running:
+            # Idle: forget per-session history so tags don't grow without bound.
+            self._last_tag.clear()
+            self.virtual_time = 0.0
+
+
+class Scheduler:
+    """Admission control in front of agent and extractor work.
+
+    Each priority class has its own concurrency limit, so heavy uploads can
+    saturate the bulk class without taking capacity from interactive chat.
+    Within a class, sessions share capacity through weighted fair queuing.
+    """
+
+    def __init__(self, limits: dict[Priority, int]):
+        self._queues = {priority: _ClassQueue(priority, limit) for priority, limit in limits.items()}
+        self.metrics = get_metrics()
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority, session_id: str, cost: float = 1.0) -> AsyncIterator[None]:
+        """Hold one of ``priority``'s slots for the duration of the block.
+
+        ``cost`` is the request's expected share of the class (e.g. input size
+        in MB); sessions are charged by it when ordering the queue.
+        """
+        queue = self._queues[priority]
+        waiter = queue.enqueue(session_id, cost)
+        queue.dispatch()
+        self._publish(queue)
+
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Granted and cancelled in the same tick: hand the slot on.
+                self._release(queue)
+            else:
+                queue.remove(waiter)
+                self._publish(queue)
+            raise
+
+        waited = time.monotonic() - waiter.enqueued_at
+        self.metrics.observe("scheduler_queue_seconds", waited, priority=priority.value)
+        if waited > 1.0:
+            logger.info("scheduler_slow_admission", priority=priority.value, session_id=session_id, waited_sec=round(waited, 3))
+
+        try:
+            yield
+        finally:
+            self._release(queue)
+
+    def _release(self, queue: _ClassQueue) -> None:
+        queue.running -= 1
+        queue.dispatch()
+        self._publish(queue)
+
+    def _publish(self, queue: _ClassQueue) -> None:
+        self.metrics.set_gauge("scheduler_queued", len(queue), priority=queue.priority.value)
+        self.metrics.set_gauge("scheduler_running", queue.running, priority=queue.priority.value)
+
+
+def upload_cost(size_bytes: int) -> float:
+    """Queue cost of an upload: its size in MB, at least one unit."""
+    return max(1.0, size_bytes / (1024 * 1024))
+
+
+@lru_cache()
+def get_scheduler() -> Scheduler:
+    settings = get_settings()
+    return Scheduler({
+        Priority.INTERACTIVE: settings.scheduler_interactive_concurrency,
+        Priority.BULK: settings.scheduler_bulk_concurrency,
+        Priority.BACKGROUND: settings.scheduler_background_concurrency,
+    })
@@ -1,11 +1,55 @@
 import asyncio
 from abc import ABC, abstractmethod
-from typing import TypeVar
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, TypeVar
+
+from pydantic import BaseModel
 
 from infrastructure.llm.stats import TokenStats
+from utils.chunking import ChunkIndex
 
 T = TypeVar("T")
 
+ResetHook = Callable[[str], Awaitable[None]]
+
+
+@dataclass
+class SessionDocument:
+    """The document most recently uploaded in a session, with what has been derived from it."""
+    text: str
+    digest: str
+    summary: str | None = None
+    index: ChunkIndex | None = None
+    # Background task filling in ``summary`` and ``index``, while it runs.
+    speculation: asyncio.Task | None = None
+
+
+@dataclass
+class PriorAnalysis:
+    """The last text a session ran a command on, with the structured result, for revisions of it."""
+    text: str
+    output: BaseModel
+
+
+@dataclass
+class Turn:
+    user: str
+    assistant: str
+
+    @property
+    def chars(self) -> int:
+        return len(self.user) + len(self.assistant)
+
+
+@dataclass
+class ConversationMemory:
+    """A session's conversation: a rolling summary of older turns, then the recent turns verbatim."""
+    summary: str = ""
+    turns: list[Turn] = field(default_factory=list)
+    # Background task folding the oldest turns into ``summary``, while it runs.
+    compaction: asyncio.Task | None = None
+
 
 class BaseSessionManager(ABC):
     @abstractmethod
@@ -20,32 +64,118 @@ class BaseSessionManager(ABC):
     async def get_all_session_ids(self) -> list[str]:
         pass
 
+    @abstractmethod
+    def get_document(self, session_id: str) -> SessionDocument | None:
+        pass
+
+    @abstractmethod
+    def set_document(self, session_id: str, document: SessionDocument) -> None:
+        pass
+
+    @abstractmethod
+    def get_memory(self, session_id: str) -> ConversationMemory:
+        pass
+
+    @abstractmethod
+    def get_analysis(self, session_id: str, kind: str) -> PriorAnalysis | None:
+        pass
+
+    @abstractmethod
+    def set_analysis(self, session_id: str, kind: str, analysis: PriorAnalysis) -> None:
+        pass
+
 
 class InMemorySessionManager(BaseSessionManager):
     """In-memory session manager for single-worker deployments only.
     
     WARNING: Do not use with multiple workers (--workers > 1).
     For multi-worker deployments, use RedisSessionManager.
+
+    Documents, conversations and prior analyses are each kept for at most
+    ``max_sessions`` sessions; the least recently used session's entry is
+    dropped, and any background work on it cancelled, to make room for another.
     """
 
-    def __init__(self):
+    def __init__(self, max_sessions: int = 256):
         self._sessions: dict[str, TokenStats] = {}
+        self._max_sessions = max_sessions
+        self._documents: OrderedDict[str, SessionDocument] = OrderedDict()
+        self._memories: OrderedDict[str, ConversationMemory] = OrderedDict()
+        self._analyses: OrderedDict[str, dict[str, PriorAnalysis]] = OrderedDict()
         self._lock = asyncio.Lock()
+        self._reset_hooks: list[ResetHook] = []
+
+    def add_reset_hook(self, hook: ResetHook) -> None:
+        """Run ``hook(session_id)`` whenever a session is reset, to release per-session resources."""
+        self._reset_hooks.append(hook)
 
     async def get_stats(self, session_id: str, model: str) -> TokenStats:
         async with self._lock:
             if session_id not in self._sessions:
-                self._sessions[session_id] = TokenStats(model=model)
+                self._sessions[session_id] = TokenStats(model=model, session_id=session_id)
             return self._sessions[session_id]
 
     async def reset(self, session_id: str) -> bool:
         async with self._lock:
-            return self._sessions.pop(session_id, None) is not None
+            existed = self._sessions.pop(session_id, None) is not None
+        document = self._documents.pop(session_id, None)
+        if document and document.speculation:
+            document.speculation.cancel()
+        memory = self._memories.pop(session_id, None)
+        if memory and memory.compaction:
+            memory.compaction.cancel()
+        self._analyses.pop(session_id, None)
+        for hook in self._reset_hooks:
+            await hook(session_id)
+        return existed
 
     async def get_all_session_ids(self) -> list[str]:
         async with self._lock:
             return list(self._sessions.keys())
 
+    def get_document(self, session_id: str) -> SessionDocument | None:
+        document = self._documents.get(session_id)
+        if document is not None:
+            self._documents.move_to_end(session_id)
+        return document
+
+    def set_document(self, session_id: str, document: SessionDocument) -> None:
+        previous = self._documents.get(session_id)
+        if previous and previous.speculation and previous is not document:
+            previous.speculation.cancel()
+        self._documents[session_id] = document
+        self._documents.move_to_end(session_id)
+        for evicted in self._evict(self._documents):
+            if evicted.speculation:
+                evicted.speculation.cancel()
+
+    def get_memory(self, session_id: str) -> ConversationMemory:
+        memory = self._memories.setdefault(session_id, ConversationMemory())
+        self._memories.move_to_end(session_id)
+        for evicted in self._evict(self._memories):
+            if evicted.compaction:
+                evicted.compaction.cancel()
+        return memory
+
+    def get_analysis(self, session_id: str, kind: str) -> PriorAnalysis | None:
+        analyses = self._analyses.get(session_id)
+        if analyses is None:
+            return None
+        self._analyses.move_to_end(session_id)
+        return analyses.get(kind)
+
+    def set_analysis(self, session_id: str, kind: str, analysis: PriorAnalysis) -> None:
+        self._analyses.setdefault(session_id, {})[kind] = analysis
+        self._analyses.move_to_end(session_id)
+        self._evict(self._analyses)
+
+    def _evict(self, entries: OrderedDict[str, T]) -> list[T]:
+        """Drop the least recently used sessions' entries beyond ``max_sessions``, returning them."""
+        evicted = []
+        while len(entries) > self._max_sessions:
+            evicted.append(entries.popitem(last=False)[1])
+        return evicted
+
 
 SessionManager = InMemorySessionManager
 
@@ -0,0 +1,145 @@
+import asyncio
+import json
+from dataclasses import dataclass
+from typing import AsyncIterator
+from urllib.parse import urlencode
+
+from infrastructure.circuit_breaker import DEEPGRAM, get_breaker
+from infrastructure.config import get_settings
+from infrastructure.logging import get_logger
+
+
+logger = get_logger("transcription")
+
+
+@dataclass
+class TranscriptEvent:
+    text: str
+    is_final: bool
+    speech_final: bool = False
+
+    def to_dict(self) -> dict:
+        return {
+            "type": "transcript",
+            "text": self.text,
+            "is_final": self.is_final,
+            "speech_final": self.speech_final
+        }
+
+
+class DeepgramStream:
+    """Live transcription session against Deepgram's streaming endpoint.
+
+    ``deepgram_stream_url`` can point at ``serve_fake_deepgram`` for tests.
+    """
+
+    def __init__(self, encoding: str | None = None, sample_rate: int | None = None, language: str = "en"):
+        settings = get_settings()
+        params = {
+            "model": settings.deepgram_model,
+            "language": language,
+            "interim_results": "true",
+            "smart_format": "true",
+        }
+        if encoding:
+            params["encoding"] = encoding
+        if sample_rate:
+            params["sample_rate"] = sample_rate
+        self.url = f"{settings.deepgram_stream_url}?{urlencode(params)}"
+        self.api_key = settings.deepgram_api_key
+        self._connection = None
+
+    async def __aenter__(self) -> "DeepgramStream":
+        from websockets.asyncio.client import connect
+
+        # Only the handshake is guarded; a live stream's length says nothing about health.
+        async with get_breaker(DEEPGRAM).guard():
+            self._connection = await connect(
+                self.url,
+                additional_headers={"Authorization": f"Token {self.api_key}"},
+                open_timeout=get_settings().deepgram_timeout_sec
+            )
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self._connection.close()
+
+    async def send_audio(self, frame: bytes) -> None:
+        await self._connection.send(frame)
+
+    async def keep_alive(self) -> None:
+        """Keep the stream open through a pause in the audio; the backend closes it after ~10s of silence."""
+        await self._connection.send(json.dumps({"type": "KeepAlive"}))
+
+    async def finish(self) -> None:
+        """Ask the backend to flush pending audio; it closes after the final results."""
+        await self._connection.send(json.dumps({"type": "CloseStream"}))
+
+    async def events(self) -> AsyncIterator[TranscriptEvent]:
+        from websockets.exceptions import ConnectionClosedOK
+
+        try:
+            async for raw in self._connection:
+                message = json.loads(raw)
+                if message.get("type") != "Results":
+                    continue
+                alternatives = message.get("channel", {}).get("alternatives") or [{}]
+                text = alternatives[0].get("transcript", "")
+                if text or message.get("is_final"):
+                    yield TranscriptEvent(
+                        text=text,
+                        is_final=bool(message.get("is_final")),
+                        speech_final=bool(message.get("speech_final"))
+                    )
+        except ConnectionClosedOK:
+            return
+
+
+async def serve_fake_deepgram(host: str = "127.0.0.1", port: int = 8766, frames_per_final: int = 4):
+    """Local stand-in for Deepgram's streaming API, for tests and benchmarks.
+
+    Replies to every audio frame with an interim result describing the bytes
+    received so far, finalizes every ``frames_per_final`` frames and on
+    ``CloseStream``, then closes the connection.
+    """
+    from websockets.asyncio.server import serve
+
+    async def handler(connection):
+        segment = 0
+        frames = received = 0
+
+        async def results(is_final: bool):
+            message = {
+                "type": "Results",
+                "is_final": is_final,
+                "speech_final": is_final,
+                "channel": {"alternatives": [{"transcript": f"segment {segment} ({received} bytes)"}]},
+            }
+            await connection.send(json.dumps(message))
+
+        async for raw in connection:
+            if isinstance(raw, str):
+                if json.loads(raw).get("type") == "CloseStream":
+                    if frames:
+                        await results(is_final=True)
+                    await connection.send(json.dumps({"type": "Metadata"}))
+                    break
+                continue
+            frames += 1
+            received += len(raw)
+            await results(is_final=False)
+            if frames % frames_per_final == 0:
+                await results(is_final=True)
+                segment += 1
+                frames = received = 0
+
+    return await serve(handler, host, port)
+
+
+if __name__ == "__main__":
+    async def _main():
+        server = await serve_fake_deepgram()
+        logger.info("fake_deepgram_listening", url="ws://127.0.0.1:8766/v1/listen")
+        await server.serve_forever()
+
+    asyncio.run(_main())
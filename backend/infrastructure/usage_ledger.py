@@ -0,0 +1,225 @@
+import asyncio
+import sqlite3
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+
+from infrastructure.config import get_settings
+from infrastructure.logging import get_logger
+from infrastructure.metrics import get_metrics
+
+
+logger = get_logger("usage_ledger")
+
+# Route template of the request being served, bound by a router dependency.
+_current_route: ContextVar[str | None] = ContextVar("usage_route", default=None)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS usage (
+    ts REAL NOT NULL,
+    day TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    route TEXT,
+    session_id TEXT,
+    model TEXT NOT NULL,
+    input_tokens INTEGER NOT NULL,
+    output_tokens INTEGER NOT NULL,
+    cached_tokens INTEGER NOT NULL,
+    latency_sec REAL NOT NULL,
+    cost_usd REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_usage_ts ON usage (ts);
+CREATE INDEX IF NOT EXISTS idx_usage_day_model ON usage (day, model);
+CREATE INDEX IF NOT EXISTS idx_usage_route_ts ON usage (route, ts);
+CREATE INDEX IF NOT EXISTS idx_usage_session_ts ON usage (session_id, ts);
+"""
+
+GROUP_BY_COLUMNS = ("day", "kind", "route", "session_id", "model")
+
+
+def bind_route(route: str | None) -> None:
+    _current_route.set(route)
+
+
+def current_route() -> str | None:
+    return _current_route.get()
+
+
+@dataclass
+class UsageRecord:
+    kind: str
+    model: str
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cached_tokens: int = 0
+    latency_sec: float = 0.0
+    cost_usd: float = 0.0
+    session_id: str | None = None
+    route: str | None = field(default_factory=current_route)
+    ts: float = field(default_factory=time.time)
+
+    def row(self) -> tuple:
+        day = time.strftime("%Y-%m-%d", time.gmtime(self.ts))
+        return (
+            self.ts, day, self.kind, self.route, self.session_id, self.model,
+            self.input_tokens, self.output_tokens, self.cached_tokens,
+            self.latency_sec, self.cost_usd
+        )
+
+
+class UsageLedger:
+    """Append-only SQLite record of every LLM and extraction call.
+
+    ``record`` only enqueues; a writer task drains the queue in batches on a
+    worker thread, so requests never wait on disk. When the queue is full,
+    records are dropped and counted rather than applying backpressure.
+    """
+
+    def __init__(self, enabled: bool, path: str, batch_size: int, flush_interval_sec: float, queue_size: int):
+        self.enabled = enabled
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.flush_interval_sec = flush_interval_sec
+        self.metrics = get_metrics()
+        self._queue: asyncio.Queue[UsageRecord] = asyncio.Queue(maxsize=queue_size)
+        self._writer: asyncio.Task | None = None
+        self._conn: sqlite3.Connection | None = None
+        # Writes and aggregate queries run on different worker threads.
+        self._db_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def start(self) -> None:
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.get_running_loop().create_task(self._run())
+
+    def record(self, record: UsageRecord) -> None:
+        if not self.enabled:
+            return
+        try:
+            self._queue.put_nowait(record)
+        except asyncio.QueueFull:
+            self.metrics.increment("usage_records_dropped_total")
+            return
+        try:
+            self.start()
+        except RuntimeError:
+            pass  # No running loop; the next start() drains the queue.
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            try:
+                # Give the batch a moment to fill before paying for a commit.
+                deadline = time.monotonic() + self.flush_interval_sec
+                while len(batch) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                # Also flush what was collected when the writer is cancelled at shutdown.
+                await asyncio.shield(self._flush(batch))
+
+    async def _flush(self, batch: list[UsageRecord]) -> None:
+        try:
+            await asyncio.to_thread(self._write, [r.row() for r in batch])
+            self.metrics.increment("usage_records_written_total", len(batch))
+        except Exception as e:
+            self.metrics.increment("usage_records_dropped_total", len(batch))
+            logger.error("usage_ledger_write_failed", records=len(batch), error=str(e))
+
+    def _write(self, rows: list[tuple]) -> None:
+        with self._db_lock, self._connect() as conn:
+            conn.executemany("INSERT INTO usage VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    async def aggregate(self, start: float | None, end: float | None, group_by: list[str]) -> list[dict]:
+        unknown = set(group_by) - set(GROUP_BY_COLUMNS)
+        if unknown:
+            raise ValueError(f"Cannot group by: {', '.join(sorted(unknown))}")
+        if not self.enabled:
+            return []
+        return await asyncio.to_thread(self._aggregate, start, end, list(dict.fromkeys(group_by)))
+
+    def _aggregate(self, start: float | None, end: float | None, group_by: list[str]) -> list[dict]:
+        where, params = [], []
+        if start is not None:
+            where.append("ts >= ?")
+            params.append(start)
+        if end is not None:
+            where.append("ts < ?")
+            params.append(end)
+
+        columns = ", ".join(group_by)
+        sql = (
+            f"SELECT {columns + ', ' if columns else ''}"
+            "COUNT(*), SUM(input_tokens), SUM(output_tokens), SUM(cached_tokens), "
+            "SUM(latency_sec), SUM(cost_usd) FROM usage"
+        )
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        if group_by:
+            sql += f" GROUP BY {columns} ORDER BY {columns}"
+
+        with self._db_lock:
+            results = self._connect().execute(sql, params).fetchall()
+
+        rows = []
+        for values in results:
+            keys = dict(zip(group_by, values))
+            calls, input_tokens, output_tokens, cached_tokens, latency, cost = values[len(group_by):]
+            if not calls:
+                continue
+            rows.append({
+                **keys,
+                "calls": calls,
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "cached_tokens": cached_tokens,
+                "total_latency_sec": round(latency, 3),
+                "cost_usd": round(cost, 6)
+            })
+        return rows
+
+    async def close(self) -> None:
+        if self._writer is not None:
+            self._writer.cancel()
+            try:
+                await self._writer
+            except asyncio.CancelledError:
+                pass
+            self._writer = None
+        pending = []
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        if pending:
+            await self._flush(pending)
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+@lru_cache()
+def get_usage_ledger() -> UsageLedger:
+    settings = get_settings()
+    return UsageLedger(
+        enabled=settings.usage_ledger_enabled,
+        path=settings.usage_ledger_path,
+        batch_size=settings.usage_ledger_batch_size,
+        flush_interval_sec=settings.usage_ledger_flush_interval_sec,
+        queue_size=settings.usage_ledger_queue_size
+    )
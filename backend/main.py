@@ -1,3 +1,4 @@
+import asyncio
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request
@@ -5,27 +6,83 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from infrastructure.config import get_settings
-from infrastructure.dependencies import close_httpx_client, get_genai_client
+from infrastructure.dependencies import close_httpx_client, get_genai_client, get_httpx_client
+from infrastructure.llm.context_cache import get_context_cache
 from infrastructure.logging import get_logger
+from infrastructure.process_pool import get_process_pool
+from infrastructure.profiling import profiling_enabled
+from infrastructure.readiness import WarmupStep, get_readiness
+from infrastructure.usage_ledger import get_usage_ledger
+from api.middleware.deadline import RequestDeadlineMiddleware
+from api.middleware.profiling import RequestProfilingMiddleware
 from api.v1 import router as api_v1_router
-from utils.errors import DatasmithError
+from api.v1.routes.analyze import get_coordinator
+from core.extractors.audio import DEEPGRAM_BASE_URL
+from core.extractors.base import ExtractorRegistry
+from utils.errors import DatasmithError, DeadlineExceededError, ServiceUnavailableError
 
 
 settings = get_settings()
 logger = get_logger("main")
 
 
+async def _warm_agents() -> None:
+    coordinator = get_coordinator()
+    if settings.llm_provider == "gemini" and not settings.google_api_key:
+        return
+    # Building the Gemini clients imports langchain_google_genai, so it runs off the event loop.
+    built = await asyncio.to_thread(coordinator.warm)
+    logger.info("llm_chains_built", count=built)
+
+
+async def _warm_extractors() -> None:
+    loaded = await asyncio.to_thread(ExtractorRegistry.preload)
+    logger.info("extractors_preloaded", types=",".join(loaded))
+
+
+async def _warm_gemini_connection() -> None:
+    # A metadata lookup opens the TLS connection the SDK will reuse.
+    await get_genai_client().aio.models.get(model=settings.llm_model)
+
+
+async def _warm_deepgram_connection() -> None:
+    client = await get_httpx_client()
+    await client.head(DEEPGRAM_BASE_URL, timeout=settings.deepgram_timeout_sec)
+
+
+def _warmup_steps() -> list[WarmupStep]:
+    steps = [
+        WarmupStep("process_pool", get_process_pool().warm),
+        WarmupStep("agents", _warm_agents),
+    ]
+    if settings.preload_extractors:
+        steps.append(WarmupStep("extractors", _warm_extractors))
+    if settings.warmup_connections:
+        if settings.llm_provider == "gemini" and settings.google_api_key:
+            steps.append(WarmupStep("gemini_connection", _warm_gemini_connection, required=False))
+        if settings.deepgram_api_key:
+            steps.append(WarmupStep("deepgram_connection", _warm_deepgram_connection, required=False))
+    return steps
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("startup", environment=settings.environment)
 
     if not settings.google_api_key:
         logger.warning("google_api_key_missing")
-    else:
-        get_genai_client()
+
+    if settings.usage_ledger_enabled:
+        get_usage_ledger().start()
+    # Warm up in the background so liveness answers at once; /health/ready waits for it.
+    get_readiness().start(_warmup_steps(), settings.warmup_timeout_sec)
 
     yield
 
+    await get_readiness().stop()
+    await asyncio.to_thread(get_process_pool().shutdown)
+    await get_context_cache().close()
+    await get_usage_ledger().close()
     await close_httpx_client()
     logger.info("shutdown")
 
@@ -40,6 +97,19 @@ app = FastAPI(
 )
 
 
+@app.exception_handler(DeadlineExceededError)
+async def deadline_error_handler(request: Request, exc: DeadlineExceededError):
+    logger.warning("deadline_exceeded", error=str(exc), path=request.url.path)
+    return JSONResponse(status_code=exc.status_code, content={"detail": str(exc)})
+
+
+@app.exception_handler(ServiceUnavailableError)
+async def service_unavailable_handler(request: Request, exc: ServiceUnavailableError):
+    logger.warning("service_unavailable", error=str(exc), path=request.url.path)
+    headers = {"Retry-After": str(max(1, round(exc.retry_after)))} if exc.retry_after else None
+    return JSONResponse(status_code=exc.status_code, content={"detail": str(exc)}, headers=headers)
+
+
 @app.exception_handler(DatasmithError)
 async def datasmith_error_handler(request: Request, exc: DatasmithError):
     logger.error("datasmith_error", error=str(exc), path=request.url.path)
@@ -52,6 +122,10 @@ async def global_exception_handler(request: Request, exc: Exception):
     return JSONResponse(status_code=500, content={"detail": "Internal server error"})
 
 
+if profiling_enabled():
+    # Not installed at all otherwise, so request profiling costs nothing when disabled.
+    app.add_middleware(RequestProfilingMiddleware)
+app.add_middleware(RequestDeadlineMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins,
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Tests import the backend's top-level packages (utils, infrastructure, ...) the way the app does.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
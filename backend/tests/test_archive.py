@@ -0,0 +1,95 @@
+import io
+import zipfile
+
+import pytest
+
+from utils.archive import ArchiveScan, is_project_archive, iter_source_files
+
+
+def make_zip(entries: dict[str, bytes | str]) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, data in entries.items():
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+
+def scan_files(content: bytes, max_files: int = 100, max_file_bytes: int = 10_000, max_total_bytes: int = 100_000):
+    scan = ArchiveScan()
+    files = list(iter_source_files(content, scan, max_files, max_file_bytes, max_total_bytes))
+    return files, scan
+
+
+def test_yields_source_files_in_order():
+    files, scan = scan_files(make_zip({"app/main.py": "print('hi')\n", "app/util.js": "export const a = 1;\n"}))
+
+    assert [f.path for f in files] == ["app/main.py", "app/util.js"]
+    assert files[0].text == "print('hi')\n"
+    assert scan.skipped_count == 0
+
+
+def test_skips_vendored_generated_binary_and_empty_entries():
+    files, scan = scan_files(make_zip({
+        "src/app.py": "x = 1\n",
+        "node_modules/lib/index.js": "module.exports = 1;\n",
+        "pkg.egg-info/PKG-INFO": "Name: pkg\n",
+        ".env": "SECRET=1\n",
+        "static/app.min.js": "var a=1;\n",
+        "logo.png": b"\x89PNG\r\n\x1a\n" + bytes(64),
+        "empty.py": "   \n",
+    }))
+
+    assert [f.path for f in files] == ["src/app.py"]
+    assert scan.skipped == {
+        "vendored": ["node_modules/lib/index.js", "pkg.egg-info/PKG-INFO", ".env"],
+        "generated": ["static/app.min.js"],
+        "binary": ["logo.png"],
+        "empty": ["empty.py"],
+    }
+
+
+def test_enforces_file_size_and_count_limits():
+    content = make_zip({"big.py": "x" * 500, "a.py": "a = 1\n", "b.py": "b = 2\n", "c.py": "c = 3\n"})
+
+    files, scan = scan_files(content, max_files=2, max_file_bytes=100)
+
+    assert [f.path for f in files] == ["a.py", "b.py"]
+    assert scan.skipped == {"too_large": ["big.py"], "limit": ["c.py"]}
+
+
+def test_stops_at_total_bytes():
+    content = make_zip({f"m{i}.py": "y" * 40 for i in range(5)})
+
+    files, scan = scan_files(content, max_total_bytes=100)
+
+    assert sum(len(f.text) for f in files) <= 100
+    assert scan.skipped_count == 5 - len(files)
+
+
+def test_decodes_legacy_encodings():
+    files, _ = scan_files(make_zip({"notes.txt": "café\n".encode("latin-1")}))
+
+    assert files[0].text == "café\n"
+
+
+def test_rejects_invalid_zip():
+    with pytest.raises(zipfile.BadZipFile):
+        scan_files(b"PK\x03\x04 not really a zip")
+
+
+@pytest.mark.parametrize("entries, filename, expected", [
+    ({"src/app.py": "x = 1\n"}, "project.zip", True),
+    ({"src/app.py": "x = 1\n"}, None, True),
+    ({"src/app.py": "x = 1\n"}, "project", True),
+    ({"src/app.py": "x = 1\n"}, "report.docx", False),
+    ({"[Content_Types].xml": "<Types/>", "word/document.xml": "<w/>"}, "project.zip", False),
+    ({"META-INF/MANIFEST.MF": "Manifest-Version: 1.0\n", "A.class": "x"}, None, False),
+    ({"mimetype": "application/epub+zip"}, None, False),
+])
+def test_is_project_archive(entries, filename, expected):
+    assert is_project_archive(make_zip(entries), filename) is expected
+
+
+def test_unreadable_zip_counts_as_project_archive():
+    # So the project analysis reports it as an invalid archive.
+    assert is_project_archive(b"PK\x03\x04 truncated", "project.zip")
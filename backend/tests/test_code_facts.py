@@ -0,0 +1,160 @@
+import textwrap
+
+from utils.code_facts import analyze_python, compact_python
+
+
+def facts_for(code: str):
+    parsed = analyze_python(textwrap.dedent(code))
+    assert parsed is not None
+    return parsed[0]
+
+
+def test_invalid_python_is_none():
+    assert analyze_python("def broken(:\n") is None
+    assert compact_python("def broken(:\n", 1000) is None
+
+
+def test_collects_imports_loop_depth_and_recursion():
+    facts = facts_for("""
+        import os
+        from collections import deque
+
+        def fact(n):
+            return 1 if n <= 1 else n * fact(n - 1)
+
+        class Grid:
+            def total(self, rows):
+                return sum(cell for row in rows for cell in row)
+
+            def flat(self):
+                return 1
+    """)
+
+    assert facts.imports == ["os", "collections"]
+    by_name = {fn.name: fn for fn in facts.functions}
+    assert by_name["fact"].recursive
+    assert by_name["Grid.total"].loop_depth == 1
+    assert not by_name["Grid.flat"].interesting
+
+
+def test_detects_issues():
+    facts = facts_for("""
+        def risky(items=[], list=None):
+            try:
+                for a in items:
+                    for b in a:
+                        for c in b:
+                            eval(c)
+            except:
+                pass
+            if list == None:
+                return
+    """)
+
+    messages = " | ".join(facts.issues)
+    for expected in (
+        "mutable default argument",
+        "argument shadows builtin 'list'",
+        "loops nested three or more deep",
+        "uses eval()",
+        "bare except",
+        "compares to None",
+    ):
+        assert expected in messages
+
+
+def test_nested_functions_are_separate():
+    facts = facts_for("""
+        def outer(xs):
+            def inner(y):
+                for _ in range(y):
+                    pass
+            return inner
+    """)
+
+    by_name = {fn.name: fn for fn in facts.functions}
+    assert by_name["outer"].loop_depth == 0
+    assert by_name["outer.inner"].loop_depth == 1
+
+
+def test_compact_keeps_module_level_code_and_interesting_functions():
+    code = textwrap.dedent('''
+        """Module docstring."""
+        import sys
+
+        LIMITS = {"a": 1}
+        for key in list(LIMITS):
+            LIMITS[key] *= 2
+
+        def quadratic(n):
+            """Docstring dropped."""
+            total = 0
+            for i in range(n):
+                for j in range(n):
+                    total += i * j
+            return total
+
+        def plain(x):
+            return x + 1
+
+        if __name__ == "__main__":
+            print(quadratic(int(sys.argv[1])))
+    ''')
+
+    prompt, facts = compact_python(code, 4000)
+
+    assert "Module outline:" in prompt
+    assert "LIMITS[key] *= 2" in prompt
+    assert "if __name__ == '__main__':" in prompt
+    assert "def plain(x): ..." in prompt
+    assert "for j in range(n):" in prompt
+    assert "Docstring dropped" not in prompt
+    assert "Module docstring" not in prompt
+    assert "return x + 1" not in prompt
+    assert "Omitted for size" not in prompt
+    assert len(facts.functions) == 2
+
+
+def test_compact_lists_interesting_functions_that_do_not_fit():
+    code = "\n".join(
+        f"def f{i}(n):\n    t = 0\n    for a in range(n):\n        t += a * {i}\n    return t\n"
+        for i in range(20)
+    )
+
+    prompt, _ = compact_python(code, 1200)
+
+    shown = [i for i in range(20) if f"# f{i} (L" in prompt]
+    assert shown and len(shown) < 20
+    omitted = prompt.split("Omitted for size", 1)[1]
+    assert all(f"f{i} (L" in omitted for i in range(20) if i not in shown)
+
+
+def test_compact_keeps_both_functions_of_a_redefinition():
+    code = textwrap.dedent("""
+        import sys
+
+        if sys.platform == "win32":
+            def walk(paths):
+                for p in paths:
+                    yield p
+        else:
+            def walk(paths):
+                for p in paths:
+                    for q in p:
+                        yield q
+    """)
+
+    prompt, _ = compact_python(code, 4000)
+
+    assert "# walk (L5)" in prompt
+    assert "# walk (L9)" in prompt
+
+
+def test_compact_falls_back_when_module_level_code_dominates():
+    code = "\n".join(f"VALUE_{i} = {i}" for i in range(400)) + "\n\ndef f(x):\n    return x\n"
+
+    assert compact_python(code, 2000) is None
+
+
+def test_compact_needs_functions():
+    assert compact_python("x = 1\ny = 2\n", 1000) is None
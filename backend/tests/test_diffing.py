@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+from pydantic import BaseModel
+
+from core.agents import incremental
+from infrastructure.config import Settings
+from infrastructure.session_manager import PriorAnalysis
+from utils.diffing import diff_text
+
+
+def lines(n: int, prefix: str = "line") -> str:
+    return "\n".join(f"{prefix} {i} of the contract, with enough words to matter." for i in range(n))
+
+
+def test_identical_texts_have_no_changes():
+    diff = diff_text(lines(10), lines(10))
+
+    assert (diff.changed_lines, diff.total_lines, diff.unified) == (0, 10, "")
+    assert diff.changed_ratio == 0.0
+
+
+def test_replaced_and_added_lines_are_counted():
+    old = lines(10)
+    new = old.replace("line 3 ", "clause 3 ") + "\nline 10 appended."
+    diff = diff_text(old, new, context_lines=1)
+
+    assert diff.changed_lines == 2
+    assert diff.total_lines == 11
+    assert "-line 3 of" in diff.unified and "+clause 3 of" in diff.unified
+    assert "+line 10 appended." in diff.unified
+    assert " line 5 " not in diff.unified
+
+
+def test_rewrite_ratio_is_taken_over_the_longer_version():
+    assert diff_text(lines(4), lines(40, "other")).changed_ratio == 1.0
+    assert diff_text("", "").changed_ratio == 0.0
+
+
+class Summary(BaseModel):
+    summary: str
+
+
+def use_settings(monkeypatch: pytest.MonkeyPatch, **overrides) -> None:
+    values = {"incremental_min_chars": 200, "incremental_max_change_ratio": 0.3, "incremental_context_lines": 1}
+    monkeypatch.setattr(incremental, "get_settings", lambda: Settings(**{**values, **overrides}))
+
+
+def test_revision_prompt_carries_the_previous_output_and_diff(monkeypatch):
+    use_settings(monkeypatch)
+    old = lines(100)
+    previous = PriorAnalysis(old, Summary(summary="A long contract."))
+
+    prompt = asyncio.run(incremental.revision_prompt("summarize", previous, old.replace("line 50 ", "clause 50 "), "summary"))
+
+    assert '"summary": "A long contract."' in prompt
+    assert "+clause 50 of" in prompt
+
+
+def test_short_texts_run_in_full(monkeypatch):
+    use_settings(monkeypatch, incremental_min_chars=10_000)
+    previous = PriorAnalysis(lines(100), Summary(summary="A contract."))
+    text = lines(100).replace("line 50 ", "clause 50 ")
+
+    assert asyncio.run(incremental.revision_prompt("summarize", previous, text, "summary")) is None
+
+
+def test_rewrites_run_in_full(monkeypatch):
+    use_settings(monkeypatch)
+    previous = PriorAnalysis(lines(100), Summary(summary="A contract."))
+
+    assert asyncio.run(incremental.revision_prompt("summarize", previous, lines(100, "other"), "summary")) is None
+
+
+def test_prompts_longer_than_the_text_run_in_full(monkeypatch):
+    use_settings(monkeypatch, incremental_min_chars=0, incremental_max_change_ratio=1.0)
+    previous = PriorAnalysis(lines(3), Summary(summary="A contract."))
+    text = lines(3).replace("line 1 ", "clause 1 ")
+
+    assert asyncio.run(incremental.revision_prompt("summarize", previous, text, "summary")) is None
@@ -0,0 +1,153 @@
+import random
+import time
+
+import pytest
+
+from infrastructure.llm.similarity_cache import NearDuplicateCache
+from utils.minhash import LSHIndex, MinHasher, shingle_hashes, similarity
+
+
+def document(n: int = 300) -> str:
+    return " ".join(f"Sentence {i} reports the quarterly revenue of unit {i % 7}." for i in range(n))
+
+
+def unrelated(seed: int, n: int = 1500) -> str:
+    rng = random.Random(seed)
+    return " ".join(f"w{rng.randrange(5000)}" for _ in range(n))
+
+
+def test_shingles_ignore_case_punctuation_and_spacing():
+    assert shingle_hashes("The quick, brown fox jumps over") == shingle_hashes("the   QUICK brown fox\njumps over!")
+    assert shingle_hashes("") == set()
+    assert len(shingle_hashes("too short")) == 1
+
+
+def test_signature_similarity_tracks_overlap():
+    hasher = MinHasher(128)
+    base = hasher.signature(document())
+    near = hasher.signature(document().replace("Sentence 5 ", "Sentence five ") + " One more line.")
+    other = hasher.signature(unrelated(0))
+
+    assert similarity(base, base) == 1.0
+    assert similarity(base, near) > 0.9
+    assert similarity(base, other) < 0.5
+    assert hasher.signature("   ") is None
+
+
+def test_signatures_are_deterministic_per_seed():
+    assert MinHasher(32, seed=3).signature(document()) == MinHasher(32, seed=3).signature(document())
+    assert MinHasher(32, seed=3).signature(document()) != MinHasher(32, seed=4).signature(document())
+
+
+def test_bands_must_divide_permutations():
+    with pytest.raises(ValueError):
+        LSHIndex(64, 10, 10)
+
+
+def test_index_finds_near_duplicates_within_namespace():
+    hasher = MinHasher(64)
+    index: LSHIndex[str, str] = LSHIndex(64, 16, 10)
+    index.add("doc", hasher.signature(document()), "answer", namespace="s1")
+
+    near = hasher.signature(document() + " Appendix.")
+    key, value, score = index.query(near, 0.8, namespace="s1")
+    assert (key, value) == ("doc", "answer") and score >= 0.8
+    assert index.query(near, 0.8, namespace="s2") is None
+    assert index.query(hasher.signature(unrelated(0)), 0.8, namespace="s1") is None
+
+
+def test_index_evicts_least_recently_used():
+    hasher = MinHasher(64)
+    index: LSHIndex[int, int] = LSHIndex(64, 16, 2)
+    signatures = [hasher.signature(unrelated(i)) for i in range(3)]
+    index.add(0, signatures[0], 0)
+    index.add(1, signatures[1], 1)
+    assert index.query(signatures[0], 0.9) is not None  # Touch 0, so 1 is now oldest.
+    index.add(2, signatures[2], 2)
+
+    assert len(index) == 2
+    assert index.query(signatures[1], 0.9) is None
+    assert index.query(signatures[0], 0.9)[0] == 0
+
+
+def test_remove_if_drops_matching_entries_and_their_buckets():
+    hasher = MinHasher(64)
+    index: LSHIndex[int, str] = LSHIndex(64, 16, 10)
+    signature = hasher.signature(document())
+    index.add(1, signature, "a")
+    index.add(2, hasher.signature(unrelated(0)), "b")
+
+    assert index.remove_if(lambda value: value == "a") == 1
+    assert len(index) == 1
+    assert index.query(signature, 0.9) is None
+    assert not any(1 in bucket for bucket in index._buckets.values())
+
+
+def make_cache(**overrides) -> NearDuplicateCache:
+    options = dict(enabled=True, threshold=0.9, max_entries=100, ttl_sec=3600, min_chars=100, per_session=True)
+    return NearDuplicateCache(**{**options, **overrides})
+
+
+@pytest.mark.asyncio
+async def test_cache_hits_near_duplicates_in_the_same_session():
+    cache = make_cache()
+    cached, fingerprint = await cache.lookup("summarize", "s1", document())
+    assert cached is None
+    cache.store(fingerprint, "summary")
+
+    assert (await cache.lookup("summarize", "s1", document() + "\n\n"))[0] == "summary"
+    assert (await cache.lookup("summarize", "s2", document()))[0] is None
+    assert (await cache.lookup("chat", "s1", document()))[0] is None
+
+
+@pytest.mark.asyncio
+async def test_global_cache_is_shared_across_sessions():
+    cache = make_cache(per_session=False)
+    _, fingerprint = await cache.lookup("summarize", "s1", document())
+    cache.store(fingerprint, "summary")
+
+    assert (await cache.lookup("summarize", "s2", document()))[0] == "summary"
+
+
+@pytest.mark.asyncio
+async def test_chat_entries_are_keyed_on_the_question():
+    cache = make_cache()
+    _, fingerprint = await cache.lookup("chat", "s1", document(), question="What was revenue?")
+    cache.store(fingerprint, "answer")
+
+    assert (await cache.lookup("chat", "s1", document(), question="what  was REVENUE?"))[0] == "answer"
+    assert (await cache.lookup("chat", "s1", document(), question="Who is the CEO?"))[0] is None
+
+
+@pytest.mark.asyncio
+async def test_short_inputs_and_disabled_cache_are_not_cached():
+    for cache, text in ((make_cache(), "short text"), (make_cache(enabled=False), document())):
+        cached, fingerprint = await cache.lookup("summarize", "s1", text)
+        cache.store(fingerprint, "summary")
+        assert cached is None
+        assert len(cache.index) == 0
+
+
+@pytest.mark.asyncio
+async def test_expired_entries_are_dropped():
+    cache = make_cache(ttl_sec=60)
+    _, fingerprint = await cache.lookup("summarize", "s1", document())
+    cache.store(fingerprint, "summary")
+    for _, _, entry in cache.index._entries.values():
+        entry.created_at = time.time() - 120
+
+    assert (await cache.lookup("summarize", "s1", document()))[0] is None
+    assert len(cache.index) == 0
+
+
+@pytest.mark.asyncio
+async def test_expire_session_drops_only_that_sessions_entries():
+    cache = make_cache(per_session=False)
+    for session_id in ("s1", "s2"):
+        _, fingerprint = await cache.lookup("summarize", session_id, unrelated(int(session_id[1:])))
+        cache.store(fingerprint, f"summary {session_id}")
+
+    await cache.expire_session("s1")
+
+    assert (await cache.lookup("summarize", "s3", unrelated(1)))[0] is None
+    assert (await cache.lookup("summarize", "s3", unrelated(2)))[0] == "summary s2"
@@ -0,0 +1,141 @@
+import marshal
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+import pytest
+from fastapi import HTTPException
+
+from api.auth import require_admin
+from infrastructure import profiling
+from infrastructure.config import Settings
+from infrastructure.profiling import Profiler, ProfilerBusyError, collapsed, sample_stacks
+
+
+def settings(**overrides) -> Settings:
+    values = {"debug": False, "environment": "development", "admin_token": "", "profiling_enabled": False}
+    return Settings(**{**values, **overrides})
+
+
+def test_collapsed_orders_stacks_by_count():
+    stacks = Counter({"main;a;b": 2, "main;c": 5})
+
+    assert collapsed(stacks) == "main;c 5\nmain;a;b 2\n"
+
+
+def _busy_loop_for_sampler(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_sample_stacks_sees_other_threads_root_first():
+    stop = threading.Event()
+    worker = threading.Thread(target=_busy_loop_for_sampler, args=(stop,), name="busy-worker")
+    worker.start()
+    try:
+        stacks, rounds = sample_stacks(0.05, 0.005)
+    finally:
+        stop.set()
+        worker.join()
+
+    assert rounds > 0
+    busy = [stack for stack in stacks if "_busy_loop_for_sampler" in stack]
+    assert busy
+    assert all(stack.startswith("busy-worker;") for stack in busy)
+
+
+def test_request_profiling_counts_down_and_merges_stats():
+    profiler = Profiler()
+    profiler.arm_requests("/api/v1/analyze", 2)
+
+    assert not profiler.wants("/api/v1/health")
+    for _ in range(2):
+        assert profiler.wants("/api/v1/analyze/upload")
+        profile = profiler.begin_request()
+        assert not profiler.wants("/api/v1/analyze")  # One request at a time.
+        sum(range(1000))
+        profiler.end_request(profile)
+
+    assert not profiler.wants("/api/v1/analyze")
+    assert profiler.request_status() == {"path_prefix": "/api/v1/analyze", "remaining": 0, "profiled": 2}
+    assert isinstance(marshal.loads(profiler.request_pstats()), dict)
+
+
+def test_request_pstats_empty_until_profiled():
+    profiler = Profiler()
+    profiler.arm_requests("/", 1)
+
+    assert profiler.request_pstats() is None
+
+
+def test_memory_snapshots_top_and_diff():
+    if tracemalloc.is_tracing():
+        pytest.skip("tracemalloc already tracing")
+    profiler = Profiler()
+    with pytest.raises(ProfilerBusyError):
+        profiler.take_snapshot()
+
+    profiler.start_memory(5)
+    try:
+        with pytest.raises(ProfilerBusyError):
+            profiler.start_memory(5)
+        base = profiler.take_snapshot()
+        kept = [bytearray(10_000) for _ in range(20)]
+        target = profiler.take_snapshot()
+
+        assert profiler.memory_status()["snapshots"] == [base, target]
+        assert profiler.top(target, 5)
+        assert any(stat["size_diff_bytes"] >= 200_000 for stat in profiler.diff(base, target, 5))
+        assert profiler.dump_snapshot(target)
+        del kept
+    finally:
+        profiler.stop_memory()
+
+    assert profiler.memory_status() == {"tracing": False, "snapshots": []}
+    with pytest.raises(KeyError):
+        profiler.snapshot(base)
+
+
+def test_snapshots_are_bounded():
+    if tracemalloc.is_tracing():
+        pytest.skip("tracemalloc already tracing")
+    profiler = Profiler()
+    profiler.start_memory(1)
+    try:
+        ids = [profiler.take_snapshot() for _ in range(profiling.MAX_SNAPSHOTS + 2)]
+    finally:
+        snapshots = profiler.memory_status()["snapshots"]
+        profiler.stop_memory()
+
+    assert snapshots == ids[-profiling.MAX_SNAPSHOTS:]
+
+
+@pytest.mark.parametrize("overrides, expected", [
+    ({}, False),
+    ({"debug": True}, True),
+    ({"debug": True, "environment": "production"}, False),
+    ({"environment": "production", "profiling_enabled": True}, True),
+])
+def test_profiling_enabled(monkeypatch, overrides, expected):
+    monkeypatch.setattr(profiling, "get_settings", lambda: settings(**overrides))
+
+    assert profiling.profiling_enabled() is expected
+
+
+@pytest.mark.parametrize("overrides, token, allowed", [
+    ({"debug": True}, None, True),
+    ({"debug": False}, None, False),
+    ({"debug": True, "environment": "production"}, None, False),
+    ({"admin_token": "s3cret"}, "s3cret", True),
+    ({"admin_token": "s3cret", "environment": "production"}, "s3cret", True),
+    ({"admin_token": "s3cret", "debug": True}, None, False),
+    ({"admin_token": "s3cret"}, "wrong", False),
+])
+def test_require_admin(overrides, token, allowed):
+    if allowed:
+        require_admin(token, settings(**overrides))
+        return
+    with pytest.raises(HTTPException) as error:
+        require_admin(token, settings(**overrides))
+    assert error.value.status_code == 403
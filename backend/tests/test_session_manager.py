@@ -0,0 +1,53 @@
+import asyncio
+
+from pydantic import BaseModel
+
+from infrastructure.session_manager import InMemorySessionManager, PriorAnalysis, SessionDocument
+
+
+class Summary(BaseModel):
+    summary: str
+
+
+def test_analyses_are_bounded_least_recently_used_first():
+    sessions = InMemorySessionManager(max_sessions=2)
+    for session_id in ("a", "b"):
+        sessions.set_analysis(session_id, "summarize", PriorAnalysis(session_id, Summary(summary=session_id)))
+    assert sessions.get_analysis("a", "summarize") is not None
+    sessions.set_analysis("c", "summarize", PriorAnalysis("c", Summary(summary="c")))
+
+    assert sessions.get_analysis("b", "summarize") is None
+    assert sessions.get_analysis("a", "summarize").text == "a"
+    assert sessions.get_analysis("c", "summarize").text == "c"
+
+
+def test_evicted_memory_has_its_compaction_cancelled():
+    async def run() -> tuple[asyncio.Task, InMemorySessionManager]:
+        sessions = InMemorySessionManager(max_sessions=1)
+        compaction = asyncio.create_task(asyncio.sleep(60))
+        sessions.get_memory("a").compaction = compaction
+        sessions.get_memory("b")
+        await asyncio.sleep(0)
+        return compaction, sessions
+
+    compaction, sessions = asyncio.run(run())
+
+    assert compaction.cancelled()
+    assert sessions.get_memory("a").compaction is None
+
+
+def test_documents_are_bounded_and_evicted_speculation_cancelled():
+    async def run() -> tuple[asyncio.Task, InMemorySessionManager]:
+        sessions = InMemorySessionManager(max_sessions=1)
+        speculation = asyncio.create_task(asyncio.sleep(60))
+        sessions.set_document("a", SessionDocument("text", "digest", speculation=speculation))
+        sessions.set_document("b", SessionDocument("text", "digest"))
+        await asyncio.sleep(0)
+        return speculation, sessions
+
+    speculation, sessions = asyncio.run(run())
+
+    assert speculation.cancelled()
+    assert sessions.get_document("a") is None
+    assert sessions.get_document("b") is not None
+
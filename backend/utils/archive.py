@@ -0,0 +1,133 @@
+import zipfile
+import zlib
+from dataclasses import dataclass, field
+from io import BytesIO
+from pathlib import PurePosixPath
+from typing import Iterator
+
+from utils.sniff import sniff_content
+
+
+# Directories that hold dependencies, build output or tooling rather than project code.
+VENDORED_DIRS = frozenset({
+    "node_modules", "vendor", "third_party", "site-packages", "bower_components",
+    ".git", ".hg", ".svn", "__pycache__", ".venv", "venv", "env", ".tox", ".mypy_cache",
+    ".pytest_cache", "dist", "build", "target", ".next", ".idea", ".vscode", "__MACOSX",
+})
+
+# Generated or minified files that say little about the code itself.
+SKIPPED_SUFFIXES = (".min.js", ".min.css", ".map", ".lock", ".svg")
+
+READ_CHUNK = 64 * 1024
+
+# Entries that mark a zip as a document or package format (Office, OpenDocument, EPUB, JAR)
+# rather than a project archive.
+CONTAINER_MARKERS = frozenset({"[Content_Types].xml", "META-INF/MANIFEST.MF", "mimetype"})
+
+
+@dataclass
+class SourceFile:
+    path: str
+    text: str
+
+
+@dataclass
+class ArchiveScan:
+    """Skipped entries by reason, filled in while ``iter_source_files`` runs."""
+    skipped: dict[str, list[str]] = field(default_factory=dict)
+    total_bytes: int = 0
+
+    def skip(self, reason: str, path: str) -> None:
+        self.skipped.setdefault(reason, []).append(path)
+
+    @property
+    def skipped_count(self) -> int:
+        return sum(len(paths) for paths in self.skipped.values())
+
+
+def is_project_archive(content: bytes, filename: str | None = None) -> bool:
+    """Whether a zip container is a project archive: named ``.zip`` if named at all, and no document format.
+
+    A zip that can't be opened still counts, so the caller can report it as an invalid archive.
+    """
+    if filename and "." in filename and not filename.lower().endswith(".zip"):
+        return False
+    try:
+        with zipfile.ZipFile(BytesIO(content)) as archive:
+            return CONTAINER_MARKERS.isdisjoint(archive.namelist())
+    except zipfile.BadZipFile:
+        return True
+
+
+def _is_vendored(path: PurePosixPath) -> bool:
+    return any(part in VENDORED_DIRS or part.endswith(".egg-info") for part in path.parts[:-1])
+
+
+def _read_capped(archive: zipfile.ZipFile, info: zipfile.ZipInfo, limit: int) -> bytes | None:
+    """Decompress an entry in chunks, giving up once it exceeds ``limit`` bytes.
+
+    Header sizes can lie, so the limit is enforced on the bytes actually produced.
+    """
+    chunks, size = [], 0
+    with archive.open(info) as stream:
+        while chunk := stream.read(READ_CHUNK):
+            size += len(chunk)
+            if size > limit:
+                return None
+            chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def iter_source_files(
+    content: bytes,
+    scan: ArchiveScan,
+    max_files: int,
+    max_file_bytes: int,
+    max_total_bytes: int
+) -> Iterator[SourceFile]:
+    """Yield the project's text source files from a zip archive, one at a time.
+
+    Vendored directories, generated files, binaries and oversized entries are
+    skipped and recorded on ``scan``. Iteration stops once ``max_files`` files
+    or ``max_total_bytes`` of decompressed text have been produced.
+    """
+    with zipfile.ZipFile(BytesIO(content)) as archive:
+        files = 0
+        for info in archive.infolist():
+            if info.is_dir():
+                continue
+            path = PurePosixPath(info.filename)
+            name = path.name.lower()
+            if _is_vendored(path) or name.startswith("."):
+                scan.skip("vendored", info.filename)
+                continue
+            if name.endswith(SKIPPED_SUFFIXES):
+                scan.skip("generated", info.filename)
+                continue
+            if files >= max_files or scan.total_bytes >= max_total_bytes:
+                scan.skip("limit", info.filename)
+                continue
+
+            try:
+                data = _read_capped(archive, info, min(max_file_bytes, max_total_bytes - scan.total_bytes))
+            except (zipfile.BadZipFile, zlib.error, NotImplementedError, RuntimeError):
+                # Corrupt, encrypted or using an unsupported compression method.
+                scan.skip("unreadable", info.filename)
+                continue
+            if data is None:
+                scan.skip("too_large", info.filename)
+                continue
+            if not data.strip():
+                scan.skip("empty", info.filename)
+                continue
+            if sniff_content(data).file_type != "text":
+                scan.skip("binary", info.filename)
+                continue
+            try:
+                text = data.decode("utf-8")
+            except UnicodeDecodeError:
+                text = data.decode("latin-1")
+
+            files += 1
+            scan.total_bytes += len(data)
+            yield SourceFile(info.filename, text)
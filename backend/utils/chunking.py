@@ -0,0 +1,103 @@
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+
+
+_TERM_RE = re.compile(r"[^\W_]{3,}")
+_BREAK_RE = re.compile(r"\n\n|(?<=[.!?])\s")
+
+STOPWORDS = frozenset({
+    "the", "and", "for", "are", "but", "not", "you", "all", "any", "can", "had", "her", "was", "one",
+    "our", "out", "has", "have", "his", "how", "its", "may", "who", "did", "does", "this", "that",
+    "with", "from", "they", "them", "then", "than", "what", "when", "where", "which", "will", "would",
+    "there", "their", "these", "those", "been", "were", "into", "about", "should", "could", "also",
+})
+
+# BM25 parameters.
+_K1 = 1.2
+_B = 0.75
+
+
+def terms(text: str) -> list[str]:
+    return [t for t in _TERM_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+@dataclass(frozen=True)
+class Chunk:
+    start: int
+    end: int
+
+
+def split_chunks(text: str, chunk_chars: int) -> list[Chunk]:
+    """Split ``text`` into spans of about ``chunk_chars``, ending at paragraph or sentence breaks where possible."""
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(start + chunk_chars, len(text))
+        if end < len(text):
+            # Last break in the second half of the window; a hard cut if there is none.
+            window = text[start + chunk_chars // 2:end]
+            breaks = [m.end() for m in _BREAK_RE.finditer(window)]
+            if breaks:
+                end = start + chunk_chars // 2 + breaks[-1]
+        chunks.append(Chunk(start, end))
+        start = end
+    return chunks
+
+
+class ChunkIndex:
+    """Lexical (BM25) index over the chunks of one document.
+
+    Built once per uploaded document so follow-up questions can be answered
+    from the few chunks that match them rather than the whole text.
+    """
+
+    def __init__(self, text: str, chunk_chars: int = 2000):
+        self.text = text
+        self.chunks = split_chunks(text, chunk_chars)
+        self._postings: dict[str, list[tuple[int, int]]] = {}
+        self._lengths: list[int] = []
+        for i, chunk in enumerate(self.chunks):
+            counts = Counter(terms(text[chunk.start:chunk.end]))
+            self._lengths.append(sum(counts.values()))
+            for term, count in counts.items():
+                self._postings.setdefault(term, []).append((i, count))
+        self._avg_length = sum(self._lengths) / len(self._lengths) if self._lengths else 0.0
+
+    def search(self, query: str, limit: int) -> list[int]:
+        """Chunk numbers best matching ``query``, best first."""
+        scores: Counter[int] = Counter()
+        n = len(self.chunks)
+        for term in set(terms(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for i, count in postings:
+                norm = _K1 * (1 - _B + _B * self._lengths[i] / (self._avg_length or 1))
+                scores[i] += idf * count * (_K1 + 1) / (count + norm)
+        return [i for i, _ in scores.most_common(limit)]
+
+    def context(self, query: str, max_chars: int) -> str:
+        """The best matching chunks, in document order, up to ``max_chars``.
+
+        Falls back to the start of the document when nothing matches.
+        """
+        if len(self.text) <= max_chars:
+            return self.text
+        ranked = self.search(query, len(self.chunks)) or range(len(self.chunks))
+        picked, used = [], 0
+        for i in ranked:
+            size = self.chunks[i].end - self.chunks[i].start
+            if used + size > max_chars:
+                if picked:
+                    break
+                continue
+            picked.append(i)
+            used += size
+        if not picked:
+            return self.text[:max_chars]
+        return "\n\n[...]\n\n".join(
+            self.text[self.chunks[i].start:self.chunks[i].end].strip() for i in sorted(picked)
+        )
@@ -0,0 +1,287 @@
+import ast
+import builtins
+import copy
+import re
+from dataclasses import dataclass, field
+
+
+_FUNCTIONS = (ast.FunctionDef, ast.AsyncFunctionDef)
+_BUILTIN_NAMES = frozenset(name for name in dir(builtins) if not name.startswith("_"))
+
+# Functions with nothing notable are only named, and only this many of them.
+MAX_LISTED_PLAIN = 40
+
+# An elided function as ast.unparse renders it, to fold onto one line.
+_ELIDED_DEF = re.compile(r"^(\s*(?:async )?def .*):\n\s+\.\.\.$\n*", re.MULTILINE)
+
+
+@dataclass
+class FunctionFacts:
+    name: str
+    lineno: int
+    end_lineno: int
+    args: list[str]
+    loop_depth: int = 0
+    recursive: bool = False
+    issues: list[str] = field(default_factory=list)
+
+    @property
+    def lines(self) -> int:
+        return self.end_lineno - self.lineno + 1
+
+    @property
+    def interesting(self) -> bool:
+        """Worth sending to the model: it has loops, recursion or an issue."""
+        return self.loop_depth > 0 or self.recursive or bool(self.issues)
+
+
+@dataclass
+class CodeFacts:
+    lines: int
+    imports: list[str]
+    functions: list[FunctionFacts]
+    issues: list[str]
+
+    def summary(self) -> str:
+        """Compact, prompt-ready description of the structure."""
+        out = [f"Static facts (Python, {self.lines} lines, {len(self.functions)} functions):"]
+        if self.imports:
+            out.append(f"- imports: {', '.join(self.imports)}")
+        plain = []
+        for fn in self.functions:
+            if not fn.interesting:
+                plain.append(fn.name)
+                continue
+            traits = [f"L{fn.lineno}-{fn.end_lineno}", f"{fn.lines} lines", f"loop depth {fn.loop_depth}"]
+            if fn.recursive:
+                traits.append("recursive")
+            out.append(f"- {fn.name}({', '.join(fn.args)}): {', '.join(traits)}")
+        if plain:
+            listed = ", ".join(plain[:MAX_LISTED_PLAIN])
+            more = f" (+{len(plain) - MAX_LISTED_PLAIN} more)" if len(plain) > MAX_LISTED_PLAIN else ""
+            out.append(f"- no loops, recursion or issues: {listed}{more}")
+        if self.issues:
+            out.append("Detected issues:")
+            out.extend(f"- {issue}" for issue in self.issues)
+        return "\n".join(out)
+
+
+class _FunctionVisitor(ast.NodeVisitor):
+    """Collects loop depth, self-calls and obvious issues within one function body."""
+
+    def __init__(self, facts: FunctionFacts, qualname: str, issues: list[str]):
+        self.facts = facts
+        self.qualname = qualname
+        self.issues = issues
+        self.depth = 0
+
+    def _issue(self, node: ast.AST, message: str) -> None:
+        text = f"L{node.lineno} in {self.qualname}: {message}"
+        self.facts.issues.append(text)
+        self.issues.append(text)
+
+    def _loop(self, node: ast.AST) -> None:
+        self.depth += 1
+        self.facts.loop_depth = max(self.facts.loop_depth, self.depth)
+        if self.depth == 3:
+            self._issue(node, "loops nested three or more deep")
+        self.generic_visit(node)
+        self.depth -= 1
+
+    visit_For = visit_AsyncFor = visit_While = _loop
+    visit_ListComp = visit_SetComp = visit_DictComp = visit_GeneratorExp = _loop
+
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
+        pass  # Nested functions are analyzed separately.
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_Call(self, node: ast.Call) -> None:
+        func = node.func
+        name = func.id if isinstance(func, ast.Name) else func.attr if isinstance(func, ast.Attribute) else None
+        if name == self.facts.name and (isinstance(func, ast.Name) or _is_self(func)):
+            self.facts.recursive = True
+        if isinstance(func, ast.Name) and func.id in ("eval", "exec"):
+            self._issue(node, f"uses {func.id}()")
+        self.generic_visit(node)
+
+    def visit_ExceptHandler(self, node: ast.ExceptHandler) -> None:
+        if node.type is None:
+            self._issue(node, "bare except")
+        elif all(isinstance(stmt, ast.Pass) for stmt in node.body):
+            self._issue(node, "exception silently swallowed")
+        self.generic_visit(node)
+
+    def visit_Compare(self, node: ast.Compare) -> None:
+        for op, right in zip(node.ops, node.comparators):
+            if isinstance(op, (ast.Eq, ast.NotEq)) and isinstance(right, ast.Constant) and right.value is None:
+                self._issue(node, "compares to None with ==/!= instead of is/is not")
+        self.generic_visit(node)
+
+    def visit_Global(self, node: ast.Global) -> None:
+        self._issue(node, f"modifies global {', '.join(node.names)}")
+
+    def visit_Assign(self, node: ast.Assign) -> None:
+        for target in node.targets:
+            if isinstance(target, ast.Name) and target.id in _BUILTIN_NAMES:
+                self._issue(node, f"shadows builtin '{target.id}'")
+        self.generic_visit(node)
+
+
+def _is_self(func: ast.Attribute) -> bool:
+    return isinstance(func.value, ast.Name) and func.value.id in ("self", "cls")
+
+
+def _function_facts(node: ast.FunctionDef | ast.AsyncFunctionDef, qualname: str, issues: list[str]) -> FunctionFacts:
+    args = [a.arg for a in (*node.args.posonlyargs, *node.args.args, *node.args.kwonlyargs)]
+    facts = FunctionFacts(qualname, node.lineno, node.end_lineno or node.lineno, args)
+    visitor = _FunctionVisitor(facts, qualname, issues)
+
+    for default in (*node.args.defaults, *node.args.kw_defaults):
+        if isinstance(default, (ast.List, ast.Dict, ast.Set)):
+            visitor._issue(default, "mutable default argument")
+    for arg in args:
+        if arg in _BUILTIN_NAMES:
+            visitor._issue(node, f"argument shadows builtin '{arg}'")
+
+    for stmt in node.body:
+        visitor.visit(stmt)
+    return facts
+
+
+def _blocks(node: ast.stmt) -> list[list[ast.stmt]]:
+    """Statement lists nested in a conditional, ``try`` or ``with``, where functions may be defined too."""
+    if isinstance(node, ast.If):
+        return [node.body, node.orelse]
+    if isinstance(node, (ast.Try, getattr(ast, "TryStar", ast.Try))):
+        return [node.body, *(handler.body for handler in node.handlers), node.orelse, node.finalbody]
+    if isinstance(node, (ast.With, ast.AsyncWith)):
+        return [node.body]
+    return []
+
+
+def analyze_python(code: str) -> tuple[CodeFacts, ast.Module] | None:
+    """Parse ``code`` and collect structural facts; None if it isn't valid Python."""
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return None
+
+    imports: list[str] = []
+    functions: list[FunctionFacts] = []
+    issues: list[str] = []
+
+    def walk(body: list[ast.stmt], prefix: str) -> None:
+        for node in body:
+            if isinstance(node, (ast.Import, ast.ImportFrom)):
+                module = node.module if isinstance(node, ast.ImportFrom) else None
+                imports.extend(module or alias.name for alias in node.names)
+            elif isinstance(node, _FUNCTIONS):
+                qualname = f"{prefix}{node.name}"
+                functions.append(_function_facts(node, qualname, issues))
+                walk(node.body, f"{qualname}.")
+            elif isinstance(node, ast.ClassDef):
+                walk(node.body, f"{prefix}{node.name}.")
+            else:
+                for block in _blocks(node):
+                    walk(block, prefix)
+
+    walk(tree.body, "")
+    facts = CodeFacts(len(code.splitlines()), list(dict.fromkeys(imports)), functions, issues)
+    return facts, tree
+
+
+def _strip_docstring(node: ast.AST) -> None:
+    body = getattr(node, "body", None)
+    if body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant) and isinstance(body[0].value.value, str):
+        node.body = body[1:] or [ast.Pass()]
+
+
+class _ElideBodies(ast.NodeTransformer):
+    """Replaces every function body with ``...`` and drops docstrings, leaving module-level code."""
+
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> ast.FunctionDef:
+        node.body = [ast.Expr(ast.Constant(...))]
+        return node
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> ast.ClassDef:
+        _strip_docstring(node)
+        return self.generic_visit(node)
+
+
+def _outline(tree: ast.Module) -> str:
+    outline = _ElideBodies().visit(copy.deepcopy(tree))
+    _strip_docstring(outline)
+    return _ELIDED_DEF.sub(lambda m: f"{m.group(1)}: ...\n", ast.unparse(outline)).strip()
+
+
+def compact_python(code: str, max_chars: int) -> tuple[str, CodeFacts] | None:
+    """A smaller prompt for ``code``: the facts summary, a module outline and only the functions that matter.
+
+    The outline is the module with function bodies elided, so top-level
+    statements, class attributes and signatures are always sent. Functions
+    with loops, recursion or detected issues are included (most complex
+    first, as many as fit in ``max_chars``) with comments and docstrings
+    stripped, and any that don't fit are listed as omitted for size; the
+    rest are described by the facts summary alone. Returns None when
+    ``code`` doesn't parse, or when the outline alone exceeds half of
+    ``max_chars`` and the full source is the better prompt.
+    """
+    parsed = analyze_python(code)
+    if parsed is None:
+        return None
+    facts, tree = parsed
+    if not facts.functions:
+        return None
+    outline = _outline(tree)
+    if len(outline) > max_chars // 2:
+        return None
+
+    # By line too: a function redefined under the same name, e.g. conditionally, is another function.
+    nodes: dict[tuple[str, int], ast.FunctionDef | ast.AsyncFunctionDef] = {}
+
+    def collect(body: list[ast.stmt], prefix: str) -> None:
+        for node in body:
+            if isinstance(node, _FUNCTIONS):
+                nodes[(f"{prefix}{node.name}", node.lineno)] = node
+                collect(node.body, f"{prefix}{node.name}.")
+            elif isinstance(node, ast.ClassDef):
+                collect(node.body, f"{prefix}{node.name}.")
+            else:
+                for block in _blocks(node):
+                    collect(block, prefix)
+
+    collect(tree.body, "")
+
+    # Outer functions already contain their nested ones.
+    selected = [fn for fn in facts.functions if fn.interesting]
+    selected_names = {fn.name for fn in selected}
+    selected = [fn for fn in selected if not any(fn.name.startswith(f"{outer}.") for outer in selected_names)]
+    if not selected:
+        selected = sorted(facts.functions, key=lambda fn: fn.lines, reverse=True)[:3]
+
+    sources, omitted, used = [], [], len(outline)
+    for fn in sorted(selected, key=lambda fn: (fn.loop_depth, fn.recursive, fn.lines), reverse=True):
+        node = nodes[(fn.name, fn.lineno)]
+        for inner in ast.walk(node):
+            if isinstance(inner, (*_FUNCTIONS, ast.ClassDef)):
+                _strip_docstring(inner)
+        source = f"# {fn.name} (L{fn.lineno})\n{ast.unparse(node)}"
+        if used + len(source) > max_chars and sources:
+            if fn.interesting:
+                omitted.append(fn)
+            continue
+        sources.append((fn.lineno, source))
+        used += len(source)
+
+    body = "\n\n".join(source for _, source in sorted(sources))
+    prompt = (
+        f"{facts.summary()}\n\nModule outline:\n```python\n{outline}\n```\n\n"
+        f"Relevant functions:\n```python\n{body}\n```"
+    )
+    if omitted:
+        names = ", ".join(f"{fn.name} (L{fn.lineno})" for fn in sorted(omitted, key=lambda fn: fn.lineno))
+        prompt += f"\n\nOmitted for size, judge these from the facts above: {names}"
+    return prompt, facts
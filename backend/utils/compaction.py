@@ -0,0 +1,150 @@
+import re
+from collections import Counter
+from dataclasses import dataclass
+
+
+_DIGITS_RE = re.compile(r'\d+')
+_LETTER_RE = re.compile(r'[^\W\d_]')
+# Lines of bare punctuation, like a closing brace, are never furniture.
+_WORD_RE = re.compile(r'[^\W_]|#')
+# Sentence ends and paragraph breaks, kept so untouched text is rebuilt byte for byte.
+_SEGMENT_SPLIT_RE = re.compile(r'((?<=[.!?])\s+|\n\n+)')
+_SPACE_RE = re.compile(r'\s+')
+
+OMITTED_MARKER = "[...]"
+
+# Digits are only masked in lines this short, like "Page 3 of 10"; longer ones must repeat exactly.
+MAX_NUMBERED_LINE_CHARS = 40
+
+
+@dataclass
+class CompactionStats:
+    bytes_before: int = 0
+    bytes_after: int = 0
+    lines_removed: int = 0
+    blocks_removed: int = 0
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.bytes_before - self.bytes_after
+
+    def add(self, other: "CompactionStats") -> None:
+        self.bytes_before += other.bytes_before
+        self.bytes_after += other.bytes_after
+        self.lines_removed += other.lines_removed
+        self.blocks_removed += other.blocks_removed
+
+    def to_dict(self) -> dict:
+        return {
+            "bytes_before": self.bytes_before,
+            "bytes_after": self.bytes_after,
+            "bytes_saved": self.bytes_saved,
+            "lines_removed": self.lines_removed,
+            "blocks_removed": self.blocks_removed
+        }
+
+
+def _furniture_key(line: str) -> str:
+    key = _SPACE_RE.sub(" ", line).strip().lower()
+    # Masking digits makes "Page 3 of 10" and "Page 4 of 10" the same line.
+    return _DIGITS_RE.sub("#", key) if len(key) <= MAX_NUMBERED_LINE_CHARS else key
+
+
+def _edge_indexes(lines: list[str], edge_lines: int) -> list[int]:
+    filled = [i for i, line in enumerate(lines) if line.strip()]
+    # Short pages get fewer edge lines, so their body is never mistaken for edges.
+    n = max(1, min(edge_lines, len(filled) // 4))
+    return sorted(set(filled[:n] + filled[-n:]))
+
+
+def strip_page_furniture(
+    pages: list[str],
+    stats: CompactionStats,
+    edge_lines: int = 3,
+    min_pages: int = 3
+) -> list[str]:
+    """Remove running headers, footers and page numbers from raw page texts.
+
+    A line counts as furniture when it sits among the first or last
+    ``edge_lines`` non-blank lines of at least ``min_pages`` pages, comparing
+    short lines with digits masked, so per-chapter running headers qualify as
+    well as document-wide ones. The first copy of a header or footer is kept;
+    bare page numbers are dropped everywhere. Two passes over the pages, so linear in their size.
+
+    Only the removed lines are added to ``stats.bytes_before``; the text that
+    remains is counted by whichever step measures it next.
+    """
+    if len(pages) < min_pages:
+        return pages
+
+    split = [page.splitlines() for page in pages]
+    edges = [_edge_indexes(lines, edge_lines) for lines in split]
+    counts: Counter[str] = Counter()
+    for lines, indexes in zip(split, edges):
+        counts.update({_furniture_key(lines[i]) for i in indexes})
+
+    furniture = {key for key, count in counts.items() if count >= min_pages and _WORD_RE.search(key)}
+    if not furniture:
+        return pages
+
+    kept: set[str] = set()
+    out = []
+    for lines, indexes in zip(split, edges):
+        drop = set()
+        for i in indexes:
+            key = _furniture_key(lines[i])
+            if key not in furniture:
+                continue
+            if _LETTER_RE.search(key) and key not in kept:
+                kept.add(key)
+                continue
+            drop.add(i)
+            stats.lines_removed += 1
+            stats.bytes_before += len(lines[i].strip().encode()) + 1
+        out.append("\n".join(line for i, line in enumerate(lines) if i not in drop))
+    return out
+
+
+class BlockDeduplicator:
+    """Drops sentences and paragraphs that already appeared earlier in the stream.
+
+    Segments shorter than ``min_block_chars`` are always kept, since short
+    phrases repeat legitimately. Longer ones are compared case- and
+    whitespace-insensitively by hash, across every ``compact`` call on the
+    same instance, so one instance spans all the pages or files of a
+    request. Each run of dropped segments is replaced by ``OMITTED_MARKER``.
+    """
+
+    def __init__(self, min_block_chars: int = 40):
+        self.min_block_chars = min_block_chars
+        self.stats = CompactionStats()
+        self._seen: set[int] = set()
+
+    def compact(self, text: str) -> tuple[str, CompactionStats]:
+        stats = CompactionStats()
+        parts = _SEGMENT_SPLIT_RE.split(text)
+        out: list[str] = []
+        omitting = False
+        # parts alternates segment, separator, segment, ...
+        for i in range(0, len(parts), 2):
+            segment = parts[i]
+            separator = parts[i + 1] if i + 1 < len(parts) else ""
+            if len(segment) >= self.min_block_chars:
+                key = hash(_SPACE_RE.sub(" ", segment).strip().lower())
+                if key in self._seen:
+                    stats.blocks_removed += 1
+                    if not omitting:
+                        out.append(OMITTED_MARKER)
+                        out.append(" ")
+                        omitting = True
+                    continue
+                self._seen.add(key)
+            omitting = False
+            out.append(segment)
+            out.append(separator)
+
+        compacted = "".join(out).rstrip() if stats.blocks_removed else text
+        stats.bytes_before = len(text.encode())
+        stats.bytes_after = len(compacted.encode())
+        self.stats.add(stats)
+        return compacted, stats
@@ -0,0 +1,35 @@
+import difflib
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class TextDiff:
+    """Line diff from one version of a text to the next."""
+    unified: str
+    changed_lines: int
+    total_lines: int
+
+    @property
+    def changed_ratio(self) -> float:
+        return self.changed_lines / self.total_lines if self.total_lines else 0.0
+
+
+def diff_text(old: str, new: str, context_lines: int = 3) -> TextDiff:
+    """Unified diff of ``old`` to ``new``, with how many lines were removed, added or replaced.
+
+    The ratio is taken over the longer of the two versions, so a rewrite
+    scores close to 1 however its length changed.
+    """
+    old_lines = old.splitlines()
+    new_lines = new.splitlines()
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+
+    changed = 0
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag != "equal":
+            changed += max(i2 - i1, j2 - j1)
+
+    unified = "\n".join(difflib.unified_diff(
+        old_lines, new_lines, "previous", "revised", n=context_lines, lineterm=""
+    ))
+    return TextDiff(unified, changed, max(len(old_lines), len(new_lines)))
@@ -22,3 +22,14 @@ class ValidationError(DatasmithError):
 class ConfigurationError(DatasmithError):
     status_code = 500
 
+
+class DeadlineExceededError(DatasmithError):
+    status_code = 504
+
+
+class ServiceUnavailableError(DatasmithError):
+    status_code = 503
+
+    def __init__(self, message: str | None = None, retry_after: float | None = None):
+        super().__init__(message)
+        self.retry_after = retry_after
@@ -0,0 +1,109 @@
+import random
+import re
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, TypeVar
+
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+_WORD_RE = re.compile(r"[^\W_]+")
+_MASK64 = (1 << 64) - 1
+
+
+def shingle_hashes(text: str, words_per_shingle: int = 5) -> set[int]:
+    """Hashes of the overlapping word n-grams of ``text``, ignoring case, punctuation and spacing."""
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < words_per_shingle:
+        return {hash(" ".join(words)) & _MASK64} if words else set()
+    return {
+        hash(" ".join(words[i:i + words_per_shingle])) & _MASK64
+        for i in range(len(words) - words_per_shingle + 1)
+    }
+
+
+class MinHasher:
+    """MinHash signatures whose agreement estimates the Jaccard similarity of two texts' shingles.
+
+    Each permutation is an XOR with a fixed random mask over the (already
+    well mixed) shingle hash, which keeps signing cheap in pure Python.
+    """
+
+    def __init__(self, num_perm: int = 64, words_per_shingle: int = 5, seed: int = 1):
+        rng = random.Random(seed)
+        self.masks = [rng.getrandbits(64) for _ in range(num_perm)]
+        self.words_per_shingle = words_per_shingle
+
+    def signature(self, text: str) -> tuple[int, ...] | None:
+        hashes = shingle_hashes(text, self.words_per_shingle)
+        if not hashes:
+            return None
+        return tuple(min(h ^ mask for h in hashes) for mask in self.masks)
+
+
+def similarity(a: tuple[int, ...], b: tuple[int, ...]) -> float:
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+class LSHIndex(Generic[K, V]):
+    """Banded locality-sensitive index over MinHash signatures, bounded with LRU eviction.
+
+    Signatures are cut into ``bands`` bands; entries in the same namespace
+    sharing any band with the query are candidates, and the best candidate at
+    or above ``threshold`` estimated similarity is returned.
+    """
+
+    def __init__(self, num_perm: int, bands: int, max_entries: int):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.rows = num_perm // bands
+        self.bands = bands
+        self.max_entries = max_entries
+        self._entries: OrderedDict[K, tuple[str, tuple[int, ...], V]] = OrderedDict()
+        self._buckets: dict[tuple[str, int, tuple[int, ...]], set[K]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _band_keys(self, namespace: str, signature: tuple[int, ...]) -> list[tuple[str, int, tuple[int, ...]]]:
+        return [(namespace, b, signature[b * self.rows:(b + 1) * self.rows]) for b in range(self.bands)]
+
+    def query(self, signature: tuple[int, ...], threshold: float, namespace: str = "") -> tuple[K, V, float] | None:
+        candidates: set[K] = set()
+        for band_key in self._band_keys(namespace, signature):
+            candidates.update(self._buckets.get(band_key, ()))
+
+        best: tuple[K, V, float] | None = None
+        for key in candidates:
+            _, stored, value = self._entries[key]
+            score = similarity(signature, stored)
+            if score >= threshold and (best is None or score > best[2]):
+                best = (key, value, score)
+        if best is not None:
+            self._entries.move_to_end(best[0])
+        return best
+
+    def add(self, key: K, signature: tuple[int, ...], value: V, namespace: str = "") -> None:
+        if key in self._entries:
+            self.remove(key)
+        self._entries[key] = (namespace, signature, value)
+        for band_key in self._band_keys(namespace, signature):
+            self._buckets.setdefault(band_key, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self.remove(next(iter(self._entries)))
+
+    def remove_if(self, predicate: Callable[[V], bool]) -> int:
+        """Remove every entry whose value satisfies ``predicate``; returns how many were removed."""
+        keys = [key for key, (_, _, value) in self._entries.items() if predicate(value)]
+        for key in keys:
+            self.remove(key)
+        return len(keys)
+
+    def remove(self, key: K) -> None:
+        namespace, signature, _ = self._entries.pop(key)
+        for band_key in self._band_keys(namespace, signature):
+            bucket = self._buckets.get(band_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band_key]
@@ -0,0 +1,99 @@
+from dataclasses import dataclass
+
+
+SNIFF_BYTES = 4096
+
+UTF16_BOMS = (b"\xff\xfe", b"\xfe\xff")
+
+# Everything except the C0 control bytes that do not appear in ordinary text.
+_NON_CONTROL_BYTES = bytes(
+    b for b in range(256) if b >= 0x20 or b in (0x08, 0x09, 0x0A, 0x0C, 0x0D, 0x1B)
+)
+
+
+@dataclass(frozen=True)
+class SniffResult:
+    file_type: str
+    mime_type: str
+
+
+PDF = SniffResult("pdf", "application/pdf")
+PNG = SniffResult("image", "image/png")
+JPEG = SniffResult("image", "image/jpeg")
+GIF = SniffResult("image", "image/gif")
+WEBP = SniffResult("image", "image/webp")
+BMP = SniffResult("image", "image/bmp")
+WAV = SniffResult("audio", "audio/wav")
+MP3 = SniffResult("audio", "audio/mpeg")
+OGG = SniffResult("audio", "audio/ogg")
+FLAC = SniffResult("audio", "audio/flac")
+MP4_AUDIO = SniffResult("audio", "audio/mp4")
+ZIP = SniffResult("archive", "application/zip")
+TEXT = SniffResult("text", "text/plain")
+BINARY = SniffResult("binary", "application/octet-stream")
+
+
+def sniff_content(content: bytes | memoryview) -> SniffResult:
+    """Detect the real format of a payload from its first few KB."""
+    head = bytes(content[:SNIFF_BYTES])
+
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return PNG
+    if head.startswith(b"\xff\xd8\xff"):
+        return JPEG
+    if head.startswith((b"GIF87a", b"GIF89a")):
+        return GIF
+    if head.startswith(b"RIFF") and head[8:12] == b"WEBP":
+        return WEBP
+    if head.startswith(b"RIFF") and head[8:12] == b"WAVE":
+        return WAV
+    if head.startswith(b"BM") and len(head) >= 26 and head[6:10] == b"\x00\x00\x00\x00":
+        return BMP
+    if head.startswith(UTF16_BOMS):
+        # Before MP3: a little-endian BOM also passes for an MPEG frame sync.
+        return TEXT
+    if head.startswith(b"ID3") or (len(head) > 1 and head[0] == 0xFF and head[1] & 0xE0 == 0xE0):
+        return MP3
+    if head.startswith(b"OggS"):
+        return OGG
+    if head.startswith(b"fLaC"):
+        return FLAC
+    if head[4:8] == b"ftyp":
+        return MP4_AUDIO
+    if head.startswith(b"PK\x03\x04"):
+        return ZIP
+    # The PDF spec tolerates junk before the header within the first 1KB.
+    if b"%PDF-" in head[:1024]:
+        return PDF
+    if _looks_like_text(head):
+        return TEXT
+    return BINARY
+
+
+def _looks_like_text(head: bytes) -> bool:
+    if not head:
+        return True
+    if b"\x00" in head:
+        return False
+    # Legacy single-byte encodings (cp1252, latin-1) are text too, so no
+    # decode is required; binary formats give themselves away by control bytes.
+    control = len(head.translate(None, _NON_CONTROL_BYTES))
+    return control / len(head) < 0.05
+
+
+def mime_to_file_type(mime_type: str | None) -> str | None:
+    if not mime_type:
+        return None
+    if mime_type == "application/pdf":
+        return "pdf"
+    if mime_type == "application/zip":
+        return "archive"
+    major = mime_type.split("/", 1)[0]
+    return major if major in ("image", "audio", "text") else None
+
+
+def matches(declared_type: str | None, detected: SniffResult) -> bool:
+    """Whether a declared file type is consistent with the sniffed content."""
+    if declared_type is None:
+        return True
+    return declared_type == detected.file_type
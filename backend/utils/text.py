@@ -1,6 +1,9 @@
 import re
 import mimetypes
 from pathlib import Path
+from typing import Iterable, Iterator
+
+from utils.sniff import UTF16_BOMS
 
 
 def detect_youtube_url(text: str) -> str | None:
@@ -41,10 +44,115 @@ def get_file_type(filename: str) -> str:
     return 'text'
 
 
-def clean_text(text: str) -> str:
+def decode_text(content: bytes) -> str:
+    """Decode an uploaded text file: UTF-16 by its BOM, UTF-8 if valid, otherwise Windows-1252."""
+    if content.startswith(UTF16_BOMS):
+        return content.decode("utf-16", errors="replace")
+    try:
+        return content.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        return content.decode("cp1252", errors="replace")
+
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_PARAGRAPH_BREAK_RE = re.compile(r'\n[^\S\n]*\n\s*')
+
+# Longest unbroken run held back waiting for the rest of a word.
+_MAX_CARRY = 4096
+
+
+class TextNormalizer:
+    """Incrementally normalizes a stream of text chunks.
+
+    Runs of whitespace collapse to a single space, blank lines are kept as
+    paragraph breaks, and output stops once ``max_length`` characters have
+    been produced. Chunks may split words; the partial tail is carried over.
+    """
+
+    def __init__(self, max_length: int | None = None):
+        self.max_length = max_length
+        self.length = 0
+        self.truncated = False
+        self._carry = ""
+        self._pending = ""
+
+    def feed(self, chunk: str, final: bool = False) -> str:
+        if self.truncated:
+            return ""
+
+        text = self._carry + chunk if self._carry else chunk
+        cut = len(text) if final else _tail_start(text)
+        self._carry = text[cut:]
+        return self._emit(text[:cut] if cut < len(text) else text)
+
+    def close(self) -> str:
+        return self.feed("", final=True)
+
+    def _emit(self, segment: str) -> str:
+        out = []
+        for i, paragraph in enumerate(_PARAGRAPH_BREAK_RE.split(segment)):
+            if i > 0:
+                self._pending = "\n\n"
+            if paragraph[:1].isspace():
+                self._pending = self._pending or " "
+
+            body = _WHITESPACE_RE.sub(" ", paragraph).strip()
+            if not body:
+                continue
+
+            piece = f"{self._pending}{body}" if self.length else body
+            self._pending = " " if paragraph[-1:].isspace() else ""
+
+            if self.max_length is not None and self.length + len(piece) > self.max_length:
+                piece = piece[:self.max_length - self.length]
+                self.truncated = True
+
+            out.append(piece)
+            self.length += len(piece)
+            if self.truncated:
+                break
+
+        return "".join(out)
+
+
+def _tail_start(text: str) -> int:
+    """Index where the trailing whitespace run and partial word begin."""
+    i = len(text)
+    while i and not text[i - 1].isspace():
+        i -= 1
+    while i and text[i - 1].isspace():
+        i -= 1
+    if i == 0 and len(text) > _MAX_CARRY:
+        return len(text)
+    return i
+
+
+def normalize_chunks(chunks: Iterable[str], max_length: int | None = None) -> Iterator[str]:
+    """Normalize an iterator of pages or chunks, stopping once the budget is spent.
+
+    Stops pulling from ``chunks`` as soon as ``max_length`` is reached, so a
+    lazy page iterator is not parsed past the budget.
+    """
+    normalizer = TextNormalizer(max_length)
+    for chunk in chunks:
+        piece = normalizer.feed(chunk)
+        if piece:
+            yield piece
+        if normalizer.truncated:
+            return
+    tail = normalizer.close()
+    if tail:
+        yield tail
+
+
+def normalize_text(text: str, max_length: int | None = None) -> str:
     if not text:
         return ""
-    return re.sub(r'\s+', ' ', text).strip()
+    return TextNormalizer(max_length).feed(text, final=True)
+
+
+def clean_text(text: str, max_length: int | None = None) -> str:
+    return normalize_text(text, max_length)
 
 
 def is_code_content(text: str) -> bool: